@@ -1,4 +1,5 @@
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import Flask, render_template, request, jsonify, send_file, session, Response, stream_with_context
+import hmac
 import os
 import sys
 import json
@@ -16,6 +17,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 try:
     from core.document_analyzer import DocumentAnalyzer
     from core.ai_feedback_engine import AIFeedbackEngine
+    from core.section_batcher import plan_section_batches, estimate_tokens
+    from core.request_coalescer import get_request_coalescer
+    from core.parse_cache import get_parse_cache
+    from core.upload_sections import get_upload_section_store
+    from core.cpu_offload import get_cpu_offload
+    from core.docx_reader import locate_text
     from core.database_manager import db_manager  # ✅ NEW: Auto-save database
     from utils.statistics_manager import StatisticsManager
     from utils.document_processor import DocumentProcessor
@@ -24,6 +31,8 @@ try:
     from utils.learning_system import FeedbackLearningSystem
     from utils.s3_export_manager import S3ExportManager
     from utils.activity_logger import ActivityLogger
+    from utils.thread_pool_manager import get_task_manager, update_task_progress
+    from utils.task_functions import analyze_section_sync, analyze_sections_batch_sync
     # Import centralized region configuration (optional - has fallbacks)
     try:
         from config.aws_regions import get_region_config, get_supported_regions, validate_region_setup
@@ -58,10 +67,22 @@ RQ_ENABLED = False  # Track if RQ is available
 try:
     from rq_tasks import (
         analyze_section_task,
+        analyze_sections_batch_task,
         process_chat_task,
-        monitor_health
+        monitor_health,
+        get_analysis_cache_key
     )
-    from rq_config import get_queue, is_rq_available, redis_conn
+    from rq_config import is_rq_available, redis_conn
+    from rq_scheduler import get_scheduler
+    from rq_cancellation import track_session_job, release_session_job, cancel_session_jobs
+    from rq_events import sse_stream
+    from rq_session_store import (
+        SESSION_FEEDBACK_KEY, SESSION_FEEDBACK_TTL, clear_session_feedback, parse_session_feedback,
+        store_session_feedback, is_session_applied
+    )
+    from rq_dlq import list_dead_letters, get_dead_letter_stats, replay_dead_letters
+    from rq_metrics import get_queue_stats as rq_get_queue_stats, job_timing
+    from rq_results import unpack_result
     from rq.job import Job
     from core.async_request_manager import get_async_request_manager
     from config.model_config_enhanced import get_default_models
@@ -174,6 +195,26 @@ class SimpleModelConfig:
 
 model_config = SimpleModelConfig()
 
+# Singleflight coalescing of identical analysis requests (cross-worker when Redis is available)
+analysis_coalescer = get_request_coalescer(redis_conn if RQ_ENABLED else None)
+
+# Parsed documents by content hash (re-uploads skip parsing and section detection)
+parse_cache = get_parse_cache(redis_conn if RQ_ENABLED else None)
+
+# Sections published by background upload parsing (folded into sessions by get_session)
+upload_sections = get_upload_section_store(redis_conn if RQ_ENABLED else None)
+
+# CPU-bound work (docx parsing/rewriting, hashing) runs on real threads so a gevent
+# worker keeps serving other requests meanwhile (core/cpu_offload)
+cpu_offload = get_cpu_offload()
+
+# Without Redis, analysis runs on an in-process thread pool with task state in SQLite
+# (utils/thread_pool_manager) instead of blocking the request; LOCAL_TASKS=false restores inline analysis
+LOCAL_TASKS_ENABLED = not RQ_ENABLED and os.environ.get('LOCAL_TASKS', 'true').lower() != 'false'
+
+# Upper bound on task ids per /task_status/batch request
+MAX_BATCH_STATUS_TASKS = 100
+
 app = Flask(__name__, static_folder='static')
 app.secret_key = 'your-secret-key-here'
 
@@ -264,12 +305,25 @@ if RQ_ENABLED and 'redis_conn' in globals():
     SESSION_TTL = 86400  # 24 hours
 
     def get_session(session_id):
-        """Redis-based session retrieval"""
+        """Redis-based session retrieval (merges the session's feedback hash, see rq_session_store)"""
         try:
-            data = redis_conn.get(f"session:{session_id}")
-            if data:
-                return pickle.loads(data)
-            return None
+            # Session and its feedback hash in one round trip
+            with redis_conn.pipeline(transaction=False) as pipe:
+                pipe.get(f"session:{session_id}")
+                pipe.hgetall(SESSION_FEEDBACK_KEY.format(session_id))
+                data, raw_feedback = pipe.execute()
+
+            if not data:
+                return None
+
+            review_session = pickle.loads(data)
+            if getattr(review_session, 'section_detection', {}).get('state') == 'parsing':
+                if upload_sections.apply(review_session):
+                    set_session(session_id, review_session)
+            if raw_feedback:
+                # The hash wins over the pickle (never consumed, so stale saves cannot lose it)
+                review_session.feedback_data.update(parse_session_feedback(raw_feedback))
+            return review_session
         except Exception as e:
             print(f"Error retrieving session from Redis: {e}")
             return None
@@ -278,13 +332,18 @@ if RQ_ENABLED and 'redis_conn' in globals():
         """Redis-based session storage"""
         try:
             data = pickle.dumps(review_session)
-            redis_conn.setex(f"session:{session_id}", SESSION_TTL, data)
+            with redis_conn.pipeline(transaction=False) as pipe:
+                pipe.setex(f"session:{session_id}", SESSION_TTL, data)
+                pipe.expire(SESSION_FEEDBACK_KEY.format(session_id), SESSION_FEEDBACK_TTL)
+                pipe.execute()
         except Exception as e:
             print(f"Error storing session in Redis: {e}")
 
     def delete_session(session_id):
-        """Redis-based session deletion"""
+        """Redis-based session deletion (also cancels the session's in-flight jobs)"""
         try:
+            cancel_session_jobs(redis_conn, session_id)
+            clear_session_feedback(redis_conn, session_id)
             redis_conn.delete(f"session:{session_id}")
         except Exception as e:
             print(f"Error deleting session from Redis: {e}")
@@ -304,9 +363,12 @@ else:
     sessions_lock = threading.Lock()
 
     def get_session(session_id):
-        """Thread-safe in-memory session retrieval"""
+        """Thread-safe in-memory session retrieval (folds in sections published by upload parsing)"""
         with sessions_lock:
-            return sessions.get(session_id)
+            review_session = sessions.get(session_id)
+        if review_session is not None and getattr(review_session, 'section_detection', {}).get('state') == 'parsing':
+            upload_sections.apply(review_session)
+        return review_session
 
     def set_session(session_id, review_session):
         """Thread-safe in-memory session storage"""
@@ -324,6 +386,17 @@ else:
         with sessions_lock:
             return session_id in sessions
 
+def store_section_feedback(review_session, feedback):
+    """
+    Set the analysis feedback of one or more sections (caller saves the session)
+
+    With Redis sessions the session's feedback hash is written too: it is
+    merged over the pickle on every load, so it must hold the latest result.
+    """
+    review_session.feedback_data.update(feedback)
+    if SESSION_STORE == 'redis':
+        store_session_feedback(redis_conn, [review_session.session_id], feedback)
+
 class ReviewSession:
     def __init__(self):
         self.session_id = str(uuid.uuid4())
@@ -335,6 +408,7 @@ class ReviewSession:
         self.sections = {}
         self.section_paragraphs = {}
         self.paragraph_indices = {}
+        self.section_detection = {}  # method, confidence, refining (AI pass running in background)
         self.current_section = 0
         self.feedback_data = {}
         self.accepted_feedback = defaultdict(list)
@@ -436,17 +510,6 @@ def upload_document():
                 review_session.guidelines_name = guidelines_filename
                 guidelines_uploaded = True
         
-        # Extract sections using document analyzer
-        sections, section_paragraphs, paragraph_indices = document_analyzer.extract_sections_from_docx(file_path)
-        
-        review_session.sections = sections
-        review_session.section_paragraphs = section_paragraphs
-        review_session.paragraph_indices = paragraph_indices
-
-        # Store session (thread-safe)
-        set_session(session_id, review_session)
-        session['session_id'] = session_id
-        
         # Log activity with comprehensive tracking
         file_size = os.path.getsize(file_path)
         review_session.activity_logger.log_document_upload(filename, file_size, success=True)
@@ -454,7 +517,86 @@ def upload_document():
         if guidelines_uploaded:
             guidelines_size = os.path.getsize(review_session.guidelines_path)
             review_session.activity_logger.log_document_upload(review_session.guidelines_name, guidelines_size, success=True)
+
+        # Sections are parsed in the background and published as they are found
+        # (get_session folds them in); this request only saves the files
+        parse_task_id = str(uuid.uuid4())
+        review_session.section_detection = {'state': 'parsing', 'task_id': parse_task_id}
+        upload_sections.start(session_id)
+
+        # Store session (thread-safe)
+        set_session(session_id, review_session)
+        session['session_id'] = session_id
+
+        job = get_task_manager().enqueue(
+            process_uploaded_document,
+            args=(session_id, file_path, filename, guidelines_uploaded, guidelines_preference),
+            job_id=parse_task_id,
+            session_id=session_id
+        )
+
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'document_name': filename,
+            'sections': [],
+            'total_sections': 0,
+            'parsing': True,
+            'task_id': job.id,
+            'guidelines_uploaded': guidelines_uploaded,
+            'guidelines_preference': guidelines_preference
+        })
         
+    except Exception as e:
+        print(f"ERROR Upload error: {str(e)}")
+        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+
+def process_uploaded_document(session_id, file_path, filename, guidelines_uploaded, guidelines_preference):
+    """
+    Background task: parse an uploaded document and publish its sections
+
+    Header-based sections are published while the document streams, so the
+    UI can open the first section before parsing ends; the final result
+    (or a cached one for an identical earlier upload) replaces them.
+    Low-confidence structure hands over to refine_document_sections.
+    """
+    try:
+        # Headers/structure only - never blocks on Bedrock; reuse identical earlier uploads
+        document_digest = cpu_offload.run(parse_cache.digest_file, file_path)
+        extraction = parse_cache.get(document_digest)
+        parse_cache_hit = extraction is not None
+        if not parse_cache_hit:
+            extraction = document_analyzer.extract_sections(
+                file_path,
+                defer_ai=True,
+                on_section=lambda title, paragraphs: upload_sections.publish_section(session_id, title, paragraphs)
+            )
+            parse_cache.put(document_digest, extraction)
+        else:
+            print(f"⚡ Parse cache hit for {filename} ({extraction['method']}, {len(extraction['sections'])} sections)")
+        sections = extraction['sections']
+        if extraction['method'] == 'error':
+            # Unreadable document - the fallback "section" is only the error message
+            upload_sections.fail(session_id, sections.get('Document', 'Could not read document'))
+            return {'sections': [], 'section_detection': 'error'}
+        refine_task_id = str(uuid.uuid4()) if extraction['needs_ai'] else None
+        upload_sections.finish(session_id, extraction, refine_task_id=refine_task_id)
+    except Exception as e:
+        print(f"ERROR Document parsing failed for {session_id[:8]}: {str(e)}")
+        upload_sections.fail(session_id, str(e))
+        raise
+
+    # Low-confidence structure: let the AI find the sections in the background
+    if extraction['needs_ai']:
+        get_task_manager().enqueue(
+            refine_document_sections,
+            args=(session_id, file_path, list(sections.keys()), document_digest),
+            job_id=refine_task_id,
+            session_id=session_id
+        )
+
+    review_session = get_session(session_id)  # Folds in the final sections
+    if review_session is not None:
         review_session.activity_logger.log_session_event('documents_uploaded', {
             'analysis_document': filename,
             'guidelines_document': review_session.guidelines_name if guidelines_uploaded else None,
@@ -476,31 +618,119 @@ def upload_document():
         
         # Log with audit logger
         review_session.audit_logger.log('DOCUMENTS_UPLOADED', log_details)
+        set_session(session_id, review_session)
 
-        # ✅ NEW: Save to database
-        try:
-            db_manager.create_review_session(
-                session_id=session_id,
-                document_name=filename,
-                sections=list(sections.keys())
-            )
-            print(f"✅ Database: Review session created for {session_id}")
-        except Exception as db_error:
-            print(f"⚠️ Database save error: {db_error}")
+    # ✅ NEW: Save to database
+    try:
+        db_manager.create_review_session(
+            session_id=session_id,
+            document_name=filename,
+            sections=list(sections.keys())
+        )
+        print(f"✅ Database: Review session created for {session_id}")
+    except Exception as db_error:
+        print(f"⚠️ Database save error: {db_error}")
+
+    return {
+        'sections': list(sections.keys()),
+        'section_detection': extraction['method'],
+        'sections_refining': extraction['needs_ai'],
+        'parse_cache': 'hit' if parse_cache_hit else 'miss'
+    }
 
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'document_name': filename,
-            'sections': list(sections.keys()),
-            'total_sections': len(sections),
-            'guidelines_uploaded': guidelines_uploaded,
-            'guidelines_preference': guidelines_preference
-        })
-        
-    except Exception as e:
-        print(f"ERROR Upload error: {str(e)}")
-        return jsonify({'error': f'Upload failed: {str(e)}'}), 500
+def refine_document_sections(session_id, file_path, initial_sections, document_digest=None):
+    """
+    Background task: AI section detection for an upload whose structure was unclear
+
+    The new sections replace the deterministic ones only while the user has
+    not started reviewing (no feedback yet, sections unchanged). They are
+    also cached, so re-uploads of the document get them without another AI call.
+    """
+    refined = None
+    try:
+        refined = document_analyzer.refine_sections_with_ai(file_path)
+        if refined and document_digest:
+            parse_cache.put(document_digest, {
+                'sections': refined[0],
+                'section_paragraphs': refined[1],
+                'paragraph_indices': refined[2],
+                'method': 'ai',
+                'confidence': 1.0,
+                'needs_ai': False
+            })
+    finally:
+        review_session = get_session(session_id)
+        if review_session is not None:
+            untouched = not review_session.feedback_data and list(review_session.sections.keys()) == initial_sections
+            detection = getattr(review_session, 'section_detection', {})
+            if refined and untouched:
+                review_session.sections, review_session.section_paragraphs, review_session.paragraph_indices = refined
+                detection['method'] = 'ai'
+                upload_sections.finish(session_id, {
+                    'section_paragraphs': refined[1], 'method': 'ai', 'confidence': 1.0, 'needs_ai': False
+                })
+                print(f"✅ AI section detection for {session_id[:8]}: {list(refined[0].keys())}")
+            else:
+                upload_sections.update_status(session_id, refining=False)
+            detection['refining'] = False
+            review_session.section_detection = detection
+            set_session(session_id, review_session)
+
+    return {'sections': list(refined[0].keys()) if refined else None}
+
+@app.route('/document_structure', methods=['GET'])
+def document_structure():
+    """Current sections of a session, whether it is still parsing and whether background AI detection is running"""
+    session_id = request.args.get('session_id') or session.get('session_id')
+    if not session_id or not session_exists(session_id):
+        return jsonify({'success': False, 'error': 'Invalid or expired session'}), 400
+
+    review_session = get_session(session_id)
+    detection = getattr(review_session, 'section_detection', {})
+    if detection.get('state') == 'parsing' or detection.get('refining'):
+        detection = check_section_tasks(session_id, review_session, detection)
+    return jsonify({
+        'success': True,
+        'sections': list(review_session.sections.keys()),
+        'state': detection.get('state', 'done'),
+        'error': detection.get('error'),
+        'method': detection.get('method'),
+        'confidence': detection.get('confidence'),
+        'refining': detection.get('refining', False)
+    })
+
+def check_section_tasks(session_id, review_session, detection):
+    """
+    Settle section detection whose background task died without reporting
+
+    A worker recycle, deploy or crash kills the in-process parse/refine task
+    before it can record its outcome; the task manager reports such tasks as
+    FAILURE (orphaned). Without this the session would stay 'parsing' forever.
+
+    Returns:
+        The (possibly updated) section_detection dict
+    """
+    parsing = detection.get('state') == 'parsing'
+    task_id = detection.get('task_id') if parsing else detection.get('refine_task_id')
+    if not task_id:
+        return detection
+
+    status = get_task_manager().get_task_status(task_id)
+    if status['state'] not in ('FAILURE', 'REVOKED'):
+        return detection
+
+    detection = dict(detection)
+    if parsing:
+        error = status.get('error') or 'Document parsing was interrupted'
+        detection.update(state='failed', error=error, refining=False)
+        upload_sections.fail(session_id, error)
+        print(f"⚠️ Parse task {task_id[:8]} for {session_id[:8]} ended without a result: {error}")
+    else:
+        detection['refining'] = False
+        upload_sections.update_status(session_id, refining=False)
+    review_session.section_detection = detection
+    set_session(session_id, review_session)
+    return detection
 
 # ✅ NEW ENDPOINT: Get section content without analysis
 @app.route('/get_section_content', methods=['POST'])
@@ -589,12 +819,15 @@ def analyze_section():
             # Use RQ async processing (simpler than Celery, no signature expiration!)
             print(f"✨ Submitting to RQ task queue (NO signature expiration!)", flush=True)
 
-            # Submit task to RQ queue
-            queue = get_queue('analysis')
-            job = queue.enqueue(
+            # Submit as interactive work (attaches to an identical in-flight job if one exists)
+            lane = get_scheduler().lane('interactive', session_id, cost=estimate_tokens(section_content))
+            job, coalesced = analysis_coalescer.enqueue_once(
+                lane,
+                get_analysis_cache_key(f"{section_name}\x1f{section_content}", "Full Write-up"),
                 analyze_section_task,
                 args=(section_name, section_content, "Full Write-up", session_id),
-                job_timeout=300  # 5 minutes timeout
+                job_timeout=300,  # 5 minutes timeout
+                on_attach=lambda job_id: track_session_job(redis_conn, session_id, job_id)
             )
 
             # Return job ID for async polling + section content for immediate display
@@ -602,6 +835,7 @@ def analyze_section():
                 'success': True,
                 'task_id': job.id,
                 'status': 'queued',
+                'coalesced': coalesced,
                 'message': 'Analysis started with RQ (NO AWS signature expiration!)',
                 'async': True,
                 'enhanced': True,
@@ -638,6 +872,29 @@ def analyze_section():
             else:
                 # Celery not available, got result directly
                 analysis_result = task_id  # task_id is actually the result in sync mode
+
+        elif LOCAL_TASKS_ENABLED:
+            # No Redis - run on the in-process thread pool, poll /task_status like RQ jobs
+            print("📤 Submitting analysis to local task backend (no Redis)", flush=True)
+            job = get_task_manager().enqueue(
+                run_local_section_analysis,
+                args=(
+                    get_analysis_cache_key(f"{section_name}\x1f{section_content}", "Full Write-up"),
+                    section_name,
+                    section_content,
+                    session_id
+                ),
+                session_id=session_id
+            )
+
+            return jsonify({
+                'success': True,
+                'task_id': job.id,
+                'status': 'queued',
+                'message': 'Analysis started in background',
+                'async': True,
+                'section_content': section_content
+            })
         else:
             # Analyze with AI engine with timing (synchronous fallback)
             analysis_start_time = datetime.now()
@@ -650,7 +907,13 @@ def analyze_section():
                     'content_length': len(section_content)
                 })
 
-                analysis_result = ai_engine.analyze_section(section_name, section_content)
+                # Concurrent identical requests share one Bedrock call
+                analysis_result, coalesced = analysis_coalescer.do(
+                    get_analysis_cache_key(f"{section_name}\x1f{section_content}", "Full Write-up"),
+                    ai_engine.analyze_section,
+                    section_name,
+                    section_content
+                )
 
                 analysis_duration = (datetime.now() - analysis_start_time).total_seconds()
                 feedback_count = len(analysis_result.get('feedback_items', []))
@@ -739,7 +1002,7 @@ def analyze_section():
         print(f"Section analysis completed: {section_name} - {len(feedback_items)} validated feedback items")
         
         # Store feedback data
-        review_session.feedback_data[section_name] = feedback_items
+        store_section_feedback(review_session, {section_name: feedback_items})
         
         # Update statistics immediately
         try:
@@ -787,6 +1050,159 @@ def analyze_section():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@app.route('/analyze_all_sections', methods=['POST'])
+def analyze_all_sections():
+    """
+    Analyze many sections with as few Bedrock requests as possible
+
+    Small sections are packed into batched requests (see core.section_batcher),
+    large sections are analyzed individually. Returns one task per request in
+    RQ mode and on the local task backend, or the per-section results directly
+    in synchronous mode (LOCAL_TASKS=false).
+
+    In RQ mode requests go through the fair-share 'bulk' lane, except the one
+    covering current_section (the section on screen), which runs as interactive.
+    """
+    try:
+        data = request.get_json() or {}
+        session_id = data.get('session_id') or session.get('session_id')
+        current_section = data.get('current_section')
+
+        if not session_id or not session_exists(session_id):
+            return jsonify({'success': False, 'error': 'Invalid or expired session'}), 400
+
+        review_session = get_session(session_id)
+
+        section_names = data.get('section_names') or list(review_session.sections.keys())
+        sections = {
+            name: review_session.sections[name]
+            for name in section_names
+            if name in review_session.sections
+        }
+
+        batches, singles = plan_section_batches(sections)
+        print(f"📦 Batch plan: {len(batches)} batched requests, {len(singles)} individual requests "
+              f"for {len(sections)} sections", flush=True)
+
+        if ENHANCED_MODE and RQ_ENABLED:
+            scheduler = get_scheduler()
+            tasks = []
+
+            def lane_for(names):
+                work_class = 'interactive' if current_section in names else 'bulk'
+                cost = sum(estimate_tokens(sections[name]) for name in names)
+                return scheduler.lane(work_class, session_id, cost=cost)
+
+            for batch in batches:
+                batch_sections = {name: sections[name] for name in batch}
+                batch_key = get_analysis_cache_key(
+                    '\x1e'.join(f"{name}\x1f{content}" for name, content in batch_sections.items()),
+                    "Full Write-up"
+                )
+                job, coalesced = analysis_coalescer.enqueue_once(
+                    lane_for(batch),
+                    batch_key,
+                    analyze_sections_batch_task,
+                    args=(batch_sections, "Full Write-up", session_id),
+                    job_timeout=300,
+                    on_attach=lambda job_id: track_session_job(redis_conn, session_id, job_id)
+                )
+                tasks.append({'task_id': job.id, 'sections': batch, 'batch': True, 'coalesced': coalesced})
+
+            for section_name in singles:
+                job, coalesced = analysis_coalescer.enqueue_once(
+                    lane_for([section_name]),
+                    get_analysis_cache_key(f"{section_name}\x1f{sections[section_name]}", "Full Write-up"),
+                    analyze_section_task,
+                    args=(section_name, sections[section_name], "Full Write-up", session_id),
+                    job_timeout=300,
+                    on_attach=lambda job_id: track_session_job(redis_conn, session_id, job_id)
+                )
+                tasks.append({'task_id': job.id, 'sections': [section_name], 'batch': False, 'coalesced': coalesced})
+
+            return jsonify({
+                'success': True,
+                'async': True,
+                'status': 'queued',
+                'tasks': tasks,
+                'total_requests': len(tasks),
+                'total_sections': len(sections)
+            })
+
+        if LOCAL_TASKS_ENABLED:
+            # No Redis - one in-process task per request, polled through /task_status like RQ jobs
+            task_manager = get_task_manager()
+            tasks = []
+
+            for batch in batches:
+                batch_sections = {name: sections[name] for name in batch}
+                batch_key = get_analysis_cache_key(
+                    '\x1e'.join(f"{name}\x1f{content}" for name, content in batch_sections.items()),
+                    "Full Write-up"
+                )
+                job = task_manager.enqueue(
+                    run_local_batch_analysis,
+                    args=(batch_key, batch_sections, session_id),
+                    session_id=session_id
+                )
+                tasks.append({'task_id': job.id, 'sections': batch, 'batch': True})
+
+            for section_name in singles:
+                job = task_manager.enqueue(
+                    run_local_section_analysis,
+                    args=(
+                        get_analysis_cache_key(f"{section_name}\x1f{sections[section_name]}", "Full Write-up"),
+                        section_name,
+                        sections[section_name],
+                        session_id
+                    ),
+                    session_id=session_id
+                )
+                tasks.append({'task_id': job.id, 'sections': [section_name], 'batch': False})
+
+            return jsonify({
+                'success': True,
+                'async': True,
+                'status': 'queued',
+                'tasks': tasks,
+                'total_requests': len(tasks),
+                'total_sections': len(sections)
+            })
+
+        # Synchronous fallback - still one Bedrock call per batch
+        results = {}
+        for batch in batches:
+            results.update(ai_engine.analyze_sections_batch({name: sections[name] for name in batch}))
+        for section_name in singles:
+            results[section_name] = ai_engine.analyze_section(section_name, sections[section_name])
+
+        for section_name, analysis_result in results.items():
+            feedback_items = analysis_result.get('feedback_items', [])
+            store_section_feedback(review_session, {section_name: feedback_items})
+            try:
+                stats_manager.update_feedback_data(section_name, feedback_items)
+            except Exception as stats_error:
+                print(f"WARNING Statistics update failed: {stats_error}")
+
+        review_session.activity_log.append({
+            'timestamp': datetime.now().isoformat(),
+            'action': 'SECTIONS_BATCH_ANALYZED',
+            'details': f'{len(results)} sections analyzed with {len(batches) + len(singles)} requests'
+        })
+        set_session(session_id, review_session)
+
+        return jsonify({
+            'success': True,
+            'async': False,
+            'results': {name: r.get('feedback_items', []) for name, r in results.items()},
+            'total_requests': len(batches) + len(singles),
+            'total_sections': len(sections)
+        })
+
+    except Exception as e:
+        print(f"ERROR Batch analysis error: {str(e)}")
+        return jsonify({'success': False, 'error': f'Batch analysis failed: {str(e)}'}), 500
+
 @app.route('/accept_feedback', methods=['POST'])
 def accept_feedback():
     try:
@@ -1081,12 +1497,13 @@ def chat():
             # Submit task to RQ queue
             print(f"📤 Submitting chat task to RQ queue", flush=True)
 
-            queue = get_queue('chat')
-            job = queue.enqueue(
+            lane = get_scheduler().lane('chat', session_id, cost=estimate_tokens(message))
+            job = lane.enqueue(
                 process_chat_task,
                 args=(message, context),
                 job_timeout=120  # 2 minutes timeout
             )
+            track_session_job(redis_conn, session_id, job.id)
 
             # Return job ID for async polling
             return jsonify({
@@ -1175,6 +1592,11 @@ def delete_document():
             return jsonify({'error': 'Invalid session'}), 400
         
         review_session = get_session(session_id)
+
+        # Stop any analysis still running for the old document
+        if RQ_ENABLED:
+            cancel_session_jobs(redis_conn, session_id)
+            clear_session_feedback(redis_conn, session_id)
         
         # Delete document file but keep guidelines
         if review_session.document_path and os.path.exists(review_session.document_path):
@@ -1191,6 +1613,7 @@ def delete_document():
         review_session.sections = {}
         review_session.section_paragraphs = {}
         review_session.paragraph_indices = {}
+        review_session.section_detection = {}
         review_session.feedback_data = {}
         review_session.accepted_feedback = defaultdict(list)
         review_session.rejected_feedback = defaultdict(list)
@@ -1767,204 +2190,294 @@ def get_feedback_summary():
         traceback.print_exc()
         return jsonify({'error': str(e), 'success': False}), 500
 
+def locate_feedback(review_session, section_name, item, para_indices):
+    """
+    Where a comment for a feedback item belongs in the document
+
+    The item's quoted excerpt (AI 'quote' or user 'highlighted_text') is looked
+    up in the section's paragraphs; without a match the comment goes on the
+    section's first paragraph, as before.
+
+    Returns:
+        Tuple of (paragraph ordinal, [start, end] character span or None)
+    """
+    excerpt = item.get('highlighted_text') or item.get('quote')
+    if excerpt:
+        found = locate_text(review_session.section_paragraphs.get(section_name, []), excerpt)
+        if found:
+            return found[0], [found[1], found[2]]
+    return (para_indices[0] if para_indices else 0), None
+
 @app.route('/complete_review', methods=['POST'])
 def complete_review():
+    """
+    Queue generation of the reviewed document (and the optional S3 export)
+
+    Document generation and the S3 export used to run inside this request and
+    could approach the gunicorn timeout on large documents. The request now
+    only queues run_complete_review and returns its task_id: progress and the
+    result (output_file, download_url, s3_export) come from
+    /task_status/<task_id>, the document itself from /download/<output_file>.
+    """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         session_id = data.get('session_id') or session.get('session_id')
-        export_to_s3 = data.get('export_to_s3', False)
-        
+        export_to_s3 = bool(data.get('export_to_s3', False))
+
         if not session_id or not session_exists(session_id):
             return jsonify({'error': 'Invalid session'}), 400
-        
-        review_session = get_session(session_id)
-        
-        # Prepare comments data
-        comments_data = []
 
-        # DEBUG: Log accepted feedback collection
-        print(f"\n{'='*60}")
-        print(f"🔍 DEBUGGING COMMENT INSERTION")
-        print(f"{'='*60}")
-        print(f"Total sections in document: {len(review_session.sections)}")
-        print(f"Total accepted_feedback sections: {len(review_session.accepted_feedback)}")
+        # Runs in this process (it needs the session and the uploaded file), like upload parsing
+        job = get_task_manager().enqueue(
+            run_complete_review,
+            args=(session_id, export_to_s3),
+            session_id=session_id
+        )
 
-        for section_name, accepted_items in review_session.accepted_feedback.items():
-            print(f"\n📍 Section: {section_name}")
-            print(f"   Accepted items: {len(accepted_items)}")
-            print(f"   Has paragraph_indices: {section_name in review_session.paragraph_indices}")
+        return jsonify({
+            'success': True,
+            'task_id': job.id,
+            'status': 'queued',
+            'message': 'Review completion started in background',
+            'async': True
+        })
 
-            if section_name in review_session.paragraph_indices:
-                para_indices = review_session.paragraph_indices[section_name]
-                print(f"   Paragraph indices: {para_indices}")
+    except Exception as e:
+        return jsonify({'error': f'Complete review failed: {str(e)}'}), 500
 
-                for item in accepted_items:
-                    comment_text = f"[{item.get('type', 'feedback').upper()} - {item.get('risk_level', 'Low')} Risk]\n"
-                    comment_text += f"{item.get('description', '')}\n"
+def run_complete_review(session_id, export_to_s3=False):
+    """
+    Background task: create the reviewed document, export it to S3 if requested and save the review
 
-                    if item.get('suggestion'):
-                        comment_text += f"\nSuggestion: {item['suggestion']}\n"
+    Reports progress through update_task_progress (/task_status/<task_id>).
 
-                    if item.get('questions'):
-                        comment_text += "\nKey Questions:\n"
-                        for i, q in enumerate(item['questions'], 1):
-                            comment_text += f"{i}. {q}\n"
+    Returns:
+        Dict with success, output_file, download_url, comments_count and s3_export (if requested)
 
-                    if item.get('hawkeye_refs'):
-                        refs = [f"#{r}" for r in item['hawkeye_refs']]
-                        comment_text += f"\nHawkeye References: {', '.join(refs)}"
+    Raises:
+        RuntimeError: Session gone or document could not be created
+    """
+    review_session = get_session(session_id)
+    if review_session is None:
+        raise RuntimeError('Invalid session')
 
-                    comment_item = {
-                        'section': section_name,
-                        'paragraph_index': para_indices[0] if para_indices else 0,
-                        'comment': comment_text,
-                        'type': item.get('type', 'feedback'),
-                        'risk_level': item.get('risk_level', 'Low'),
-                        'author': 'User Feedback' if item.get('user_created') else 'AI Feedback'
-                    }
-                    comments_data.append(comment_item)
-                    print(f"   ✅ Added comment: {item.get('type')} - {comment_text[:50]}...")
-            else:
-                print(f"   ⚠️ No paragraph_indices for section: {section_name}")
+    # Log entries added by this task (only these are merged back - see save_review_output)
+    activities_before = len(review_session.activity_logger.activities)
+    activity_log_before = len(review_session.activity_log)
 
-        print(f"\n{'='*60}")
-        print(f"📊 FINAL COMMENT DATA:")
-        print(f"Total comments to add: {len(comments_data)}")
-        print(f"{'='*60}\n")
-        
-        # Create reviewed document with tracking
-        output_filename = f"reviewed_{review_session.document_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+    update_task_progress(20, 'Collecting accepted feedback')
+
+    # Prepare comments data
+    comments_data = []
+
+    # DEBUG: Log accepted feedback collection
+    print(f"\n{'='*60}")
+    print(f"🔍 DEBUGGING COMMENT INSERTION")
+    print(f"{'='*60}")
+    print(f"Total sections in document: {len(review_session.sections)}")
+    print(f"Total accepted_feedback sections: {len(review_session.accepted_feedback)}")
+
+    for section_name, accepted_items in review_session.accepted_feedback.items():
+        print(f"\n📍 Section: {section_name}")
+        print(f"   Accepted items: {len(accepted_items)}")
+        print(f"   Has paragraph_indices: {section_name in review_session.paragraph_indices}")
+
+        if section_name in review_session.paragraph_indices:
+            para_indices = review_session.paragraph_indices[section_name]
+            print(f"   Paragraph indices: {para_indices}")
+
+            for item in accepted_items:
+                comment_text = f"[{item.get('type', 'feedback').upper()} - {item.get('risk_level', 'Low')} Risk]\n"
+                comment_text += f"{item.get('description', '')}\n"
+
+                if item.get('suggestion'):
+                    comment_text += f"\nSuggestion: {item['suggestion']}\n"
+
+                if item.get('questions'):
+                    comment_text += "\nKey Questions:\n"
+                    for i, q in enumerate(item['questions'], 1):
+                        comment_text += f"{i}. {q}\n"
+
+                if item.get('hawkeye_refs'):
+                    refs = [f"#{r}" for r in item['hawkeye_refs']]
+                    comment_text += f"\nHawkeye References: {', '.join(refs)}"
+
+                paragraph_index, highlight_span = locate_feedback(review_session, section_name, item, para_indices)
+                comment_item = {
+                    'section': section_name,
+                    'paragraph_index': paragraph_index,
+                    'highlight_span': highlight_span,
+                    'comment': comment_text,
+                    'type': item.get('type', 'feedback'),
+                    'risk_level': item.get('risk_level', 'Low'),
+                    'author': 'User Feedback' if item.get('user_created') else 'AI Feedback'
+                }
+                comments_data.append(comment_item)
+                print(f"   ✅ Added comment: {item.get('type')} - {comment_text[:50]}...")
+        else:
+            print(f"   ⚠️ No paragraph_indices for section: {section_name}")
+
+    print(f"\n{'='*60}")
+    print(f"📊 FINAL COMMENT DATA:")
+    print(f"Total comments to add: {len(comments_data)}")
+    print(f"{'='*60}\n")
+    
+    # Create reviewed document with tracking
+    output_filename = f"reviewed_{review_session.document_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+    
+    review_session.activity_logger.start_operation('document_generation', {
+        'comments_count': len(comments_data),
+        'output_filename': output_filename
+    })
+    update_task_progress(40, f'Adding {len(comments_data)} comments to the document')
+    output_path = cpu_offload.run(
+        doc_processor.create_document_with_comments,
+        review_session.document_path,
+        comments_data,
+        output_filename,
+        cache_key=session_id  # Re-exports only apply the comments that changed
+    )
+    
+    if output_path:
+        file_size = os.path.getsize(output_path)
+        review_session.activity_logger.complete_operation(success=True, details={
+            'output_file': output_filename,
+            'file_size_bytes': file_size
+        })
         
-        review_session.activity_logger.start_operation('document_generation', {
-            'comments_count': len(comments_data),
-            'output_filename': output_filename
+        # Log completion
+        review_session.activity_logger.log_session_event('review_completed', {
+            'comments_added': len(comments_data),
+            'output_file': output_filename,
+            'file_size_mb': round(file_size / (1024 * 1024), 2)
         })
-        output_path = doc_processor.create_document_with_comments(
-            review_session.document_path,
-            comments_data,
-            output_filename
-        )
         
-        if output_path:
-            file_size = os.path.getsize(output_path)
-            review_session.activity_logger.complete_operation(success=True, details={
-                'output_file': output_filename,
-                'file_size_bytes': file_size
-            })
-            
-            # Log completion
-            review_session.activity_logger.log_session_event('review_completed', {
-                'comments_added': len(comments_data),
-                'output_file': output_filename,
-                'file_size_mb': round(file_size / (1024 * 1024), 2)
-            })
-            
-            review_session.activity_log.append({
-                'timestamp': datetime.now().isoformat(),
-                'action': 'REVIEW_COMPLETED',
-                'details': f'Review completed with {len(comments_data)} comments added'
-            })
+        review_session.activity_log.append({
+            'timestamp': datetime.now().isoformat(),
+            'action': 'REVIEW_COMPLETED',
+            'details': f'Review completed with {len(comments_data)} comments added'
+        })
 
-            # Store output filename in session for retrieval
-            review_session.output_filename = output_filename
+        # Store output filename in session for retrieval
+        review_session.output_filename = output_filename
 
-            response_data = {
-                'success': True,
-                'output_file': output_filename,
-                'comments_count': len(comments_data)
-            }
-            
-            # Export to S3 if requested
-            if export_to_s3:
-                try:
-                    review_session.activity_logger.start_operation('s3_export', {
-                        'before_document': review_session.document_path,
-                        'after_document': output_path
+        response_data = {
+            'success': True,
+            'output_file': output_filename,
+            'comments_count': len(comments_data)
+        }
+        
+        # Export to S3 if requested
+        if export_to_s3:
+            update_task_progress(70, 'Exporting review to S3')
+            try:
+                review_session.activity_logger.start_operation('s3_export', {
+                    'before_document': review_session.document_path,
+                    'after_document': output_path
+                })
+                
+                export_result = s3_export_manager.export_complete_review_to_s3(
+                    review_session,
+                    review_session.document_path,  # before document
+                    output_path  # after document
+                )
+                response_data['s3_export'] = export_result
+                
+                # Log S3 export with detailed tracking
+                if export_result.get('success'):
+                    review_session.activity_logger.complete_operation(success=True, details={
+                        'location': export_result.get('location'),
+                        'files_uploaded': export_result.get('total_files', 0),
+                        'folder_name': export_result.get('folder_name')
                     })
                     
-                    export_result = s3_export_manager.export_complete_review_to_s3(
-                        review_session,
-                        review_session.document_path,  # before document
-                        output_path  # after document
-                    )
-                    response_data['s3_export'] = export_result
-                    
-                    # Log S3 export with detailed tracking
-                    if export_result.get('success'):
-                        review_session.activity_logger.complete_operation(success=True, details={
+                    review_session.activity_logger.log_s3_operation(
+                        'export_complete_review',
+                        success=True,
+                        details={
                             'location': export_result.get('location'),
-                            'files_uploaded': export_result.get('total_files', 0),
+                            'files_count': export_result.get('total_files', 0),
+                            'bucket': export_result.get('bucket'),
                             'folder_name': export_result.get('folder_name')
-                        })
-                        
-                        review_session.activity_logger.log_s3_operation(
-                            'export_complete_review',
-                            success=True,
-                            details={
-                                'location': export_result.get('location'),
-                                'files_count': export_result.get('total_files', 0),
-                                'bucket': export_result.get('bucket'),
-                                'folder_name': export_result.get('folder_name')
-                            }
-                        )
-                        
-                        review_session.activity_log.append({
-                            'timestamp': datetime.now().isoformat(),
-                            'action': 'S3_EXPORT_COMPLETED',
-                            'details': f'Complete review exported to {export_result.get("location", "S3")}'
-                        })
-                    else:
-                        review_session.activity_logger.complete_operation(success=False, error=export_result.get('error'))
-                        
-                        review_session.activity_logger.log_s3_operation(
-                            'export_complete_review',
-                            success=False,
-                            error=export_result.get('error')
-                        )
-                        
-                        review_session.activity_log.append({
-                            'timestamp': datetime.now().isoformat(),
-                            'action': 'S3_EXPORT_FAILED',
-                            'details': f'S3 export failed: {export_result.get("error", "Unknown error")}'
-                        })
-                        
-                except Exception as s3_error:
-                    review_session.activity_logger.complete_operation(success=False, error=str(s3_error))
+                        }
+                    )
+                    
+                    review_session.activity_log.append({
+                        'timestamp': datetime.now().isoformat(),
+                        'action': 'S3_EXPORT_COMPLETED',
+                        'details': f'Complete review exported to {export_result.get("location", "S3")}'
+                    })
+                else:
+                    review_session.activity_logger.complete_operation(success=False, error=export_result.get('error'))
+                    
                     review_session.activity_logger.log_s3_operation(
                         'export_complete_review',
                         success=False,
-                        error=str(s3_error)
+                        error=export_result.get('error')
                     )
                     
-                    print(f"S3 export error: {str(s3_error)}")
-                    response_data['s3_export'] = {
-                        'success': False,
-                        'error': str(s3_error),
-                        'location': 'failed'
-                    }
-
-            # ✅ NEW: Save completion to database
-            try:
-                stats = stats_manager.get_statistics()
-                s3_loc = export_result.get('location') if export_to_s3 and export_result.get('success') else None
-
-                db_manager.complete_review(
-                    session_id=session_id,
-                    output_filename=output_filename,
-                    stats=stats,
-                    s3_location=s3_loc
+                    review_session.activity_log.append({
+                        'timestamp': datetime.now().isoformat(),
+                        'action': 'S3_EXPORT_FAILED',
+                        'details': f'S3 export failed: {export_result.get("error", "Unknown error")}'
+                    })
+                    
+            except Exception as s3_error:
+                review_session.activity_logger.complete_operation(success=False, error=str(s3_error))
+                review_session.activity_logger.log_s3_operation(
+                    'export_complete_review',
+                    success=False,
+                    error=str(s3_error)
                 )
-                print(f"✅ Database: Review completed and saved for {session_id}")
-            except Exception as db_error:
-                print(f"⚠️ Database completion error: {db_error}")
+                
+                print(f"S3 export error: {str(s3_error)}")
+                response_data['s3_export'] = {
+                    'success': False,
+                    'error': str(s3_error),
+                    'location': 'failed'
+                }
 
-            return jsonify(response_data)
-        else:
-            review_session.activity_logger.complete_operation(success=False, error='Failed to create reviewed document')
-            return jsonify({'error': 'Failed to create reviewed document'}), 500
-        
-    except Exception as e:
-        return jsonify({'error': f'Complete review failed: {str(e)}'}), 500
+        # ✅ NEW: Save completion to database
+        update_task_progress(90, 'Saving review')
+        try:
+            stats = stats_manager.get_statistics()
+            s3_loc = export_result.get('location') if export_to_s3 and export_result.get('success') else None
+
+            db_manager.complete_review(
+                session_id=session_id,
+                output_filename=output_filename,
+                stats=stats,
+                s3_location=s3_loc
+            )
+            print(f"✅ Database: Review completed and saved for {session_id}")
+        except Exception as db_error:
+            print(f"⚠️ Database completion error: {db_error}")
+
+        save_review_output(session_id, review_session, output_filename, activities_before, activity_log_before)
+
+        response_data['download_url'] = f"/download/{output_filename}"
+        return response_data
+    else:
+        review_session.activity_logger.complete_operation(success=False, error='Failed to create reviewed document')
+        raise RuntimeError('Failed to create reviewed document')
+
+def save_review_output(session_id, task_session, output_filename, activities_before, activity_log_before):
+    """
+    Store a completed review's output in the current session
+
+    The task's copy of the session was loaded before document generation and
+    the S3 export, which can take minutes; accepts, rejects and feedback made
+    meanwhile must survive. The session is reloaded and only output_filename
+    and the task's own log entries are applied to it.
+    """
+    review_session = get_session(session_id)
+    if review_session is None:
+        return
+    if review_session is not task_session:  # In-memory sessions are the same object
+        review_session.activity_logger.activities.extend(task_session.activity_logger.activities[activities_before:])
+        review_session.activity_log.extend(task_session.activity_log[activity_log_before:])
+    review_session.output_filename = output_filename
+    set_session(session_id, review_session)
 
 @app.route('/download/<filename>')
 def download_file(filename):
@@ -2528,9 +3041,11 @@ def export_to_s3():
                         refs = [f"#{r}" for r in item['hawkeye_refs']]
                         comment_text += f"\nHawkeye References: {', '.join(refs)}"
                     
+                    paragraph_index, highlight_span = locate_feedback(review_session, section_name, item, para_indices)
                     comments_data.append({
                         'section': section_name,
-                        'paragraph_index': para_indices[0] if para_indices else 0,
+                        'paragraph_index': paragraph_index,
+                        'highlight_span': highlight_span,
                         'comment': comment_text,
                         'type': item.get('type', 'feedback'),
                         'risk_level': item.get('risk_level', 'Low'),
@@ -2539,10 +3054,12 @@ def export_to_s3():
         
         # Create reviewed document
         output_filename = f"reviewed_{review_session.document_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        output_path = doc_processor.create_document_with_comments(
+        output_path = cpu_offload.run(
+            doc_processor.create_document_with_comments,
             review_session.document_path,
             comments_data,
-            output_filename
+            output_filename,
+            cache_key=session_id  # Re-exports only apply the comments that changed
         )
         
         if not output_path:
@@ -2942,13 +3459,15 @@ def reset_model_cooldowns():
 # CELERY TASK MANAGEMENT HELPERS
 # ============================================================================
 
-def get_task_status(task_id):
+def get_task_status(task_id, session_id=None):
     """
     Get Celery task status and result from S3 backend
 
     ✅ RQ Version: Results stored directly in Redis (NO S3 polling needed!)
     Much simpler than Celery + S3 backend.
 
+    session_id: Session asking (session_applied is reported for this session)
+
     Returns dict with task state and result (if completed)
     """
     print(f"📊 [CHECKPOINT] Fetching RQ task status for: {task_id}", flush=True)
@@ -2956,106 +3475,197 @@ def get_task_status(task_id):
     try:
         # Fetch job from RQ (simple!)
         job = Job.fetch(task_id, connection=redis_conn)
+        return build_task_status(job, session_id=session_id)
 
-        # Get job status - RQ has clear states
-        job_status = job.get_status()  # queued, started, finished, failed, deferred, scheduled, stopped, canceled
+    except Exception as e:
+        # Job not found or error accessing Redis
+        print(f"⚠️ Error fetching RQ job {task_id}: {e}", flush=True)
 
-        # Build response
+        # Return pending state if job not found
         response = {
             'task_id': task_id,
-            'state': job_status.upper(),  # Convert to uppercase like Celery states
-            'ready': job.is_finished or job.is_failed
+            'state': 'PENDING',
+            'status': 'Task not found or Redis connection error',
+            'progress': 0,
+            'ready': False,
+            'error': str(e)
         }
+        return response
+
 
+def build_task_status(job, verbose=True, session_id=None):
+    """
+    Build the task status response for an already fetched RQ job
+
+    Uses the status loaded with the job (no extra round trip); the result is
+    read from job._cached_result when prefetched (see prefetch_job_results).
+
+    Args:
+        job: RQ Job
+        verbose: Log the state (off for batch lookups)
+        session_id: Session asking (session_applied is reported for this session)
+
+    Returns:
+        Dict with task state and result (if completed)
+    """
+    task_id = job.id
+
+    # Get job status - RQ has clear states
+    job_status = job.get_status(refresh=False)  # queued, started, finished, failed, deferred, scheduled, stopped, canceled
+
+    # Build response
+    response = {
+        'task_id': task_id,
+        'state': (job_status or 'pending').upper(),  # Convert to uppercase like Celery states
+        'ready': job_status in ('finished', 'failed')
+    }
+
+    if verbose:
         print(f"   RQ Job state: {job_status}, Ready: {response['ready']}", flush=True)
 
-        # Handle different states
-        if job.is_finished:
-            # Job completed successfully
-            response['state'] = 'SUCCESS'
-            response['status'] = 'Task completed successfully'
-            response['progress'] = 100
-            response['result'] = job.result
+    # Handle different states
+    if job_status == 'finished':
+        # Job completed successfully
+        response['state'] = 'SUCCESS'
+        response['status'] = 'Task completed successfully'
+        response['progress'] = 100
+        # Large results are stored compressed or spilled by reference (rq_results)
+        response['result'] = unpack_result(job.return_value(refresh=False))
+        # Analysis feedback already written to this session by the worker (rq_session_store)
+        response['session_applied'] = is_session_applied(job, session_id)
+        # Queue time vs execution (Bedrock) time, from the job's timestamps
+        timing = job_timing(job)
+        if timing['wait'] is not None and timing['run'] is not None:
+            response['timing'] = {'queue_wait': round(timing['wait'], 3), 'run_time': round(timing['run'], 3)}
+        if verbose:
             print(f"✅ [RQ] Task SUCCESS, result keys: {response['result'].keys() if isinstance(response['result'], dict) else 'not a dict'}", flush=True)
 
-        elif job.is_failed:
-            # Job failed
-            response['state'] = 'FAILURE'
-            response['status'] = 'Task failed'
-            response['progress'] = 0
-            response['error'] = job.exc_info if job.exc_info else 'Unknown error'
+    elif job_status == 'failed':
+        # Job failed
+        response['state'] = 'FAILURE'
+        response['status'] = 'Task failed'
+        response['progress'] = 0
+        failure = job.meta.get('failure') or {}
+        response['error'] = failure.get('error') or job.exc_info or 'Unknown error'
+        response['error_category'] = failure.get('category')
+        if verbose:
             print(f"❌ [RQ] Task FAILURE: {response['error']}", flush=True)
 
-        elif job.is_started:
-            # Job is currently running
-            response['state'] = 'PROGRESS'
-            response['status'] = 'Task is running'
-            response['progress'] = job.meta.get('progress', 50) if hasattr(job, 'meta') else 50
+    elif job_status in ('canceled', 'stopped'):
+        # Job was cancelled (queued) or stopped (running)
+        response['state'] = 'REVOKED'
+        response['status'] = 'Task was cancelled'
+        response['progress'] = 0
+        response['ready'] = True
+        if verbose:
+            print(f"🛑 [RQ] Task REVOKED ({job_status})", flush=True)
+
+    elif job_status == 'started':
+        # Job is currently running
+        response['state'] = 'PROGRESS'
+        response['status'] = 'Task is running'
+        response['progress'] = job.meta.get('progress', 50) if hasattr(job, 'meta') else 50
+        if verbose:
             print(f"⏳ [RQ] Task PROGRESS: {response['progress']}%", flush=True)
 
-        elif job.is_queued or job.is_deferred:
-            # Job is waiting in queue
-            response['state'] = 'PENDING'
-            response['status'] = 'Task is queued'
-            response['progress'] = 0
+    else:
+        # Job is waiting in queue (queued, deferred, scheduled - e.g. waiting to retry)
+        response['state'] = 'PENDING'
+        response['status'] = 'Retrying after a temporary error' if job.meta.get('failure') else 'Task is queued'
+        response['progress'] = 0
+        if verbose:
             print(f"⏸️  [RQ] Task PENDING (queued)", flush=True)
 
-        return response
+    return response
 
-    except Exception as e:
-        # Job not found or error accessing Redis
-        print(f"⚠️ Error fetching RQ job {task_id}: {e}", flush=True)
 
-        # Return pending state if job not found
-        response = {
-            'task_id': task_id,
-            'state': 'PENDING',
-            'status': 'Task not found or Redis connection error',
-            'progress': 0,
-            'ready': False,
-            'error': str(e)
-        }
-        return response
+def prefetch_job_results(jobs):
+    """
+    Load the latest result of every finished/failed job in ONE pipeline
 
-    # Should never reach here due to early returns in try/except
-    return response
+    Without this, reading job.return_value / job.exc_info costs a Redis
+    round trip per job.
 
+    Pinned to rq==1.15.1 (requirements.txt): it relies on RQ internals -
+    Result.get_key / Result.restore and the Job._cached_result attribute that
+    return_value(refresh=False) reads. If any of them is missing (RQ upgrade)
+    nothing is prefetched and build_task_status falls back to job.return_value()
+    fetching each result itself.
 
-def get_queue_stats():
+    Args:
+        jobs: RQ Jobs (None entries are skipped)
     """
-    Get Celery queue statistics
+    from rq.results import Result
+
+    done_jobs = [job for job in jobs if job is not None and job.get_status(refresh=False) in ('finished', 'failed')]
+    if not done_jobs or not done_jobs[0].supports_redis_streams:
+        return
+    if not (hasattr(Result, 'get_key') and hasattr(Result, 'restore') and hasattr(done_jobs[0], '_cached_result')):
+        return
+
+    with redis_conn.pipeline() as pipe:
+        for job in done_jobs:
+            pipe.xrevrange(Result.get_key(job.id), '+', '-', count=1)
+        responses = pipe.execute()
+
+    for job, response in zip(done_jobs, responses):
+        if response:
+            result_id, payload = response[0]
+            try:
+                job._cached_result = Result.restore(
+                    job.id, result_id.decode(), payload, connection=redis_conn, serializer=job.serializer
+                )
+            except Exception as e:
+                # Internal API changed - leave it to job.return_value()
+                print(f"⚠️ Could not prefetch result of job {job.id[:8]}: {e}")
+                return
 
-    Returns dict with queue stats and worker info
+
+def run_local_section_analysis(cache_key, section_name, content, session_id):
     """
-    from celery_config import celery_app
+    Local backend task: analyze a section, sharing one Bedrock call with identical in-flight requests
 
-    try:
-        # Get active tasks
-        inspect = celery_app.control.inspect()
+    Raises:
+        RuntimeError: Analysis failed (the task is recorded as FAILURE, as on RQ)
+    """
+    result, _ = analysis_coalescer.do(cache_key, analyze_section_sync, section_name, content, "Full Write-up", session_id)
+    if not result.get('success'):
+        raise RuntimeError(result.get('error') or 'Analysis failed')
+    return result
 
-        active_tasks = inspect.active() or {}
-        scheduled_tasks = inspect.scheduled() or {}
-        registered_tasks = inspect.registered() or {}
 
-        # Count total active tasks across all workers
-        total_active = sum(len(tasks) for tasks in active_tasks.values())
-        total_scheduled = sum(len(tasks) for tasks in scheduled_tasks.values())
+def run_local_batch_analysis(cache_key, sections, session_id):
+    """
+    Local backend task: analyze a batch of small sections in one Bedrock call
+
+    Raises:
+        RuntimeError: Analysis failed (the task is recorded as FAILURE, as on RQ)
+    """
+    result, _ = analysis_coalescer.do(cache_key, analyze_sections_batch_sync, sections, "Full Write-up", session_id)
+    if not result.get('success'):
+        raise RuntimeError(result.get('error') or 'Batch analysis failed')
+    return result
 
-        # Get worker count
-        worker_count = len(active_tasks.keys())
 
+def get_queue_stats():
+    """
+    Get RQ queue statistics
+
+    Returns dict with depth, workers and wait/run p50/p95/p99 + throughput per
+    queue and work class (see rq_metrics)
+    """
+    if not RQ_ENABLED:
         return {
-            'available': True,
-            'workers': worker_count,
-            'active_tasks': total_active,
-            'scheduled_tasks': total_scheduled,
-            'registered_tasks': list(registered_tasks.values())[0] if registered_tasks else [],
-            'details': {
-                'active': active_tasks,
-                'scheduled': scheduled_tasks
-            }
+            'available': False,
+            'error': 'RQ not available',
+            'workers': 0,
+            'active_tasks': 0,
+            'scheduled_tasks': 0
         }
 
+    try:
+        return rq_get_queue_stats(redis_conn)
+
     except Exception as e:
         return {
             'available': False,
@@ -3070,43 +3680,128 @@ def get_queue_stats():
 # CELERY TASK MANAGEMENT ENDPOINTS
 # ============================================================================
 
+def apply_task_result(review_session, result):
+    """
+    Store an analysis task result in the session's feedback_data
+
+    Args:
+        review_session: ReviewSession to update (caller saves it)
+        result: Task result (single-section or batched)
+
+    Returns:
+        Number of sections updated (0 if the result carries no feedback)
+    """
+    if not isinstance(result, dict):
+        return 0
+
+    # Batched analysis results carry feedback for several sections
+    if result.get('batch') and 'results' in result:
+        store_section_feedback(review_session, {
+            section_name: section_result.get('feedback_items', [])
+            for section_name, section_result in result['results'].items()
+        })
+        print(f"✅ [TASK_STATUS] Stored batched feedback for {len(result['results'])} sections in backend session")
+        return len(result['results'])
+
+    # Check if result contains feedback items from analysis task
+    if 'feedback_items' in result and 'section' in result:
+        feedback_items = result.get('feedback_items', [])
+        store_section_feedback(review_session, {result['section']: feedback_items})
+        print(f"✅ [TASK_STATUS] Stored {len(feedback_items)} feedback items for section '{result['section']}' in backend session")
+        return 1
+
+    return 0
+
+
+@app.route('/task_status/batch', methods=['POST'])
+def task_status_batch():
+    """
+    Status of many RQ tasks in one request
+
+    All jobs (and the results of finished ones) are loaded with pipelined
+    Redis calls instead of one Job.fetch round trip per task. Completed
+    analysis results are stored in the session, same as /task_status/<task_id>.
+
+    Body: {"task_ids": [...], "session_id": "..."}
+    Returns: {"success": true, "tasks": {task_id: {state, progress, ready, result|error}}}
+    """
+    try:
+        if not RQ_ENABLED and not LOCAL_TASKS_ENABLED:
+            return jsonify({'error': 'RQ not available', 'state': 'UNAVAILABLE'}), 503
+
+        data = request.get_json(silent=True) or {}
+        task_ids = data.get('task_ids') or []
+
+        if not isinstance(task_ids, list) or not all(isinstance(t, str) for t in task_ids):
+            return jsonify({'success': False, 'error': 'task_ids must be a list of strings'}), 400
+        if len(task_ids) > MAX_BATCH_STATUS_TASKS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_STATUS_TASKS} task_ids per request'}), 400
+
+        task_ids = list(dict.fromkeys(task_ids))
+        session_id = data.get('session_id') or session.get('session_id')
+        if RQ_ENABLED:
+            jobs = Job.fetch_many(task_ids, connection=redis_conn)
+            prefetch_job_results(jobs)
+
+            tasks = {}
+            for task_id, job in zip(task_ids, jobs):
+                if job is None:
+                    tasks[task_id] = {'state': 'PENDING', 'status': 'Task not found', 'progress': 0, 'ready': False}
+                    continue
+                status = build_task_status(job, verbose=False, session_id=session_id)
+                status.pop('task_id', None)
+                tasks[task_id] = status
+        else:
+            tasks = get_task_manager().get_task_statuses(task_ids)
+            for status in tasks.values():
+                status.pop('task_id', None)
+
+        # Store completed feedback the worker could not apply itself, with ONE session load/save
+        completed = [
+            t['result'] for t in tasks.values()
+            if t.get('state') == 'SUCCESS' and t.get('result') and not t.get('session_applied')
+        ]
+        if completed and session_id and session_exists(session_id):
+            review_session = get_session(session_id)
+            if sum(apply_task_result(review_session, result) for result in completed):
+                set_session(session_id, review_session)
+
+        return jsonify({'success': True, 'tasks': tasks})
+
+    except Exception as e:
+        print(f"❌ [TASK_STATUS_BATCH] Error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/task_status/<task_id>', methods=['GET'])
 def task_status(task_id):
     """Get status of a Celery task"""
     try:
-        if not RQ_ENABLED:
+        session_id = request.args.get('session_id') or session.get('session_id')
+        if RQ_ENABLED and not get_task_manager().has_task(task_id):
+            status = get_task_status(task_id, session_id=session_id)
+        elif RQ_ENABLED or LOCAL_TASKS_ENABLED:
+            # In-process tasks (upload parsing, complete_review) also run alongside RQ
+            status = get_task_manager().get_task_status(task_id)
+        else:
             return jsonify({
                 'error': 'Celery not available',
                 'task_id': task_id,
                 'state': 'UNAVAILABLE'
             }), 503
 
-        status = get_task_status(task_id)
-
         # ✅ CRITICAL FIX: Store feedback_items in backend session when task completes
         # This fixes the "Feedback item not found" error when accepting/rejecting feedback
-        if status.get('state') == 'SUCCESS' and status.get('result'):
-            result = status.get('result')
-
-            # Check if result contains feedback items from analysis task
-            if isinstance(result, dict) and 'feedback_items' in result and 'section' in result:
-                section_name = result.get('section')
-                feedback_items = result.get('feedback_items', [])
-
-                # Get session_id from request parameter
-                session_id = request.args.get('session_id') or session.get('session_id')
-
-                if session_id and session_exists(session_id):
-                    review_session = get_session(session_id)
-
-                    # Store feedback in backend session (THIS WAS MISSING!)
-                    review_session.feedback_data[section_name] = feedback_items
-
-                    print(f"✅ [TASK_STATUS] Stored {len(feedback_items)} feedback items for section '{section_name}' in backend session")
+        # (Skipped when the worker already stored it - see rq_session_store)
+        if status.get('state') == 'SUCCESS' and status.get('result') and not status.get('session_applied'):
+            if session_id and session_exists(session_id):
+                review_session = get_session(session_id)
+                if apply_task_result(review_session, status['result']):
+                    set_session(session_id, review_session)
                     print(f"   Task ID: {task_id}")
                     print(f"   Session ID: {session_id}")
-                else:
-                    print(f"⚠️ [TASK_STATUS] Could not store feedback - session not found: {session_id}")
+            else:
+                print(f"⚠️ [TASK_STATUS] Could not store feedback - session not found: {session_id}")
 
         return jsonify(status)
 
@@ -3122,11 +3817,45 @@ def task_status(task_id):
         }), 500
 
 
+@app.route('/events', methods=['GET'])
+def events():
+    """
+    Server-Sent Events stream of task progress/completion for a session
+
+    Fed by Redis pub/sub (see rq_events). Streams are recycled every
+    SSE_MAX_STREAM_SECONDS; the browser's EventSource reconnects on its own.
+    Returns 503 without RQ so clients fall back to polling /task_status.
+    """
+    if not RQ_ENABLED:
+        return jsonify({'error': 'Task events not available'}), 503
+
+    session_id = request.args.get('session_id') or session.get('session_id')
+    if not session_id or not session_exists(session_id):
+        return jsonify({'error': 'Invalid session'}), 400
+
+    return Response(
+        stream_with_context(sse_stream(redis_conn, session_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering (nginx)
+        }
+    )
+
+
 @app.route('/queue_stats', methods=['GET'])
 def queue_stats():
-    """Get Celery queue statistics"""
+    """Get RQ queue statistics (depth, wait/run percentiles, throughput)"""
     try:
         stats = get_queue_stats()
+        stats['coalescing'] = analysis_coalescer.get_stats()
+        stats['parse_cache'] = parse_cache.get_stats()
+        stats['cpu_offload'] = cpu_offload.get_stats()
+        if RQ_ENABLED:
+            stats['scheduler'] = get_scheduler().get_stats()
+            stats['dead_letters'] = get_dead_letter_stats(redis_conn)
+        elif LOCAL_TASKS_ENABLED:
+            stats['local_tasks'] = get_task_manager().get_stats()
         return jsonify(stats)
 
     except Exception as e:
@@ -3138,21 +3867,41 @@ def queue_stats():
 
 @app.route('/cancel_task/<task_id>', methods=['POST'])
 def cancel_task(task_id):
-    """Cancel a running Celery task"""
+    """
+    Cancel an RQ task
+
+    Queued jobs are removed from their queue; running jobs are flagged and
+    sent a stop command. If session_id is given and other sessions share the
+    (coalesced) job, this session is only detached from it.
+    """
     try:
         if not RQ_ENABLED:
+            if LOCAL_TASKS_ENABLED:
+                cancelled = get_task_manager().cancel_task(task_id)
+                return jsonify({
+                    'success': True,
+                    'task_id': task_id,
+                    'cancelled': cancelled,
+                    'outcome': 'cancelled' if cancelled else 'running',
+                    'shared': False,
+                    'message': 'Task cancelled' if cancelled else 'Task is already running'
+                })
             return jsonify({
-                'error': 'Celery not available',
+                'error': 'RQ not available',
                 'cancelled': False
             }), 503
 
-        from celery_config import celery_app
-        celery_app.control.revoke(task_id, terminate=True, signal='SIGKILL')
+        data = request.get_json(silent=True) or {}
+        session_id = data.get('session_id') or request.args.get('session_id')
+
+        release = release_session_job(redis_conn, session_id, task_id)
 
         return jsonify({
             'success': True,
             'task_id': task_id,
-            'cancelled': True,
+            'cancelled': release['outcome'] in ('cancelled', 'stopping'),
+            'outcome': release['outcome'],
+            'shared': release['shared'],
             'message': 'Task cancellation requested'
         })
 
@@ -3163,6 +3912,80 @@ def cancel_task(task_id):
             'cancelled': False
         }), 500
 
+# ============================================================================
+# DEAD-LETTER QUEUE ADMIN ENDPOINTS
+# ============================================================================
+
+# Required in the X-Admin-Token header; admin endpoints are closed when unset
+ADMIN_API_TOKEN = os.environ.get('ADMIN_API_TOKEN')
+
+# Opt-in: without a token, allow connections made from this host (development only)
+ADMIN_ALLOW_LOCAL = os.environ.get('ADMIN_ALLOW_LOCAL', 'false').lower() == 'true'
+
+
+def is_admin_request():
+    """Check admin access (X-Admin-Token header; fails closed without ADMIN_API_TOKEN)"""
+    if ADMIN_API_TOKEN:
+        token = request.headers.get('X-Admin-Token') or ''
+        return hmac.compare_digest(token.encode('utf-8'), ADMIN_API_TOKEN.encode('utf-8'))
+    if ADMIN_ALLOW_LOCAL:
+        # The socket peer, not request.remote_addr - ProxyFix takes that from X-Forwarded-For
+        original = request.environ.get('werkzeug.proxy_fix.orig') or request.environ
+        return original.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
+    return False
+
+
+@app.route('/admin/dead_letters', methods=['GET'])
+def admin_dead_letters():
+    """
+    List failed RQ jobs in the dead-letter queue (see rq_dlq)
+
+    Query: category (transient|permanent), limit (default 100)
+    """
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    if not RQ_ENABLED:
+        return jsonify({'success': False, 'error': 'RQ not available'}), 503
+
+    try:
+        limit = request.args.get('limit', 100, type=int)
+        return jsonify({
+            'success': True,
+            'stats': get_dead_letter_stats(redis_conn),
+            'dead_letters': list_dead_letters(redis_conn, category=request.args.get('category'), limit=limit)
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/admin/dead_letters/replay', methods=['POST'])
+def admin_replay_dead_letters():
+    """
+    Requeue dead-lettered jobs (same job ids, fresh retries)
+
+    Body: {"job_ids": [...]} or {"category": "transient", "limit": 100}; empty = replay all
+    """
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    if not RQ_ENABLED:
+        return jsonify({'success': False, 'error': 'RQ not available'}), 503
+
+    try:
+        data = request.get_json(silent=True) or {}
+        job_ids = data.get('job_ids')
+        if job_ids is not None and (not isinstance(job_ids, list) or not all(isinstance(j, str) for j in job_ids)):
+            return jsonify({'success': False, 'error': 'job_ids must be a list of strings'}), 400
+
+        result = replay_dead_letters(
+            redis_conn,
+            job_ids=job_ids,
+            category=data.get('category'),
+            limit=data.get('limit')
+        )
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 # ============================================================================
 # APPLICATION STARTUP
 # ============================================================================
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+AI-Prism Bedrock Gateway (asyncio)
+
+A Bedrock call takes 10-60s and used to hold a whole sync worker, gevent
+greenlet or RQ process (with its own boto3 client) for that time, so
+concurrency was capped by process count and rate limiting was per process.
+
+How:
+- One asyncio process makes every Bedrock call; each in-flight call is a
+  coroutine, calls share one aiohttp connection pool (SigV4-signed with
+  botocore's signer - aiobotocore pins a botocore incompatible with ours)
+- Owns the rate limiter for the whole host: BEDROCK_MAX_RPM requests per
+  minute, GATEWAY_MAX_CONCURRENCY calls at once, and a backoff pause after
+  Bedrock throttles. Excess callers wait as coroutines, not processes
+- Owns a response cache (LRU + TTL) and coalesces identical concurrent
+  requests into one call
+- Exposes POST /invoke (newline-delimited JSON: keepalives, then one
+  result/error line) and GET /health on TCP or a Unix socket. Clients:
+  core.bedrock_gateway_client (rq_tasks and AIFeedbackEngine use it when
+  BEDROCK_GATEWAY_URL is set)
+- When every caller of a call disconnects (job cancelled), the call is
+  cancelled too
+
+Usage:
+    export BEDROCK_GATEWAY_URL=unix:///tmp/bedrock_gateway.sock
+    python bedrock_gateway.py                 # listens on BEDROCK_GATEWAY_URL
+    python bedrock_gateway.py --port 8765     # or an explicit TCP port
+    curl http://127.0.0.1:8765/health
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+from urllib.parse import quote, urlparse
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.async_request_manager import RateLimitConfig
+
+# Rate limits for the whole host (shared by every worker using the gateway)
+REQUESTS_PER_MINUTE = int(os.environ.get('BEDROCK_MAX_RPM', RateLimitConfig.MAX_REQUESTS_PER_MINUTE))
+MAX_CONCURRENCY = int(os.environ.get('GATEWAY_MAX_CONCURRENCY', '32'))
+
+# Response cache
+CACHE_SIZE = int(os.environ.get('GATEWAY_CACHE_SIZE', '512'))
+CACHE_TTL_SECONDS = int(os.environ.get('GATEWAY_CACHE_TTL', '3600'))
+
+# Default region for requests that don't name one
+DEFAULT_REGION = os.environ.get('BEDROCK_REGION', 'us-east-2')
+
+# Seconds between keepalive lines while a call is queued or running
+KEEPALIVE_SECONDS = 1.0
+
+# Bedrock HTTP timeouts (same as the boto3 client in rq_tasks)
+CONNECT_TIMEOUT = 15
+READ_TIMEOUT = 240
+
+# Error code by HTTP status when Bedrock sends no x-amzn-ErrorType
+STATUS_ERROR_CODES = {
+    400: 'ValidationException',
+    403: 'AccessDeniedException',
+    404: 'ResourceNotFoundException',
+    408: 'ModelTimeoutException',
+    429: 'ThrottlingException',
+    500: 'InternalServerException',
+    503: 'ServiceUnavailableException',
+}
+
+
+class BedrockCallError(Exception):
+    """A Bedrock call failed; code is the Bedrock error code (e.g. ThrottlingException)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+# ============================================================================
+# RATE LIMITER
+# ============================================================================
+
+class AsyncRateLimiter:
+    """
+    Requests-per-minute window + concurrency cap + throttle backoff
+
+    Callers are admitted in arrival order.
+
+    Args:
+        requests_per_minute: Calls started per rolling minute
+        max_concurrency: Calls running at once
+    """
+
+    def __init__(self, requests_per_minute: int, max_concurrency: int):
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._admission = asyncio.Lock()
+        self._started = deque()
+        self._throttled_until = 0.0
+        self._consecutive_throttles = 0
+        self.waiting = 0
+
+    async def acquire(self):
+        """Wait until a call may start"""
+        self.waiting += 1
+        try:
+            async with self._admission:
+                while True:
+                    now = time.time()
+                    while self._started and now - self._started[0] >= 60:
+                        self._started.popleft()
+
+                    delay = self._throttled_until - now
+                    if len(self._started) >= self.requests_per_minute:
+                        delay = max(delay, self._started[0] + 60 - now)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+
+                await self._semaphore.acquire()
+                self._started.append(time.time())
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+    def record_throttle(self):
+        """Pause new calls with exponential backoff after Bedrock throttles"""
+        self._consecutive_throttles += 1
+        backoff = min(
+            RateLimitConfig.INITIAL_BACKOFF_SECONDS * 2 ** (self._consecutive_throttles - 1),
+            RateLimitConfig.MAX_BACKOFF_SECONDS
+        )
+        self._throttled_until = max(self._throttled_until, time.time() + backoff)
+        print(f"🚫 [Gateway] Bedrock throttled - pausing new calls for {backoff}s", flush=True)
+
+    def record_success(self):
+        self._consecutive_throttles = 0
+
+    def calls_last_minute(self) -> int:
+        now = time.time()
+        return sum(1 for started in self._started if now - started < 60)
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+class ResponseCache:
+    """
+    LRU cache of Bedrock responses with a TTL
+
+    Args:
+        max_size: Max entries kept
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.time() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def request_key(model_id: str, region: str, body: Dict[str, Any]) -> str:
+    """Cache/coalescing key of a Bedrock request"""
+    raw = json.dumps([model_id, region, body], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# GATEWAY
+# ============================================================================
+
+class BedrockGateway:
+    """
+    Makes Bedrock calls for every client of this host
+
+    Args:
+        requests_per_minute: Rate limit
+        max_concurrency: Calls (and pooled connections) at once
+        cache_size: Response cache entries
+        cache_ttl: Response cache TTL (seconds)
+    """
+
+    def __init__(self, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 cache_size: int = CACHE_SIZE, cache_ttl: int = CACHE_TTL_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.limiter = AsyncRateLimiter(requests_per_minute, max_concurrency)
+        self.cache = ResponseCache(cache_size, cache_ttl)
+
+        self._session = None
+        self._credentials = None
+
+        # key -> [task, number of callers waiting on it]
+        self._inflight: Dict[str, list] = {}
+
+        self.stats = {
+            'requests': 0,
+            'bedrock_calls': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'abandoned': 0,
+            'throttles': 0,
+            'errors': 0,
+        }
+        self.started_at = time.time()
+
+    async def start(self):
+        """Open the shared connection pool and resolve AWS credentials"""
+        import aiohttp
+        import boto3
+
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+        )
+        self._credentials = boto3.Session().get_credentials()
+        if self._credentials is None:
+            print("⚠️  [Gateway] No AWS credentials found - Bedrock calls will fail", flush=True)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def submit(self, model_id: str, region: Optional[str], body: Dict[str, Any],
+               use_cache: bool = True):
+        """
+        Start (or join) a Bedrock call
+
+        Args:
+            model_id: Bedrock model id
+            region: AWS region (None = DEFAULT_REGION)
+            body: Request body
+            use_cache: Allow cached responses and joining identical calls
+
+        Returns:
+            (key, awaitable result). Every caller must call detach(key) when done.
+        """
+        region = region or DEFAULT_REGION
+        self.stats['requests'] += 1
+
+        key = request_key(model_id, region, body) if use_cache else uuid.uuid4().hex
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                future = asyncio.get_running_loop().create_future()
+                future.set_result({**cached, 'cached': True})
+                return None, future
+
+        entry = self._inflight.get(key)
+        if entry is not None:
+            entry[1] += 1
+            self.stats['coalesced'] += 1
+            return key, entry[0]
+
+        task = asyncio.ensure_future(self._call(model_id, region, body))
+        self._inflight[key] = [task, 1]
+        task.add_done_callback(lambda done: self._finished(key, done, use_cache))
+        return key, task
+
+    def detach(self, key: Optional[str]):
+        """A caller stopped waiting; cancel the call if nobody else waits on it"""
+        entry = self._inflight.get(key) if key else None
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0 and not entry[0].done():
+            self.stats['abandoned'] += 1
+            entry[0].cancel()
+
+    def _finished(self, key: str, task: asyncio.Task, use_cache: bool):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if use_cache and not task.cancelled() and task.exception() is None:
+            self.cache.put(key, task.result())
+
+    async def _call(self, model_id: str, region: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        await self.limiter.acquire()
+        try:
+            self.stats['bedrock_calls'] += 1
+            response = await self._post(model_id, region, body)
+            self.limiter.record_success()
+        except BedrockCallError as e:
+            self.stats['errors'] += 1
+            if e.code == 'ThrottlingException':
+                self.stats['throttles'] += 1
+                self.limiter.record_throttle()
+            raise
+        finally:
+            self.limiter.release()
+
+        content = response.get('content') or []
+        usage = response.get('usage') or {}
+        return {
+            'text': ''.join(block.get('text', '') for block in content if block.get('type', 'text') == 'text'),
+            'usage': {
+                'input_tokens': usage.get('input_tokens', 0),
+                'output_tokens': usage.get('output_tokens', 0)
+            },
+            'cached': False,
+            'response': response
+        }
+
+    async def _post(self, model_id: str, region: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """One signed InvokeModel request"""
+        import aiohttp
+        from botocore.auth import SigV4Auth
+        from botocore.awsrequest import AWSRequest
+        from yarl import URL
+
+        if self._credentials is None:
+            raise BedrockCallError('UnrecognizedClientException', 'No AWS credentials available')
+
+        url = f"https://bedrock-runtime.{region}.amazonaws.com/model/{quote(model_id, safe='')}/invoke"
+        payload = json.dumps(body).encode('utf-8')
+
+        # Refreshable (IAM role) credentials may hit the network - keep it off the loop
+        credentials = await asyncio.get_running_loop().run_in_executor(
+            None, self._credentials.get_frozen_credentials
+        )
+        request = AWSRequest(method='POST', url=url, data=payload, headers={
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+        SigV4Auth(credentials, 'bedrock', region).add_auth(request)
+
+        try:
+            async with self._session.post(URL(url, encoded=True), data=payload,
+                                          headers=dict(request.headers.items())) as response:
+                raw = await response.read()
+                status = response.status
+                error_type = response.headers.get('x-amzn-ErrorType', '')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise BedrockCallError('ServiceUnavailableException', f"Bedrock connection error: {e!r}")
+
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            data = {'message': raw[:200].decode('utf-8', 'replace')}
+
+        if status != 200:
+            code = error_type.split(':', 1)[0] or STATUS_ERROR_CODES.get(status, 'InternalServerException')
+            raise BedrockCallError(code, data.get('message') or data.get('Message') or f"HTTP {status}")
+
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'in_flight': len(self._inflight),
+            'waiting_for_rate_limit': self.limiter.waiting,
+            'calls_last_minute': self.limiter.calls_last_minute(),
+            'requests_per_minute_limit': self.limiter.requests_per_minute,
+            'max_concurrency': self.max_concurrency,
+            'cache_entries': len(self.cache),
+            'uptime_seconds': round(time.time() - self.started_at)
+        }
+
+
+# ============================================================================
+# HTTP API
+# ============================================================================
+
+def _line(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def create_app(gateway: Optional[BedrockGateway] = None):
+    """
+    aiohttp application exposing the gateway
+
+    Args:
+        gateway: BedrockGateway (default: a new one with env settings)
+
+    Returns:
+        aiohttp.web.Application
+    """
+    from aiohttp import web
+
+    gateway = gateway or BedrockGateway()
+
+    async def invoke(request):
+        try:
+            data = await request.json()
+            model_id = data['model_id']
+            body = data['body']
+        except (ValueError, KeyError) as e:
+            return web.json_response({'error': f"Invalid request: {e}"}, status=400)
+
+        key, result = gateway.submit(model_id, data.get('region'), body, data.get('cache', True))
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        try:
+            while not result.done():
+                await asyncio.wait({result}, timeout=KEEPALIVE_SECONDS)
+                if not result.done():
+                    await response.write(_line({'type': 'keepalive'}))
+
+            if result.cancelled():
+                message = {'type': 'error', 'code': 'ServiceUnavailableException', 'message': 'Call cancelled'}
+            elif isinstance(result.exception(), BedrockCallError):
+                error = result.exception()
+                message = {'type': 'error', 'code': error.code, 'message': error.message}
+            elif result.exception() is not None:
+                message = {'type': 'error', 'code': 'GatewayError', 'message': repr(result.exception())}
+            else:
+                message = {'type': 'result', **result.result()}
+
+            await response.write(_line(message))
+            await response.write_eof()
+        except ConnectionResetError:
+            # Caller went away (e.g. job cancelled)
+            pass
+        finally:
+            gateway.detach(key)
+        return response
+
+    async def health(request):
+        return web.json_response({'status': 'ok', **gateway.get_stats()})
+
+    async def on_startup(app):
+        await gateway.start()
+
+    async def on_cleanup(app):
+        await gateway.close()
+
+    app = web.Application()
+    app['gateway'] = gateway
+    app.router.add_post('/invoke', invoke)
+    app.router.add_get('/health', health)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI-Prism asyncio Bedrock gateway')
+    parser.add_argument('--host', default=None, help='TCP host (default: from BEDROCK_GATEWAY_URL)')
+    parser.add_argument('--port', type=int, default=None, help='TCP port (default: from BEDROCK_GATEWAY_URL)')
+    parser.add_argument('--socket', default=None, help='Unix socket path (default: from BEDROCK_GATEWAY_URL)')
+    args = parser.parse_args()
+
+    try:
+        from aiohttp import web
+    except ImportError:
+        print("❌ aiohttp is not installed - pip install aiohttp")
+        return 1
+
+    gateway_url = urlparse(os.environ.get('BEDROCK_GATEWAY_URL', '') or 'http://127.0.0.1:8765')
+    socket_path = args.socket
+    if socket_path is None and args.port is None and args.host is None and gateway_url.scheme == 'unix':
+        socket_path = gateway_url.path
+
+    print("=" * 60)
+    print("AI-Prism Bedrock Gateway")
+    print("=" * 60)
+    print(f"Listening on: {socket_path or f'{args.host or gateway_url.hostname}:{args.port or gateway_url.port}'}")
+    print(f"Rate limit: {REQUESTS_PER_MINUTE} req/min, {MAX_CONCURRENCY} concurrent")
+    print(f"Cache: {CACHE_SIZE} entries, {CACHE_TTL_SECONDS}s TTL")
+    print("=" * 60, flush=True)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        web.run_app(create_app(), path=socket_path, print=None)
+    else:
+        web.run_app(create_app(), host=args.host or gateway_url.hostname or '127.0.0.1',
+                    port=args.port or gateway_url.port or 8765, print=None)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark status-request latency in a gevent worker while large documents are parsed
+
+Reproduces a gunicorn gevent worker: one process, gevent monkey-patched,
+a pywsgi server answering /status, and concurrent upload parses
+(DocumentAnalyzer.extract_sections) in the same process. A client greenlet
+polls /status every 20 ms during the parses.
+
+Each mode runs in a fresh process:
+- inline:  CPU_OFFLOAD_WORKERS=0 (parsing on the event loop, as before)
+- offload: CPU offload pool (core/cpu_offload)
+
+Usage:
+    python benchmark_cpu_offload.py                 # 300 pages, 3 concurrent parses
+    python benchmark_cpu_offload.py --pages 100 --parses 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Seconds between status polls
+POLL_INTERVAL = 0.02
+
+
+def run_worker(doc_path, parses):
+    """Child process: parse while serving /status; prints a JSON result line"""
+    from gevent import monkey
+    monkey.patch_all()
+
+    import time
+    import urllib.request
+
+    import gevent
+    from gevent.pywsgi import WSGIServer
+
+    from core.cpu_offload import get_cpu_offload
+    from core.document_analyzer import DocumentAnalyzer
+
+    def status_app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'application/json')])
+        return [b'{"status": "ok"}']
+
+    server = WSGIServer(('127.0.0.1', 0), status_app, log=None)
+    server.start()
+    url = f"http://127.0.0.1:{server.server_port}/status"
+
+    latencies = []
+    done = []
+
+    def poll_status():
+        while not done:
+            start = time.perf_counter()
+            urllib.request.urlopen(url).read()
+            latencies.append(time.perf_counter() - start)
+            gevent.sleep(POLL_INTERVAL)
+
+    analyzer = DocumentAnalyzer()
+    backend = get_cpu_offload().backend
+    poller = gevent.spawn(poll_status)
+    gevent.sleep(0.2)  # Baseline polls
+    latencies.clear()
+
+    start = time.perf_counter()
+    jobs = [gevent.spawn(analyzer.extract_sections, doc_path, defer_ai=True) for _ in range(parses)]
+    gevent.joinall(jobs, raise_error=True)
+    elapsed = time.perf_counter() - start
+    done.append(True)
+    poller.join()
+    server.stop()
+
+    latencies.sort()
+    print(json.dumps({
+        'backend': backend,
+        'parse_seconds': elapsed,
+        'sections': len(jobs[0].value['sections']),
+        'status_requests': len(latencies),
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'max_ms': latencies[-1] * 1000
+    }))
+
+
+def run_mode(doc_path, parses, workers):
+    env = dict(os.environ, CPU_OFFLOAD_WORKERS=str(workers))
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', doc_path, '--parses', str(parses)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CPU offload pool under gevent')
+    parser.add_argument('--pages', type=int, default=300, help='Pages in the generated document')
+    parser.add_argument('--parses', type=int, default=3, help='Concurrent parses')
+    parser.add_argument('--workers', type=int, default=2, help='Offload threads for the offload run')
+    parser.add_argument('--worker', metavar='DOC', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.parses)
+        return
+
+    from benchmark_section_extraction import build_document
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.docx')
+        count = build_document(path, args.pages)
+        print(f"📄 Generated {args.pages} pages ({count} body paragraphs), {args.parses} concurrent parses")
+
+        results = {}
+        for mode, workers in (('inline', 0), ('offload', args.workers)):
+            result = run_mode(path, args.parses, workers)
+            results[mode] = result
+            print(f"{'🐢' if mode == 'inline' else '⚡'} {mode:7} ({result['backend']}): "
+                  f"parsing {result['parse_seconds']:.2f}s, {result['status_requests']} status requests served, "
+                  f"latency p50 {result['p50_ms']:.1f} ms / p95 {result['p95_ms']:.1f} ms / max {result['max_ms']:.1f} ms")
+
+        if results['inline']['sections'] != results['offload']['sections']:
+            raise SystemExit("❌ Parses returned different sections")
+        print(f"✅ Max status latency {results['inline']['max_ms'] / results['offload']['max_ms']:.1f}x lower with offload")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark DocumentAnalyzer parsing and section extraction on a large generated document
+
+Builds a synthetic investigation report (default ~200 pages) with
+python-docx, then compares:
+- parsing: the streaming reader (core.docx_reader) vs python-docx
+  Document() - time and memory held by the parsed paragraphs (what the
+  session kept), each measured in a fresh process (Linux /proc);
+  both must yield the same paragraph texts and style names
+- extraction: the section extractor vs the previous implementation, which
+  read doc.paragraphs (rebuilt from the XML on every access) inside its
+  loops; both must return the same sections
+
+Usage:
+    python benchmark_section_extraction.py                # 200 pages
+    python benchmark_section_extraction.py --pages 50
+    python benchmark_section_extraction.py --skip-legacy  # new extractor only
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import time
+
+from docx import Document
+
+from core.document_analyzer import DocumentAnalyzer
+from core.docx_reader import read_paragraphs
+
+# Roughly what fits on one page of a report
+PARAGRAPHS_PER_PAGE = 12
+
+WORDS = ("seller account investigation review evidence policy enforcement appeal "
+         "transaction payment risk customer listing verification outcome team").split()
+
+
+def build_document(path, pages, seed=7):
+    """Write a synthetic report with standard and title-case headers"""
+    rng = random.Random(seed)
+    analyzer = DocumentAnalyzer()
+    headers = analyzer.standard_sections + ["Appendix Notes", "Escalation Path", "Open Questions"]
+
+    doc = Document()
+    total = pages * PARAGRAPHS_PER_PAGE
+    written = 0
+    while written < total:
+        doc.add_heading(rng.choice(headers), level=1)
+        for _ in range(rng.randint(15, 60)):
+            if rng.random() < 0.05:
+                doc.add_paragraph("From: reviewer@example.com")
+            elif rng.random() < 0.1:
+                doc.add_paragraph("")
+            elif rng.random() < 0.02:
+                table = doc.add_table(rows=3, cols=3)
+                for cell in table._cells:
+                    cell.text = rng.choice(WORDS)
+            else:
+                doc.add_paragraph(' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))).capitalize() + '.')
+            written += 1
+    doc.save(path)
+    return written
+
+
+# ----------------------------------------------------------------------------
+# Previous implementation (kept here only as the baseline)
+# ----------------------------------------------------------------------------
+
+def legacy_extract_by_headers(analyzer, doc):
+    sections, section_paragraphs, paragraph_indices = {}, {}, {}
+    all_paragraphs = [(idx, para, para.text.strip()) for idx, para in enumerate(doc.paragraphs) if para.text.strip()]
+    section_headers = []
+
+    for idx, para, text in all_paragraphs:
+        if len(text) < 100:
+            for section_name in analyzer.standard_sections:
+                if section_name.lower() in text.lower():
+                    section_headers.append({'title': section_name, 'idx': idx})
+                    break
+            if re.match(r'^(\d+\.? )?[A-Z][a-z]+( [A-Z][a-z]+){0,3}$', text) and len(text.split()) <= 5:
+                section_headers.append({'title': text, 'idx': idx})
+
+    section_headers.sort(key=lambda x: x['idx'])
+    for i, header in enumerate(section_headers):
+        start_idx = header['idx']
+        end_idx = section_headers[i+1]['idx'] if i < len(section_headers) - 1 else len(doc.paragraphs)
+        content, paras, indices = [], [], []
+        for idx in range(start_idx, end_idx):
+            if idx < len(doc.paragraphs):
+                para = doc.paragraphs[idx]
+                text = para.text.strip()
+                if idx == start_idx or not text:
+                    continue
+                if any(text.startswith(prefix) for prefix in ["From:", "Sent:", "To:", "---"]):
+                    continue
+                content.append(text)
+                paras.append(para)
+                indices.append(idx)
+        if content:
+            sections[header['title']] = '\n\n'.join(content)
+            section_paragraphs[header['title']] = paras
+            paragraph_indices[header['title']] = indices
+
+    return sections, section_paragraphs, paragraph_indices
+
+
+def _rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _parse_in_child(path, parser_name, queue):
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    if parser_name == 'python-docx':
+        parsed = Document(path).paragraphs   # Paragraph proxies keep the whole tree alive
+        paragraphs = [(para.text, para.style.name) for para in parsed]
+    else:
+        parsed = read_paragraphs(path)
+        paragraphs = [(para.text, para.style_name) for para in parsed]
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _rss_mb() - baseline, paragraphs))
+
+
+def measure_parse(path, parser_name):
+    """Parse in a fresh process; returns (seconds, MB held by the parsed paragraphs, [(text, style)])"""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_parse_in_child, args=(path, parser_name, queue))
+    process.start()
+    elapsed, memory_mb, paragraphs = queue.get()
+    process.join()
+    return elapsed, memory_mb, paragraphs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark section extraction')
+    parser.add_argument('--pages', type=int, default=200, help='Pages in the generated document')
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the current parser and extractor')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'benchmark.docx')
+        count = build_document(path, args.pages)
+        print(f"📄 Generated {args.pages} pages ({count} body paragraphs, {os.path.getsize(path) / 1024:.0f} KB)")
+
+        analyzer = DocumentAnalyzer()
+
+        start = time.perf_counter()
+        sections, _, paragraph_indices = analyzer.extract_sections_from_docx(path)
+        total_time = time.perf_counter() - start
+
+        parse_time, parse_mb, records = measure_parse(path, 'docx_reader')
+        print(f"⚡ Parsing (docx_reader): {parse_time * 1000:.1f} ms, +{parse_mb:.1f} MB resident")
+
+        paragraphs = read_paragraphs(path)
+        texts = [para.text.strip() for para in paragraphs]
+        start = time.perf_counter()
+        analyzer._extract_by_headers(paragraphs, texts)
+        new_time = time.perf_counter() - start
+
+        print(f"⚡ Extraction: {new_time * 1000:.1f} ms ({total_time * 1000:.1f} ms including parsing)")
+
+        if args.skip_legacy:
+            return
+
+        old_parse_time, old_parse_mb, old_records = measure_parse(path, 'python-docx')
+        print(f"🐢 Parsing (python-docx): {old_parse_time * 1000:.1f} ms, +{old_parse_mb:.1f} MB resident "
+              f"({old_parse_time / parse_time:.1f}x slower)")
+        if old_records != records:
+            raise SystemExit("❌ Paragraphs differ from python-docx")
+
+        doc = Document(path)
+        start = time.perf_counter()
+        old_sections, _, old_indices = legacy_extract_by_headers(analyzer, doc)
+        old_time = time.perf_counter() - start
+
+        print(f"🐢 Previous extraction: {old_time * 1000:.1f} ms ({old_time / new_time:.0f}x slower)")
+
+        if old_sections != sections or old_indices != paragraph_indices:
+            raise SystemExit("❌ Results differ from the previous implementation")
+        print(f"✅ Identical results ({len(sections)} sections)")
+
+
+if __name__ == '__main__':
+    main()
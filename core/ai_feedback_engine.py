@@ -3,6 +3,7 @@ import re
 import boto3
 import os
 import sys
+import threading
 import time
 from datetime import datetime
 from collections import defaultdict
@@ -115,6 +116,43 @@ except ImportError:
     def get_default_models():
         return []
 
+from core.bedrock_gateway_client import is_gateway_enabled, GatewayRuntime
+from core.cpu_offload import get_cpu_offload
+
+
+def create_bedrock_runtime(region, boto_config=None):
+    """
+    Bedrock runtime client for invoke_model()
+
+    With BEDROCK_GATEWAY_URL set, calls go through the asyncio gateway
+    (bedrock_gateway.py) instead of a boto3 connection held by this worker;
+    the gateway also owns rate limiting and the response cache.
+    """
+    if is_gateway_enabled():
+        return GatewayRuntime(region)
+    if boto_config is not None:
+        return boto3.client('bedrock-runtime', region_name=region, config=boto_config)
+    return boto3.client('bedrock-runtime', region_name=region)
+
+
+# Shared clients per region (see get_bedrock_runtime)
+_bedrock_runtimes = {}
+_bedrock_runtimes_lock = threading.Lock()
+
+def get_bedrock_runtime(region):
+    """
+    Shared Bedrock runtime client for a region
+
+    boto3 clients are thread-safe; building one per call repeats credential
+    resolution and endpoint setup, which adds tens of milliseconds to every
+    request that only needs a single invoke_model().
+    """
+    with _bedrock_runtimes_lock:
+        runtime = _bedrock_runtimes.get(region)
+        if runtime is None:
+            runtime = _bedrock_runtimes[region] = create_bedrock_runtime(region)
+        return runtime
+
 class AIFeedbackEngine:
     def __init__(self, session_id=None):
         self.session_id = session_id  # For request manager user tracking
@@ -211,6 +249,7 @@ Return your analysis as a JSON object with this EXACT structure:
             "description": "Clear description of the issue or gap (max 200 chars)",
             "suggestion": "Specific recommendation to fix it (max 150 chars)",
             "example": "Brief example if helpful (max 100 chars)",
+            "quote": "Exact words from the content the issue is about (copied verbatim, one sentence at most; empty if it is about something missing)",
             "questions": ["Probing question 1?", "Question 2?"],
             "hawkeye_refs": [2, 5],
             "risk_level": "High|Medium|Low",
@@ -310,9 +349,25 @@ The JSON must have a "feedback_items" array containing your analysis."""
         if 'feedback_items' not in result:
             result['feedback_items'] = []
         
+        # Update result with filtered, deduplicated, and sorted items
+        result['feedback_items'] = self._validate_feedback_items(section_name, result.get('feedback_items', []))
+
+        # Only cache successful results (not errors or fallbacks)
+        # This prevents caching mock/fallback responses that would persist after fixes
+        if not result.get('error') and not result.get('fallback'):
+            self.feedback_cache[cache_key] = result
+            print(f"💾 Result cached for future requests")
+        else:
+            print(f"⚠️ Skipping cache for fallback/error response")
+
+        print(f"✅ Analysis complete: {len(result['feedback_items'])} feedback items (confidence >= 80%, sorted highest first)")  # ✅ FIX: Show ALL items >= 80%
+        return result
+
+    def _validate_feedback_items(self, section_name, feedback_items):
+        """Validate, confidence-filter, deduplicate and sort raw feedback items"""
         # Validate and enhance feedback items - process ALL items, filter by confidence later (✅ FIX: Removed limit, filter by confidence >= 80%)
         validated_items = []
-        for i, item in enumerate(result.get('feedback_items', [])):  # Process ALL items
+        for i, item in enumerate(feedback_items):  # Process ALL items
             if not isinstance(item, dict):
                 print(f"⚠️ Skipping invalid feedback item {i}: {type(item)}")
                 continue
@@ -325,50 +380,105 @@ The JSON must have a "feedback_items" array containing your analysis."""
                 'description': self._truncate_text(item.get('description', 'Analysis gap identified'), 1000),  # ✅ FIX: Increased from 100 to 1000
                 'suggestion': self._truncate_text(item.get('suggestion', ''), 500),  # ✅ FIX: Increased from 80 to 500
                 'example': self._truncate_text(item.get('example', ''), 300),  # ✅ FIX: Increased from 60 to 300
+                'quote': item.get('quote', '')[:500] if isinstance(item.get('quote'), str) else '',  # Verbatim excerpt - locates the comment (not truncated with "...")
                 'questions': item.get('questions', [])[:2] if isinstance(item.get('questions'), list) else [],  # Limit to 2 questions
                 'hawkeye_refs': item.get('hawkeye_refs', [])[:3] if isinstance(item.get('hawkeye_refs'), list) else [],  # Limit to 3 refs
                 'risk_level': item.get('risk_level', 'Low'),
                 'confidence': float(item.get('confidence', FEEDBACK_MIN_CONFIDENCE)) if isinstance(item.get('confidence'), (int, float)) else FEEDBACK_MIN_CONFIDENCE
             }
-            
+
             # Add hawkeye references if missing
             if not validated_item['hawkeye_refs']:
                 validated_item['hawkeye_refs'] = self._get_hawkeye_references(
-                    validated_item['category'], 
+                    validated_item['category'],
                     validated_item['description']
                 )[:2]  # Limit to 2 references
-            
+
             # Classify risk level if not provided or invalid
             if validated_item['risk_level'] not in ['High', 'Medium', 'Low']:
                 validated_item['risk_level'] = self._classify_risk_level(validated_item)
-            
+
             validated_items.append(validated_item)
 
         # ✅ FIX: Filter feedback items with confidence >= threshold (high quality only)
         high_confidence_items = [item for item in validated_items if item['confidence'] >= FEEDBACK_MIN_CONFIDENCE]
 
         # ✅ FIX: Remove duplicates and near-duplicates (similarity check)
-        unique_items = self._remove_duplicate_feedback(high_confidence_items)
+        # Pairwise SequenceMatcher is pure CPU - run it on the offload pool
+        unique_items = get_cpu_offload().run(self._remove_duplicate_feedback, high_confidence_items)
 
         # ✅ FIX: Sort by confidence in DESCENDING order (highest confidence first)
         # This ensures best quality feedback appears at the top
         unique_items.sort(key=lambda x: x['confidence'], reverse=True)
 
         print(f"📊 Filtered: {len(validated_items)} total → {len(high_confidence_items)} confidence>=80% → {len(unique_items)} unique items")
+        return unique_items
 
-        # Update result with filtered, deduplicated, and sorted items
-        result['feedback_items'] = unique_items
+    def analyze_sections_batch(self, sections, doc_type="Full Write-up"):
+        """
+        Analyze several small sections with a single Bedrock call
 
-        # Only cache successful results (not errors or fallbacks)
-        # This prevents caching mock/fallback responses that would persist after fixes
-        if not result.get('error') and not result.get('fallback'):
-            self.feedback_cache[cache_key] = result
-            print(f"💾 Result cached for future requests")
-        else:
-            print(f"⚠️ Skipping cache for fallback/error response")
+        Args:
+            sections: Dict of section name -> content (see core.section_batcher)
+            doc_type: Document type
 
-        print(f"✅ Analysis complete: {len(unique_items)} feedback items (confidence >= 80%, sorted highest first)")  # ✅ FIX: Show ALL items >= 80%
-        return result
+        Returns:
+            Dict of section name -> analysis result ({'feedback_items': [...]})
+        """
+        from core.section_batcher import build_batch_analysis_prompt, split_batch_response
+
+        results = {}
+        pending = {}
+        for section_name, content in sections.items():
+            cache_key = f"{section_name}_{hash(content)}"
+            if cache_key in self.feedback_cache:
+                results[section_name] = self.feedback_cache[cache_key]
+            else:
+                pending[section_name] = content
+
+        if not pending:
+            return results
+
+        prompt = build_batch_analysis_prompt(
+            {name: content[:8000] for name, content in pending.items()},
+            doc_type=doc_type
+        )
+        system_prompt = f"""You are an expert investigation analyst specializing in document review and quality assurance.
+
+Your task is to analyze investigation documents using the Hawkeye Investigation Framework:
+
+{self.hawkeye_checklist}
+
+OUTPUT FORMAT:
+You MUST respond with valid JSON only. No markdown code blocks, no explanatory text, just the JSON object.
+The JSON must have a "sections" object keyed by section name, each containing a "feedback_items" array."""
+
+        print(f"📦 Batched analysis of {len(pending)} sections in one request: {list(pending.keys())}")
+        response = self._invoke_bedrock(system_prompt, prompt)
+
+        try:
+            per_section = split_batch_response(response, list(pending.keys()))
+        except Exception as e:
+            # Error/mock responses are not keyed by section - analyze one by one instead
+            print(f"⚠️ Batched response unusable ({e}), falling back to per-section analysis")
+            for section_name, content in pending.items():
+                results[section_name] = self.analyze_section(section_name, content, doc_type)
+            return results
+
+        for section_name, feedback_items in per_section.items():
+            result = {'feedback_items': self._validate_feedback_items(section_name, feedback_items)}
+            self.feedback_cache[f"{section_name}_{hash(pending[section_name])}"] = result
+            results[section_name] = result
+
+        # Sections the model left out or misnamed get their own request (never cached as empty)
+        missing = [name for name in pending if name not in per_section]
+        if missing:
+            print(f"⚠️ Batched response missing {len(missing)} sections, analyzing individually: {missing}")
+            for section_name in missing:
+                results[section_name] = self.analyze_section(section_name, pending[section_name], doc_type)
+
+        print(f"✅ Batched analysis complete: {len(per_section)} sections")
+        return results
 
     def _get_section_guidance(self, section_name):
         """Get focused section-specific analysis guidance"""
@@ -499,11 +609,7 @@ The JSON must have a "feedback_items" array containing your analysis."""
                 retries={'max_attempts': 2, 'mode': 'standard'}  # 2 retries for reliability
             )
 
-            runtime = boto3.client(
-                'bedrock-runtime',
-                region_name=config['region'],
-                config=boto_config
-            )
+            runtime = create_bedrock_runtime(config['region'], boto_config)
 
             # Check credential source for logging
             if os.environ.get('AWS_ACCESS_KEY_ID'):
@@ -931,14 +1037,10 @@ Document Type: Full Write-up"""
         """Process chat with single primary model with exponential backoff retry"""
         try:
             # Use real Bedrock for chat
-            import boto3
             config = model_config.get_model_config()
 
             # Create Bedrock client using default credentials (works with both env vars and IAM roles)
-            runtime = boto3.client(
-                'bedrock-runtime',
-                region_name=config['region']
-            )
+            runtime = create_bedrock_runtime(config['region'])
 
             # Check credential source for logging
             if os.environ.get('AWS_ACCESS_KEY_ID'):
@@ -994,7 +1096,6 @@ Document Type: Full Write-up"""
 
     def _process_chat_with_fallback(self, system_prompt, prompt, query, context):
         """Process chat with automatic model fallback"""
-        import boto3
         from botocore.exceptions import ClientError
 
         config = model_config.get_model_config()
@@ -1037,7 +1138,7 @@ Document Type: Full Write-up"""
         print(f"🔄 Multi-model chat enabled - {len(models_to_try)} models available")
 
         # Create Bedrock runtime client using default credentials (works with both env vars and IAM roles)
-        runtime = boto3.client('bedrock-runtime', region_name=config['region'])
+        runtime = create_bedrock_runtime(config['region'])
 
         # Check credential source for logging
         if os.environ.get('AWS_ACCESS_KEY_ID'):
@@ -1118,10 +1219,7 @@ Document Type: Full Write-up"""
             config = model_config.get_model_config()
 
             # Create Bedrock client using default credentials (works with both env vars and IAM roles)
-            runtime = boto3.client(
-                'bedrock-runtime',
-                region_name=config['region']
-            )
+            runtime = create_bedrock_runtime(config['region'])
 
             # Check credential source for logging
             if os.environ.get('AWS_ACCESS_KEY_ID'):
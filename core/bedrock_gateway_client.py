@@ -0,0 +1,168 @@
+"""
+Client for the AI-Prism Bedrock Gateway (see bedrock_gateway.py)
+
+When BEDROCK_GATEWAY_URL is set, Bedrock calls from rq_tasks and
+AIFeedbackEngine go to the local asyncio gateway instead of holding a
+boto3 connection (and a whole worker/greenlet) for the full 10-60s call.
+The gateway owns the rate limiter, response cache and connection pool.
+
+Uses only the standard library (http.client), so the Flask app and RQ
+workers don't need aiohttp; under gevent the socket wait is cooperative.
+
+Errors are raised as botocore exceptions (ClientError with the Bedrock
+error code, EndpointConnectionError when the gateway is down), so the
+existing retry and failure classification (rq_retry) work unchanged.
+
+Usage:
+    BEDROCK_GATEWAY_URL=http://127.0.0.1:8765          (TCP)
+    BEDROCK_GATEWAY_URL=unix:///tmp/bedrock_gateway.sock (Unix socket)
+
+    from core.bedrock_gateway_client import is_gateway_enabled, invoke_via_gateway
+
+    if is_gateway_enabled():
+        response = invoke_via_gateway(model_id, request_body, region='us-east-2')
+        text = response['text']
+"""
+
+import http.client
+import io
+import json
+import os
+import socket
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+# Gateway location (unset = call Bedrock directly)
+GATEWAY_URL = os.environ.get('BEDROCK_GATEWAY_URL', '').strip()
+
+# Seconds to wait for the gateway to accept a connection
+CONNECT_TIMEOUT = 5
+
+# Seconds without any line from the gateway (it sends a keepalive every second)
+READ_TIMEOUT = 30
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def is_gateway_enabled() -> bool:
+    """Check whether Bedrock calls should go through the gateway"""
+    return bool(GATEWAY_URL)
+
+
+def _connect(timeout: float) -> http.client.HTTPConnection:
+    parsed = urlparse(GATEWAY_URL)
+    if parsed.scheme == 'unix':
+        return _UnixHTTPConnection(parsed.path, timeout=timeout)
+    return http.client.HTTPConnection(parsed.hostname or '127.0.0.1', parsed.port or 80, timeout=timeout)
+
+
+def _client_error(code: str, message: str, operation: str = 'InvokeModel'):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def invoke_via_gateway(model_id: str, body: Dict[str, Any], region: Optional[str] = None,
+                       use_cache: bool = True,
+                       on_wait: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Invoke a Bedrock model through the gateway
+
+    The gateway answers with newline-delimited JSON: a keepalive line every
+    second while the call is queued or running, then one result or error
+    line. on_wait runs for every keepalive, so callers can check for
+    cancellation; if it raises, the connection is closed and the gateway
+    abandons the call (unless other callers are waiting on the same one).
+
+    Args:
+        model_id: Bedrock model id
+        body: Bedrock request body (anthropic_version, messages, ...)
+        region: AWS region (default: the gateway's region)
+        use_cache: Allow a cached response for an identical request
+        on_wait: Called while waiting (e.g. raise_if_cancelled)
+
+    Returns:
+        Dict with text, usage (input_tokens/output_tokens), cached and
+        response (the raw Bedrock response body)
+
+    Raises:
+        ClientError: Bedrock (or the gateway) rejected the call
+        EndpointConnectionError: Gateway not reachable
+    """
+    from botocore.exceptions import EndpointConnectionError, ReadTimeoutError
+
+    payload = json.dumps({
+        'model_id': model_id,
+        'region': region,
+        'body': body,
+        'cache': use_cache
+    }).encode('utf-8')
+
+    connection = _connect(CONNECT_TIMEOUT)
+    try:
+        try:
+            connection.request('POST', '/invoke', body=payload,
+                               headers={'Content-Type': 'application/json'})
+            connection.sock.settimeout(READ_TIMEOUT)
+            response = connection.getresponse()
+        except (ConnectionError, socket.timeout, FileNotFoundError) as e:
+            raise EndpointConnectionError(endpoint_url=f"{GATEWAY_URL} ({e})")
+
+        if response.status != 200:
+            raise _client_error('GatewayError', f"HTTP {response.status}: {response.read()[:200]!r}")
+
+        while True:
+            try:
+                line = response.readline()
+            except socket.timeout:
+                raise ReadTimeoutError(endpoint_url=GATEWAY_URL)
+            if not line:
+                raise EndpointConnectionError(endpoint_url=f"{GATEWAY_URL} (closed before a result)")
+
+            message = json.loads(line)
+            message_type = message.get('type')
+
+            if message_type == 'keepalive':
+                if on_wait is not None:
+                    on_wait()
+            elif message_type == 'result':
+                return message
+            elif message_type == 'error':
+                raise _client_error(message.get('code', 'GatewayError'), message.get('message', ''))
+    finally:
+        connection.close()
+
+
+class GatewayRuntime:
+    """
+    Drop-in for a boto3 bedrock-runtime client's invoke_model()
+
+    Lets code written against boto3 (AIFeedbackEngine) use the gateway
+    without changing its retry/parsing logic.
+
+    Args:
+        region: AWS region passed to the gateway
+    """
+
+    def __init__(self, region: Optional[str] = None):
+        self.region = region
+
+    def invoke_model(self, body, modelId: str, accept: str = 'application/json',
+                     contentType: str = 'application/json', **kwargs) -> Dict[str, Any]:
+        request_body = json.loads(body) if isinstance(body, (str, bytes)) else body
+        result = invoke_via_gateway(modelId, request_body, region=self.region)
+        return {
+            'body': io.BytesIO(json.dumps(result['response']).encode('utf-8')),
+            'contentType': 'application/json'
+        }
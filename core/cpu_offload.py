@@ -0,0 +1,219 @@
+"""
+CPU Offload Pool for gevent workers
+
+gunicorn runs gevent workers: every request, chat call and status poll of a
+worker is a greenlet on one event loop. docx parsing, comment-document XML
+rewriting and zipping, and SequenceMatcher deduplication are pure CPU and
+never yield, so while a large document was processed every other request
+on that worker stalled.
+
+How:
+- run(func, *args) executes func on a small pool of real OS threads and
+  waits for it cooperatively: under gevent the hub keeps switching
+  greenlets (the GIL is handed back every few ms, and lxml/zlib/hashlib
+  release it), so status and chat requests are served during the work
+- Backend: gevent.threadpool.ThreadPool (native threads) when threading is
+  monkey-patched, concurrent.futures.ThreadPoolExecutor otherwise (RQ
+  workers, dev server), or inline with CPU_OFFLOAD_WORKERS=0
+- Bounded: at most workers + CPU_OFFLOAD_QUEUE calls are pending; callers
+  wait up to CPU_OFFLOAD_QUEUE_TIMEOUT for a slot, then get TimeoutError
+- Per-call timeout (default CPU_OFFLOAD_TIMEOUT): the caller gets
+  TimeoutError; the thread cannot be interrupted, so the call keeps its
+  slot until it actually finishes (the bound stays honest)
+- iterate(iterable) advances a generator in batches on the pool, so a
+  streaming parse can hand results back to the caller as it goes
+- Calls made from inside a pool thread run inline (no nested waits)
+
+Offloaded functions run on a real thread: they must not do gevent I/O
+(Redis, boto3, sessions). Keep them to files and computation.
+
+Usage:
+    from core.cpu_offload import get_cpu_offload
+
+    cpu_offload = get_cpu_offload()
+    output_path = cpu_offload.run(doc_processor.create_document_with_comments, path, comments, name)
+    for para in cpu_offload.iterate(iter_paragraphs(path)):
+        ...
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    from gevent import monkey as gevent_monkey
+    _real_get_ident = gevent_monkey.get_original('_thread', 'get_ident')
+except ImportError:
+    gevent_monkey = None
+    from _thread import get_ident as _real_get_ident
+
+# Real threads doing CPU work per process (0 = run inline)
+CPU_OFFLOAD_WORKERS = int(os.environ.get('CPU_OFFLOAD_WORKERS', '2'))
+
+# Calls allowed to wait for a free thread (on top of the running ones)
+CPU_OFFLOAD_QUEUE = int(os.environ.get('CPU_OFFLOAD_QUEUE', '16'))
+
+# Default seconds a call may run before the caller gives up
+CPU_OFFLOAD_TIMEOUT = float(os.environ.get('CPU_OFFLOAD_TIMEOUT', '300'))
+
+# Seconds a caller waits for a slot when the pool is full
+CPU_OFFLOAD_QUEUE_TIMEOUT = float(os.environ.get('CPU_OFFLOAD_QUEUE_TIMEOUT', '30'))
+
+# Items produced per pool call by iterate()
+ITERATE_BATCH_SIZE = 500
+
+
+def _take(iterator: Iterator, count: int) -> List:
+    return list(islice(iterator, count))
+
+
+def gevent_active() -> bool:
+    """Whether threading is monkey-patched by gevent (gunicorn gevent worker)"""
+    return gevent_monkey is not None and gevent_monkey.is_module_patched('threading')
+
+
+class CpuOffloadPool:
+    """
+    Runs CPU-bound functions off the event loop
+
+    Args:
+        max_workers: Real threads (0 = run calls inline)
+        max_queue: Calls that may wait for a thread
+        timeout: Default per-call timeout in seconds
+        queue_timeout: Seconds to wait for a slot when the pool is full
+    """
+
+    def __init__(self, max_workers: int = CPU_OFFLOAD_WORKERS, max_queue: int = CPU_OFFLOAD_QUEUE,
+                 timeout: float = CPU_OFFLOAD_TIMEOUT, queue_timeout: float = CPU_OFFLOAD_QUEUE_TIMEOUT):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+
+        if max_workers <= 0:
+            self.backend = 'inline'
+            self._pool = None
+        elif gevent_active():
+            from gevent.threadpool import ThreadPool
+            self.backend = 'gevent'
+            self._pool = ThreadPool(max_workers)
+        else:
+            self.backend = 'threads'
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cpu_offload')
+
+        # threading is patched under gevent, so these are greenlet-aware there
+        self._slots = threading.BoundedSemaphore(max(self.max_pending, 1))
+        self._stats_lock = threading.Lock()
+        self._worker_threads = set()
+        self.stats = {'completed': 0, 'failed': 0, 'timed_out': 0, 'rejected': 0, 'pending': 0}
+
+    def run(self, func: Callable, *args, timeout: float = None, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the pool and wait for its result
+
+        Args:
+            func: CPU-bound function (no gevent I/O)
+            timeout: Seconds to wait for the result (default: pool timeout)
+
+        Returns:
+            func's return value (its exceptions are re-raised)
+
+        Raises:
+            TimeoutError: No slot within queue_timeout, or no result within timeout
+        """
+        if self._pool is None or _real_get_ident() in self._worker_threads:
+            return func(*args, **kwargs)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise TimeoutError(f"CPU offload pool full ({self.max_pending} pending calls)")
+        self._count('pending')
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            if self.backend == 'gevent':
+                import gevent
+                result = self._pool.spawn(self._call, func, args, kwargs)
+                result.rawlink(self._release)
+                try:
+                    ok, value = result.get(timeout=timeout)
+                except gevent.Timeout:
+                    raise TimeoutError(f"{getattr(func, '__name__', func)} did not finish within {timeout:g}s")
+            else:
+                future = self._pool.submit(self._call, func, args, kwargs)
+                future.add_done_callback(self._release)
+                try:
+                    ok, value = future.result(timeout=timeout)
+                except FutureTimeoutError:
+                    raise TimeoutError(f"{getattr(func, '__name__', func)} did not finish within {timeout:g}s")
+            if not ok:
+                raise value
+        except TimeoutError:
+            self._count('timed_out')
+            raise
+        except Exception:
+            self._count('failed')
+            raise
+
+        self._count('completed')
+        return value
+
+    def iterate(self, iterable: Iterable, batch_size: int = ITERATE_BATCH_SIZE, timeout: float = None) -> Iterator:
+        """
+        Consume an iterable (e.g. a parsing generator) on the pool, batch_size items per call
+
+        Items are yielded to the caller as each batch completes; the timeout applies per batch.
+        """
+        iterator = iter(iterable)
+        while True:
+            batch = self.run(_take, iterator, batch_size, timeout=timeout)
+            if not batch:
+                return
+            yield from batch
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Call counters and configuration"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats.update(backend=self.backend, workers=self.max_workers, max_pending=self.max_pending)
+        return stats
+
+    def _call(self, func: Callable, args, kwargs) -> Tuple[bool, Any]:
+        # Runs on a pool thread; exceptions are handed back to the caller (not logged by the pool)
+        ident = _real_get_ident()
+        self._worker_threads.add(ident)
+        try:
+            return True, func(*args, **kwargs)
+        except Exception as e:
+            return False, e
+        finally:
+            self._worker_threads.discard(ident)
+
+    def _release(self, _):
+        # Once the call has really finished (not when the caller timed out)
+        self._slots.release()
+        with self._stats_lock:
+            self.stats['pending'] -= 1
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+
+# Global instance
+_cpu_offload = None
+_cpu_offload_lock = threading.Lock()
+
+
+def get_cpu_offload() -> CpuOffloadPool:
+    """Get or create the global CPU offload pool (created after gevent has patched threading)"""
+    global _cpu_offload
+
+    with _cpu_offload_lock:
+        if _cpu_offload is None:
+            _cpu_offload = CpuOffloadPool()
+            print(f"✅ CPU offload pool: {_cpu_offload.backend} ({_cpu_offload.max_workers} threads)")
+
+        return _cpu_offload
@@ -8,10 +8,74 @@ try:
 except ImportError:
     boto3 = None
 try:
-    from docx import Document
+    from core.docx_reader import iter_paragraphs, read_paragraphs
 except ImportError:
-    print("Warning: python-docx not installed. Document processing may fail.")
-    Document = None
+    print("Warning: lxml not installed. Document processing may fail.")
+    iter_paragraphs = read_paragraphs = None
+from core.cpu_offload import get_cpu_offload
+
+# Bump whenever reading or section detection changes the extracted sections
+# (invalidates core.parse_cache entries)
+SECTION_PARSER_VERSION = 3
+
+# Short title-case lines ("Background", "2. Impact Assessment") are treated as headers
+HEADER_PATTERN = re.compile(r'^(\d+\.? )?[A-Z][a-z]+( [A-Z][a-z]+){0,3}$')
+
+# Paragraph styles that mark headings by name ("Heading 1" - "Heading 3")
+HEADING_STYLE_PATTERN = re.compile(r'^Heading ([1-3])$')
+
+# Manually numbered headings ("1. Background", "2.3 Impact", "IV. Findings")
+NUMBERED_HEADING_PATTERN = re.compile(r'^(\d+(\.\d+)*\.?|[IVX]+\.)\s+\S')
+
+# Level given to headings found only by formatting (bold/numbered short lines)
+HEURISTIC_HEADING_LEVEL = 4
+
+# Confidence weights for structure detection (times section coverage)
+STYLED_HEADING_WEIGHT = 0.95
+HEURISTIC_HEADING_WEIGHT = 0.7
+
+# Below this confidence the AI is asked to find the sections
+STRUCTURE_MIN_CONFIDENCE = float(os.environ.get('STRUCTURE_MIN_CONFIDENCE', '0.6'))
+
+# Paragraphs starting with these are email dividers, not section content
+EMAIL_DIVIDER_PREFIXES = ("From:", "Sent:", "To:", "---")
+
+
+class PhraseMatcher:
+    """
+    Finds which of a set of phrases occur in a text, with one regex scan
+
+    Replaces `for phrase in phrases: if phrase in text` loops. Phrases are
+    matched against lowercased text. The alternation is ordered longest
+    first inside a lookahead, so at each position the longest phrase wins;
+    shorter phrases that are prefixes of it are added from a precomputed
+    table, which makes the result identical to the substring loop.
+
+    Args:
+        phrases: Phrases to look for (case-insensitive)
+    """
+
+    def __init__(self, phrases):
+        self.phrases = sorted({p.lower() for p in phrases if p}, key=len, reverse=True)
+        self.prefixes = {
+            phrase: [other for other in self.phrases if other != phrase and phrase.startswith(other)]
+            for phrase in self.phrases
+        }
+        alternation = '|'.join(re.escape(p) for p in self.phrases)
+        self.pattern = re.compile(f'(?=({alternation}))') if self.phrases else None
+
+    def find(self, text_lower):
+        """Set of phrases contained in text_lower (which must already be lowercased)"""
+        found = set()
+        if self.pattern is None:
+            return found
+        for match in self.pattern.finditer(text_lower):
+            phrase = match.group(1)
+            if phrase not in found:
+                found.add(phrase)
+                found.update(self.prefixes[phrase])
+        return found
+
 
 class DocumentAnalyzer:
     def __init__(self):
@@ -51,96 +115,268 @@ class DocumentAnalyzer:
             "Attachments", "From:", "Sent:", "To:", "Cc:", "Subject:"
         ]
 
+        # Standard section names by priority (first listed wins), matched in one scan
+        self._section_priority = {name.lower(): (i, name) for i, name in reversed(list(enumerate(self.standard_sections)))}
+        self._section_matcher = PhraseMatcher(self.standard_sections)
+
     def extract_sections_from_docx(self, doc_path):
         """Extract sections from Word document with comprehensive content capture"""
+        result = self.extract_sections(doc_path)
+        return result['sections'], result['section_paragraphs'], result['paragraph_indices']
+
+    def extract_sections(self, doc_path, defer_ai=False, on_section=None):
+        """
+        Extract sections from a Word document, recording how they were found
+        
+        Standard header names are tried first, then the document's own
+        structure (heading styles, outline levels, numbering, bold lines).
+        The AI is only asked when neither is confident.
+        
+        Args:
+            doc_path: .docx path
+            defer_ai: Don't call the AI here - return the best deterministic
+                result with needs_ai=True, so the caller can run
+                refine_sections_with_ai() in the background
+            on_section: Called as on_section(title, paragraphs) for each
+                header-based section while the document is still being read
+        
+        Returns:
+            Dict with sections, section_paragraphs, paragraph_indices,
+            method ('headers', 'structure', 'ai', 'single' or 'error'),
+            confidence (0-1) and needs_ai
+        """
         try:
-            if Document is None:
-                raise ImportError("python-docx not available")
+            if read_paragraphs is None:
+                raise ImportError("lxml not available")
             
             if not os.path.exists(doc_path):
                 raise FileNotFoundError(f"Document not found: {doc_path}")
             
             print(f"Loading document: {doc_path}")
-            doc = Document(doc_path)
-            print(f"Document loaded successfully")
+            # Streamed paragraph records (core.docx_reader) instead of a python-docx
+            # object graph - also what ends up in the session as section_paragraphs.
+            # Parsing runs on the CPU offload pool (keeps gevent workers responsive)
+            if on_section is not None:
+                paragraphs, texts = self._read_publishing_sections(doc_path, on_section)
+            else:
+                paragraphs = get_cpu_offload().run(read_paragraphs, doc_path)
+                texts = [para.text.strip() for para in paragraphs]
+            print(f"Document loaded successfully ({len(paragraphs)} paragraphs)")
             
-            sections = {}
-            section_paragraphs = {}
-            paragraph_indices = {}
+            needs_ai = False
             
             # First try header-based detection
-            sections, section_paragraphs, paragraph_indices = self._extract_by_headers(doc)
+            sections, section_paragraphs, paragraph_indices = self._extract_by_headers(paragraphs, texts)
+            method = 'headers'
+            confidence = 1.0 if len(sections) >= 3 else 0.0
             
-            # If insufficient sections found, try AI-based detection
+            # If insufficient sections found, use the document's own structure
             if len(sections) < 3:
-                print(f"Only {len(sections)} sections found, trying AI detection...")
-                ai_sections = self._identify_sections_with_ai(doc)
-                if ai_sections:
-                    sections, section_paragraphs, paragraph_indices = self._extract_by_ai_hints(doc, ai_sections)
+                structure, structure_confidence = self._extract_by_structure(paragraphs, texts)
+                if structure[0] and len(structure[0]) >= len(sections):
+                    sections, section_paragraphs, paragraph_indices = structure
+                    method = 'structure'
+                    confidence = structure_confidence
+                print(f"Structure detection: {len(structure[0])} sections, confidence {structure_confidence:.2f}")
+            
+            # Still not confident: AI-based detection (now, or later by the caller)
+            if confidence < STRUCTURE_MIN_CONFIDENCE:
+                if defer_ai:
+                    print(f"Only {len(sections)} sections found with low confidence, AI detection deferred")
+                    needs_ai = True
+                else:
+                    print(f"Only {len(sections)} sections found, trying AI detection...")
+                    ai_sections = self._identify_sections_with_ai(texts)
+                    if ai_sections:
+                        sections, section_paragraphs, paragraph_indices = self._extract_by_ai_hints(paragraphs, texts, ai_sections)
+                        method = 'ai'
             
             # Fallback: create single section with all content
             if not sections:
                 print(f"No sections detected, creating single section...")
-                sections, section_paragraphs, paragraph_indices = self._create_single_section(doc)
+                sections, section_paragraphs, paragraph_indices = self._create_single_section(paragraphs, texts)
+                method = 'single'
             
-            print(f"Extracted {len(sections)} sections: {list(sections.keys())}")
-            return sections, section_paragraphs, paragraph_indices
+            print(f"Extracted {len(sections)} sections ({method}): {list(sections.keys())}")
+            return {
+                'sections': sections,
+                'section_paragraphs': section_paragraphs,
+                'paragraph_indices': paragraph_indices,
+                'method': method,
+                'confidence': round(confidence, 2),
+                'needs_ai': needs_ai
+            }
             
         except Exception as e:
             print(f"Document loading failed: {str(e)}")
             # Return safe fallback structure
             return {
-                "Document": f"Failed to load document: {str(e)}"
-            }, {
-                "Document": [f"Failed to load document: {str(e)}"]
-            }, {
-                "Document": [0]
+                'sections': {"Document": f"Failed to load document: {str(e)}"},
+                'section_paragraphs': {"Document": [f"Failed to load document: {str(e)}"]},
+                'paragraph_indices': {"Document": [0]},
+                'method': 'error',
+                'confidence': 0.0,
+                'needs_ai': False
             }
 
-    def _extract_by_headers(self, doc):
-        """Extract sections using header detection"""
-        sections = {}
-        section_paragraphs = {}
-        paragraph_indices = {}
+    def refine_sections_with_ai(self, doc_path):
+        """
+        AI section detection for a document extract_sections() was not confident about
+        
+        Meant to run in the background after extract_sections(defer_ai=True).
         
-        all_paragraphs = [(idx, para, para.text.strip()) for idx, para in enumerate(doc.paragraphs) if para.text.strip()]
+        Returns:
+            Tuple of (sections, section_paragraphs, paragraph_indices), or None
+            if the AI call failed or found no sections
+        """
+        paragraphs = get_cpu_offload().run(read_paragraphs, doc_path)
+        texts = [para.text.strip() for para in paragraphs]
+        
+        ai_sections = self._identify_sections_with_ai(texts, use_fallback=False)
+        if not ai_sections:
+            return None
+        
+        result = self._extract_by_ai_hints(paragraphs, texts, ai_sections)
+        return result if result[0] else None
+
+    def _extract_by_headers(self, paragraphs, texts):
+        """Extract sections using header detection"""
         section_headers = []
         
-        # Find section headers
-        for idx, para, text in all_paragraphs:
-            if len(text) < 100:  # Headers are typically short
-                for section_name in self.standard_sections:
-                    if section_name.lower() in text.lower():
-                        section_headers.append({'title': section_name, 'idx': idx})
-                        break
-                
-                # Pattern-based header detection
-                if re.match(r'^(\d+\.? )?[A-Z][a-z]+( [A-Z][a-z]+){0,3}$', text) and len(text.split()) <= 5:
-                    section_headers.append({'title': text, 'idx': idx})
-        
-        # Extract content between headers
-        section_headers.sort(key=lambda x: x['idx'])
-        
-        for i, header in enumerate(section_headers):
-            section_title = header['title']
-            start_idx = header['idx']
-            end_idx = len(doc.paragraphs)
-            
-            if i < len(section_headers) - 1:
-                end_idx = section_headers[i+1]['idx']
-            
-            content, paras, indices = self._extract_section_content(doc, start_idx, end_idx)
+        # Find section headers (one scan per short paragraph for all standard names)
+        for idx, text in enumerate(texts):
+            section_headers.extend(self._header_candidates(idx, text))
+        
+        return self._assign_sections(paragraphs, texts, section_headers)
+
+    def _header_candidates(self, idx, text):
+        """Headers (0-2) a paragraph starts: a standard section name and/or a title-case line"""
+        headers = []
+        if not text or len(text) >= 100:  # Headers are typically short
+            return headers
+        
+        found = self._section_matcher.find(text.lower())
+        if found:
+            _, section_name = min(self._section_priority[phrase] for phrase in found)
+            headers.append({'title': section_name, 'idx': idx})
+        
+        # Pattern-based header detection
+        if HEADER_PATTERN.match(text) and len(text.split()) <= 5:
+            headers.append({'title': text, 'idx': idx})
+        
+        return headers
+
+    def _read_publishing_sections(self, doc_path, on_section):
+        """
+        Read a document, reporting header-based sections while it streams
+        
+        A section is complete as soon as the next header appears, so
+        on_section(title, paragraphs) runs long before the last paragraph is
+        read. These match what _extract_by_headers() returns; the final
+        result may still differ when structure or AI detection takes over.
+        
+        Returns:
+            Tuple of (paragraphs, texts) for the whole document
+        """
+        paragraphs = []
+        texts = []
+        open_header = None
+        
+        # Parsed in batches on the CPU offload pool; on_section runs here, in the caller
+        for para in get_cpu_offload().iterate(iter_paragraphs(doc_path)):
+            idx = len(paragraphs)
+            text = para.text.strip()
+            paragraphs.append(para)
+            texts.append(text)
             
-            if content:
-                sections[section_title] = content
-                section_paragraphs[section_title] = paras
-                paragraph_indices[section_title] = indices
+            for header in self._header_candidates(idx, text):
+                if open_header is not None:
+                    self._publish_section(on_section, paragraphs, texts, open_header['title'], open_header['idx'], idx)
+                open_header = header
         
-        return sections, section_paragraphs, paragraph_indices
+        if open_header is not None:
+            self._publish_section(on_section, paragraphs, texts, open_header['title'], open_header['idx'], len(paragraphs))
+        
+        return paragraphs, texts
+
+    def _publish_section(self, on_section, paragraphs, texts, title, start_idx, end_idx):
+        _, paras, _ = self._section_range(paragraphs, texts, start_idx, end_idx)
+        if paras:
+            try:
+                on_section(title, paras)
+            except Exception as e:
+                print(f"Could not publish section {title}: {str(e)}")
 
-    def _identify_sections_with_ai(self, doc):
-        """Use AI to identify document sections"""
-        full_text = '\n'.join([para.text.strip() for para in doc.paragraphs if para.text.strip()])
+    def _extract_by_structure(self, paragraphs, texts):
+        """
+        Extract sections from the document's own structure (no AI)
+        
+        Heading candidates: Title and Heading 1-3 styles or outline levels,
+        then short all-bold or numbered lines. Sections start at the
+        shallowest level that occurs at least twice; deeper headings stay in
+        their section's content.
+        
+        Returns:
+            Tuple of ((sections, section_paragraphs, paragraph_indices), confidence 0-1).
+            Confidence is the share of body paragraphs covered by the sections,
+            scaled down when the headings only come from formatting heuristics.
+        """
+        levels = defaultdict(list)
+        for idx, para in enumerate(paragraphs):
+            level = self._heading_level(para, texts[idx])
+            if level is not None:
+                levels[level].append(idx)
+        
+        boundary = next((level for level in sorted(levels) if len(levels[level]) >= 2), None)
+        if boundary is None:
+            return ({}, {}, {}), 0.0
+        
+        section_headers = []
+        title_counts = defaultdict(int)
+        for idx in levels[boundary]:
+            title = texts[idx].rstrip(':').strip()
+            title_counts[title] += 1
+            if title_counts[title] > 1:
+                title = f"{title} ({title_counts[title]})"  # Repeated headings must not overwrite each other
+            section_headers.append({'title': title, 'idx': idx})
+        
+        result = self._assign_sections(paragraphs, texts, section_headers)
+        if len(result[0]) < 2:
+            return result, 0.0
+        
+        body_count = sum(1 for text in texts if text) - len(section_headers)
+        covered = sum(len(indices) for indices in result[2].values())
+        coverage = covered / body_count if body_count > 0 else 0.0
+        
+        weight = STYLED_HEADING_WEIGHT if boundary < HEURISTIC_HEADING_LEVEL else HEURISTIC_HEADING_WEIGHT
+        return result, weight * coverage
+
+    def _heading_level(self, para, text):
+        """Heading level of a paragraph (0 title, 1-3 styled heading, HEURISTIC_HEADING_LEVEL looks like one), or None"""
+        if not text or len(text) >= 100:
+            return None
+        
+        if para.style_name == 'Title':
+            return 0
+        if para.outline_level is not None and para.outline_level < 3:
+            return para.outline_level + 1
+        match = HEADING_STYLE_PATTERN.match(para.style_name or '')
+        if match:
+            return int(match.group(1))
+        
+        # Formatting heuristics: short lines that don't read as sentences
+        words = len(text.split())
+        if text.endswith(('.', ',', ';')) or words > 10:
+            return None
+        if para.bold:
+            return HEURISTIC_HEADING_LEVEL
+        if (para.numbered or NUMBERED_HEADING_PATTERN.match(text)) and words <= 6 and text[0].isupper():
+            return HEURISTIC_HEADING_LEVEL
+        return None
+
+    def _identify_sections_with_ai(self, texts, use_fallback=True):
+        """Use AI to identify document sections (use_fallback: canned sections if the call fails)"""
+        full_text = '\n'.join([text for text in texts if text])
         
         prompt = f"""You are a senior document structure analyst with comprehensive expertise in business document organization, professional investigation reports, and CT EE investigation documentation standards. Your specialized task is to systematically identify and extract all main sections from this professional investigation document using established analytical frameworks.
 
@@ -196,54 +432,49 @@ MANDATORY COMPLIANCE REQUIREMENTS:
 - Prioritize professional investigation terminology and standard section naming conventions"""
         
         try:
-            response = self._invoke_bedrock("You are an expert document structure analyst with extensive experience in business document organization and content identification. You excel at recognizing section boundaries, content transitions, and organizational patterns in professional documents, even when sections lack explicit formatting or clear headers.", prompt)
+            response = self._invoke_bedrock("You are an expert document structure analyst with extensive experience in business document organization and content identification. You excel at recognizing section boundaries, content transitions, and organizational patterns in professional documents, even when sections lack explicit formatting or clear headers.", prompt, use_fallback=use_fallback)
             result = json.loads(response)
             return result.get('sections', [])
         except:
             return None
 
-    def _extract_by_ai_hints(self, doc, ai_sections):
+    def _extract_by_ai_hints(self, paragraphs, texts, ai_sections):
         """Extract sections using AI-identified hints"""
-        sections = {}
-        section_paragraphs = {}
-        paragraph_indices = {}
+        # Each section starts at the first paragraph containing its line hint or its title
+        needles = []
+        for section_info in ai_sections:
+            needles.append((
+                section_info.get('line_hint', '').lower(),
+                section_info.get('title', '').lower()
+            ))
         
-        all_sections_info = []
+        matcher = PhraseMatcher([phrase for needle in needles for phrase in needle])
+        start_indices = {}
+        for i, (line_hint, title) in enumerate(needles):
+            if not title:
+                start_indices[i] = 0  # An empty title matches the first paragraph
         
-        for section_info in ai_sections:
-            section_title = section_info.get('title', '')
-            line_hint = section_info.get('line_hint', '').lower()
-            
-            for idx, para in enumerate(doc.paragraphs):
-                text = para.text.strip().lower()
-                
-                if line_hint and line_hint in text:
-                    all_sections_info.append({'title': section_title, 'start_idx': idx})
-                    break
-                elif section_title.lower() in text:
-                    all_sections_info.append({'title': section_title, 'start_idx': idx})
-                    break
-        
-        all_sections_info.sort(key=lambda x: x['start_idx'])
-        
-        for i, section_info in enumerate(all_sections_info):
-            section_title = section_info['title']
-            start_idx = section_info['start_idx']
-            end_idx = len(doc.paragraphs)
-            
-            if i < len(all_sections_info) - 1:
-                end_idx = all_sections_info[i+1]['start_idx']
+        # One sweep over the document resolves every hint
+        for idx, text in enumerate(texts):
+            if len(start_indices) == len(needles):
+                break
             
-            content, paras, indices = self._extract_section_content(doc, start_idx, end_idx)
+            found = matcher.find(text.lower())
+            if not found:
+                continue
             
-            if content:
-                sections[section_title] = content
-                section_paragraphs[section_title] = paras
-                paragraph_indices[section_title] = indices
+            for i, (line_hint, title) in enumerate(needles):
+                if i not in start_indices and (line_hint in found or title in found):
+                    start_indices[i] = idx
         
-        return sections, section_paragraphs, paragraph_indices
+        all_sections_info = [
+            {'title': ai_sections[i].get('title', ''), 'start_idx': start_indices[i]}
+            for i in range(len(needles)) if i in start_indices
+        ]
+        
+        return self._assign_sections(paragraphs, texts, all_sections_info, idx_key='start_idx')
 
-    def _create_single_section(self, doc):
+    def _create_single_section(self, paragraphs, texts):
         """Create single section with all content as fallback"""
         sections = {}
         section_paragraphs = {}
@@ -253,11 +484,10 @@ MANDATORY COMPLIANCE REQUIREMENTS:
         paras = []
         indices = []
         
-        for idx, para in enumerate(doc.paragraphs):
-            text = para.text.strip()
+        for idx, text in enumerate(texts):
             if text:
                 content.append(text)
-                paras.append(para)
+                paras.append(paragraphs[idx])
                 indices.append(idx)
         
         if content:
@@ -267,57 +497,93 @@ MANDATORY COMPLIANCE REQUIREMENTS:
         
         return sections, section_paragraphs, paragraph_indices
 
-    def _extract_section_content(self, doc, start_idx, end_idx):
-        """Extract content between two paragraph indices"""
+    def _assign_sections(self, paragraphs, texts, headers, idx_key='idx'):
+        """
+        Assign the paragraphs between consecutive headers to sections, in one sweep
+        
+        Args:
+            paragraphs: Document paragraphs (materialized once)
+            texts: Stripped text of each paragraph
+            headers: Dicts with 'title' and the header's paragraph index (idx_key)
+            idx_key: Key holding the paragraph index
+        
+        Returns:
+            Tuple of (sections, section_paragraphs, paragraph_indices). The
+            header paragraph itself, empty paragraphs and email dividers are
+            left out; a later section with the same title replaces an earlier one.
+        """
+        sections = {}
+        section_paragraphs = {}
+        paragraph_indices = {}
+        
+        headers = sorted(headers, key=lambda x: x[idx_key])
+        
+        for i, header in enumerate(headers):
+            section_title = header['title']
+            start_idx = header[idx_key]
+            end_idx = headers[i+1][idx_key] if i < len(headers) - 1 else len(paragraphs)
+            
+            content, paras, indices = self._section_range(paragraphs, texts, start_idx, end_idx)
+            
+            if content:
+                sections[section_title] = content
+                section_paragraphs[section_title] = paras
+                paragraph_indices[section_title] = indices
+        
+        return sections, section_paragraphs, paragraph_indices
+
+    def _section_range(self, paragraphs, texts, start_idx, end_idx):
+        """Content of the paragraphs after a header (start_idx) up to end_idx"""
         content = []
         paras = []
         indices = []
         
-        for idx in range(start_idx, end_idx):
-            if idx < len(doc.paragraphs):
-                para = doc.paragraphs[idx]
-                text = para.text.strip()
-                
-                if idx == start_idx or not text:
-                    continue
-                
-                # Skip email dividers
-                if any(text.startswith(prefix) for prefix in ["From:", "Sent:", "To:", "---"]):
-                    continue
-                
-                content.append(text)
-                paras.append(para)
-                indices.append(idx)
+        for idx in range(start_idx + 1, end_idx):
+            text = texts[idx]
+            
+            # Skip empty paragraphs and email dividers
+            if not text or text.startswith(EMAIL_DIVIDER_PREFIXES):
+                continue
+            
+            content.append(text)
+            paras.append(paragraphs[idx])
+            indices.append(idx)
         
         return '\n\n'.join(content), paras, indices
 
-    def _invoke_bedrock(self, system_prompt, user_prompt):
-        """Invoke AWS Bedrock for AI analysis"""
+    def _invoke_bedrock(self, system_prompt, user_prompt, use_fallback=True):
+        """Invoke AWS Bedrock for AI analysis (configured model, shared client)"""
         try:
             if boto3 is None:
                 raise ImportError("boto3 not available")
-                
-            runtime = boto3.client('bedrock-runtime')
+            
+            from core.ai_feedback_engine import model_config, get_bedrock_runtime
+            
+            config = model_config.get_model_config()
+            runtime = get_bedrock_runtime(config['region'])
             
             body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
+                "anthropic_version": config['anthropic_version'],
                 "max_tokens": 4000,
+                "temperature": 0,
                 "system": system_prompt,
                 "messages": [{"role": "user", "content": user_prompt}]
             })
             
             response = runtime.invoke_model(
                 body=body,
-                modelId='anthropic.claude-3-sonnet-20240229-v1:0',
+                modelId=config['model_id'],
                 accept="application/json",
                 contentType="application/json"
             )
             
             response_body = json.loads(response.get('body').read())
-            return response_body['content'][0]['text']
+            return model_config.extract_response_content(response_body)
             
         except Exception as e:
             print(f"AI section detection failed: {str(e)}")
+            if not use_fallback:
+                raise
             # Fallback response for testing
             return json.dumps({
                 "sections": [
@@ -326,4 +592,4 @@ MANDATORY COMPLIANCE REQUIREMENTS:
                     {"title": "Resolving Actions", "line_hint": "resolving actions"},
                     {"title": "Root Causes (RC) and Preventative Actions (PA)", "line_hint": "root cause"}
                 ]
-            })
\ No newline at end of file
+            })
@@ -0,0 +1,259 @@
+"""
+Streaming .docx Paragraph Reader for AI-Prism
+
+Upload parsing opened every document with python-docx Document(), which
+builds the full XML tree plus a proxy object per paragraph, run and style,
+and those Paragraph proxies (holding the whole tree) ended up in the
+session. Large uploads on small instances used hundreds of MB each.
+
+How:
+- word/document.xml is streamed straight out of the zip with
+  lxml.etree.iterparse; each body paragraph is turned into a small
+  DocxParagraph record (index, text, style, outline level) and the XML
+  element is cleared together with everything before it, so memory stays
+  flat regardless of document length
+- word/styles.xml (small) is parsed once to resolve style ids to names and
+  outline levels, following basedOn inheritance
+- Records also carry list numbering (w:numPr) and whether the paragraph
+  is all bold, for heading detection without styles
+- locate_text() finds a quoted excerpt (feedback quote, user highlight)
+  in a list of records: paragraph ordinal plus character span, the anchor
+  used for comments in the reviewed document
+- Text and indices match python-docx exactly: only body-level w:p elements
+  count (doc.paragraphs order - table cells are skipped), and paragraph text
+  is the text of its direct runs with w:tab as '\\t' and w:br/w:cr as '\\n'
+
+Usage:
+    from core.docx_reader import iter_paragraphs, read_paragraphs
+
+    for para in iter_paragraphs('uploads/report.docx'):
+        print(para.index, para.style_name, para.outline_level, para.text)
+"""
+
+import posixpath
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lxml import etree
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+W_BODY = f'{{{W_NS}}}body'
+W_P = f'{{{W_NS}}}p'
+W_R = f'{{{W_NS}}}r'
+W_T = f'{{{W_NS}}}t'
+W_TAB = f'{{{W_NS}}}tab'
+W_BR = f'{{{W_NS}}}br'
+W_CR = f'{{{W_NS}}}cr'
+W_PPR = f'{{{W_NS}}}pPr'
+W_PSTYLE = f'{{{W_NS}}}pStyle'
+W_OUTLINE_LVL = f'{{{W_NS}}}outlineLvl'
+W_NUMPR = f'{{{W_NS}}}numPr'
+W_RPR = f'{{{W_NS}}}rPr'
+W_B = f'{{{W_NS}}}b'
+W_VAL = f'{{{W_NS}}}val'
+
+# Built-in style names Word stores in lowercase (python-docx shows them capitalized)
+STYLE_ALIASES = {
+    'caption': 'Caption',
+    'footer': 'Footer',
+    'header': 'Header',
+    **{f'heading {level}': f'Heading {level}' for level in range(1, 10)}
+}
+
+# outlineLvl 9 means "body text"
+BODY_TEXT_LEVEL = 9
+
+
+@dataclass
+class DocxParagraph:
+    """One body paragraph of a .docx"""
+    index: int                            # Position in doc.paragraphs
+    text: str                             # Paragraph text (same as python-docx Paragraph.text)
+    style_id: Optional[str] = None        # w:pStyle value (None = default style)
+    style_name: Optional[str] = None      # Display name ("Heading 1", "Normal")
+    outline_level: Optional[int] = None   # 0 = top-level heading, None = body text
+    numbered: bool = False                # Part of a numbered/bulleted list (w:numPr)
+    bold: bool = False                    # Every run with text is bold
+
+
+def _part_path(archive: zipfile.ZipFile, rels_path: str, rel_type_suffix: str, default: str) -> str:
+    """Resolve a package part from a .rels file (falls back to the usual location)"""
+    try:
+        rels = etree.fromstring(archive.read(rels_path))
+    except (KeyError, etree.XMLSyntaxError):
+        return default
+
+    for rel in rels.iter(f'{{{REL_NS}}}Relationship'):
+        if rel.get('Type', '').endswith(rel_type_suffix):
+            target = rel.get('Target', '')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            base = posixpath.dirname(posixpath.dirname(rels_path))
+            return posixpath.normpath(posixpath.join(base, target))
+    return default
+
+
+def _read_styles(archive: zipfile.ZipFile, styles_path: str) -> Tuple[Dict[str, Tuple[str, Optional[int]]], Optional[str]]:
+    """
+    Paragraph styles of the document
+
+    Returns:
+        Tuple of ({style_id: (name, outline_level)}, default style id)
+    """
+    try:
+        root = etree.fromstring(archive.read(styles_path))
+    except (KeyError, etree.XMLSyntaxError):
+        return {}, None
+
+    raw = {}
+    default_id = None
+    for style in root.iterchildren(f'{{{W_NS}}}style'):
+        if style.get(f'{{{W_NS}}}type', 'paragraph') != 'paragraph':
+            continue
+        style_id = style.get(f'{{{W_NS}}}styleId')
+        if style_id is None:
+            continue
+
+        name_el = style.find(f'{{{W_NS}}}name')
+        name = name_el.get(W_VAL) if name_el is not None else style_id
+
+        based_on_el = style.find(f'{{{W_NS}}}basedOn')
+        level_el = style.find(f'{W_PPR}/{W_OUTLINE_LVL}')
+        raw[style_id] = (
+            STYLE_ALIASES.get(name, name),
+            int(level_el.get(W_VAL)) if level_el is not None else None,
+            based_on_el.get(W_VAL) if based_on_el is not None else None
+        )
+        if style.get(f'{{{W_NS}}}default') in ('1', 'true', 'on'):
+            default_id = style_id
+
+    # Outline level is inherited through basedOn
+    styles = {}
+    for style_id, (name, level, based_on) in raw.items():
+        seen = {style_id}
+        while level is None and based_on in raw and based_on not in seen:
+            seen.add(based_on)
+            _, level, based_on = raw[based_on]
+        styles[style_id] = (name, level)
+    return styles, default_id
+
+
+def _is_bold(run) -> bool:
+    rpr = run.find(W_RPR)
+    bold = rpr.find(W_B) if rpr is not None else None
+    return bold is not None and bold.get(W_VAL, 'true') not in ('0', 'false', 'off')
+
+
+def _paragraph_text(p) -> Tuple[str, bool]:
+    """Text of the paragraph's direct runs (python-docx Paragraph.text) and whether it is all bold"""
+    parts = []
+    all_bold = True
+    for run in p.iterchildren(W_R):
+        run_start = len(parts)
+        for child in run:
+            tag = child.tag
+            if tag == W_T:
+                if child.text:
+                    parts.append(child.text)
+            elif tag == W_TAB:
+                parts.append('\t')
+            elif tag == W_BR or tag == W_CR:
+                parts.append('\n')
+        if all_bold and len(parts) > run_start and not _is_bold(run):
+            all_bold = False
+    text = ''.join(parts)
+    return text, all_bold and bool(text.strip())
+
+
+def iter_paragraphs(path: str) -> Iterator[DocxParagraph]:
+    """
+    Stream the body paragraphs of a .docx
+
+    Args:
+        path: .docx file path (or file-like object)
+
+    Yields:
+        DocxParagraph records in document order
+
+    Raises:
+        zipfile.BadZipFile: Not a .docx (zip) file
+        KeyError: The package has no main document part
+        etree.XMLSyntaxError: Corrupt document.xml
+    """
+    with zipfile.ZipFile(path) as archive:
+        document_path = _part_path(archive, '_rels/.rels', '/officeDocument', 'word/document.xml')
+        document_rels = posixpath.join(posixpath.dirname(document_path), '_rels',
+                                       posixpath.basename(document_path) + '.rels')
+        styles_path = _part_path(archive, document_rels, '/styles', 'word/styles.xml')
+        styles, default_style = _read_styles(archive, styles_path)
+
+        index = 0
+        with archive.open(document_path) as stream:
+            for _, p in etree.iterparse(stream, events=('end',), tag=W_P,
+                                        resolve_entities=False, huge_tree=True):
+                parent = p.getparent()
+                if parent is None or parent.tag != W_BODY:
+                    # Paragraph inside a table/text box: not part of doc.paragraphs
+                    p.clear()
+                    continue
+
+                style_id = None
+                outline_level = None
+                numbered = False
+                ppr = p.find(W_PPR)
+                if ppr is not None:
+                    numbered = ppr.find(W_NUMPR) is not None
+                    style_el = ppr.find(W_PSTYLE)
+                    if style_el is not None:
+                        style_id = style_el.get(W_VAL)
+                    level_el = ppr.find(W_OUTLINE_LVL)
+                    if level_el is not None:
+                        outline_level = int(level_el.get(W_VAL))
+
+                style_name, style_level = styles.get(style_id if style_id in styles else default_style,
+                                                     ('Normal', None))
+                if outline_level is None:
+                    outline_level = style_level
+                if outline_level == BODY_TEXT_LEVEL:
+                    outline_level = None
+
+                text, bold = _paragraph_text(p)
+                yield DocxParagraph(index, text, style_id, style_name, outline_level, numbered, bold)
+                index += 1
+
+                # Drop this paragraph and everything before it (tables, section properties)
+                p.clear()
+                while p.getprevious() is not None:
+                    del parent[0]
+
+
+def read_paragraphs(path: str) -> List[DocxParagraph]:
+    """All body paragraphs of a .docx (see iter_paragraphs)"""
+    return list(iter_paragraphs(path))
+
+
+def locate_text(paragraphs: List[DocxParagraph], excerpt: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Find an excerpt in paragraph records (case and whitespace insensitive)
+
+    Args:
+        paragraphs: Records to search, in order (e.g. one section)
+        excerpt: Quoted text; must lie within a single paragraph
+
+    Returns:
+        (paragraph index, start, end) with offsets into DocxParagraph.text, or None
+    """
+    words = (excerpt or '').split()
+    if not words:
+        return None
+
+    pattern = re.compile(r'\s+'.join(re.escape(word) for word in words), re.IGNORECASE)
+    for para in paragraphs:
+        match = pattern.search(para.text)
+        if match:
+            return para.index, match.start(), match.end()
+    return None
@@ -0,0 +1,238 @@
+"""
+Parsed-Document Cache for AI-Prism uploads
+
+Reviewers often restart a session and upload the same file again; every
+upload re-ran the docx parse and section detection.
+
+How:
+- Entries are keyed by SHA-256 of the uploaded bytes plus
+  SECTION_PARSER_VERSION (bumped whenever extraction changes), so a
+  changed document or parser never serves a stale entry
+- An entry is the extract_sections() result in compact form: per section,
+  the paragraph records (core.docx_reader) it was built from; section text
+  and paragraph ordinals are rebuilt from them. Stored as zlib-compressed
+  JSON in Redis (shared by all workers, PARSE_CACHE_TTL) or, without Redis,
+  on local disk (PARSE_CACHE_DIR, purged after PARSE_CACHE_TTL)
+- Hit/miss/store counters are kept in Redis (cross-worker) or in process
+  and reported by get_stats() (/queue_stats -> parse_cache)
+
+Usage:
+    from core.parse_cache import get_parse_cache
+
+    cache = get_parse_cache(redis_conn)
+    digest = cache.digest_file(file_path)
+    extraction = cache.get(digest)
+    if extraction is None:
+        extraction = document_analyzer.extract_sections(file_path, defer_ai=True)
+        cache.put(digest, extraction)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import astuple
+from typing import Any, Dict, Optional
+
+from core.document_analyzer import SECTION_PARSER_VERSION
+from core.docx_reader import DocxParagraph
+
+# Seconds an entry is kept
+PARSE_CACHE_TTL = int(os.environ.get('PARSE_CACHE_TTL', str(7 * 86400)))
+
+# Local cache directory (used when Redis is not available); /tmp on App Runner (read-only filesystem)
+PARSE_CACHE_DIR = os.environ.get(
+    'PARSE_CACHE_DIR',
+    '/tmp/data/parse_cache' if os.environ.get('FLASK_ENV') == 'production'
+    else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'parse_cache')
+)
+
+# Seconds between purges of expired local entries (per process)
+PURGE_INTERVAL = 3600
+
+# Bytes read at a time when hashing uploads
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ParseCache:
+    """
+    Content-addressed cache of extract_sections() results
+
+    Args:
+        redis_conn: Redis connection (None = local disk)
+        key_prefix: Redis key prefix
+    """
+
+    def __init__(self, redis_conn=None, key_prefix: str = 'parse_cache'):
+        self.redis_conn = redis_conn
+        self.key_prefix = key_prefix
+
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0}
+        self._stats_lock = threading.Lock()
+        self._last_purge = 0.0
+
+    @staticmethod
+    def digest_file(path: str) -> str:
+        """Cache key for a document: SHA-256 of its bytes plus the parser version"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return f"{digest.hexdigest()}-v{SECTION_PARSER_VERSION}"
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached extraction for a document
+
+        Args:
+            digest: Key from digest_file()
+
+        Returns:
+            extract_sections() result dict, or None on a miss
+        """
+        try:
+            data = self._read(digest)
+            extraction = self._decode(data) if data is not None else None
+        except Exception as e:
+            print(f"⚠️ [PARSE CACHE] Could not read {digest[:12]}: {e}")
+            extraction = None
+
+        self._count('hits' if extraction is not None else 'misses')
+        return extraction
+
+    def put(self, digest: str, extraction: Dict[str, Any]):
+        """Store an extract_sections() result (failed extractions are not cached)"""
+        if extraction.get('method') == 'error':
+            return
+        try:
+            self._write(digest, self._encode(extraction))
+            self._count('stores')
+        except Exception as e:
+            print(f"⚠️ [PARSE CACHE] Could not store {digest[:12]}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters (shared across workers when Redis is used)"""
+        if self.redis_conn is not None:
+            try:
+                raw = self.redis_conn.hgetall(f"{self.key_prefix}:stats")
+                stats = {name: int(raw.get(name.encode(), 0)) for name in self.stats}
+            except Exception:
+                stats = self._local_stats()
+        else:
+            stats = self._local_stats()
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['backend'] = 'redis' if self.redis_conn is not None else 'disk'
+        return stats
+
+    # ------------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(extraction: Dict[str, Any]) -> bytes:
+        payload = {
+            'method': extraction['method'],
+            'confidence': extraction['confidence'],
+            'needs_ai': extraction['needs_ai'],
+            'sections': [
+                [title, [astuple(para) for para in paras]]
+                for title, paras in extraction['section_paragraphs'].items()
+            ]
+        }
+        return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 6)
+
+    @staticmethod
+    def _decode(data: bytes) -> Dict[str, Any]:
+        payload = json.loads(zlib.decompress(data))
+
+        sections, section_paragraphs, paragraph_indices = {}, {}, {}
+        for title, rows in payload['sections']:
+            paras = [DocxParagraph(*row) for row in rows]
+            sections[title] = '\n\n'.join(para.text.strip() for para in paras)
+            section_paragraphs[title] = paras
+            paragraph_indices[title] = [para.index for para in paras]
+
+        return {
+            'sections': sections,
+            'section_paragraphs': section_paragraphs,
+            'paragraph_indices': paragraph_indices,
+            'method': payload['method'],
+            'confidence': payload['confidence'],
+            'needs_ai': payload['needs_ai']
+        }
+
+    # ------------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------------
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        if self.redis_conn is not None:
+            return self.redis_conn.get(f"{self.key_prefix}:{digest}")
+
+        path = os.path.join(PARSE_CACHE_DIR, f"{digest}.json.z")
+        try:
+            if time.time() - os.path.getmtime(path) > PARSE_CACHE_TTL:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, digest: str, data: bytes):
+        if self.redis_conn is not None:
+            self.redis_conn.setex(f"{self.key_prefix}:{digest}", PARSE_CACHE_TTL, data)
+            return
+
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        path = os.path.join(PARSE_CACHE_DIR, f"{digest}.json.z")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._maybe_purge()
+
+    def _maybe_purge(self):
+        if time.time() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.time()
+
+        cutoff = time.time() - PARSE_CACHE_TTL
+        for entry in os.scandir(PARSE_CACHE_DIR):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+        if self.redis_conn is not None:
+            try:
+                self.redis_conn.hincrby(f"{self.key_prefix}:stats", name, 1)
+            except Exception:
+                pass
+
+    def _local_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return self.stats.copy()
+
+
+# Global instance
+_parse_cache = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache(redis_conn=None) -> ParseCache:
+    """Get or create the global parse cache instance"""
+    global _parse_cache
+
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache(redis_conn=redis_conn)
+
+        return _parse_cache
@@ -0,0 +1,233 @@
+"""
+Singleflight Request Coalescing for AI-Prism
+Collapses identical in-flight analysis requests into ONE Bedrock call
+
+Double-clicks, page reloads and multiple tabs routinely submit the same
+section analysis several times. Every duplicate used to burn its own
+Bedrock call. Requests are now keyed on the analysis cache key
+(section text digest, doc_type, model, prompt version):
+
+- RQ mode: the first submission claims the key in Redis (SET NX) with a
+  pre-generated job id; later submissions attach to that job id while it
+  is still queued or running.
+- In-process mode: the first caller runs the work, concurrent callers with
+  the same key wait on the same Future and share its result.
+"""
+
+import hashlib
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# RQ job states that mean "still in flight" - anything else can be replaced
+IN_FLIGHT_STATES = ('queued', 'started', 'deferred', 'scheduled')
+
+# Seconds a claimed marker may point at a job that does not exist yet (claim -> enqueue)
+PENDING_MARKER_GRACE = 5
+
+
+def analysis_cache_key(content: str, doc_type: str, model_id: str, prompt_version: str) -> str:
+    """
+    Build the analysis cache key used for coalescing
+
+    Args:
+        content: Section text (or concatenated batch text)
+        doc_type: Document type
+        model_id: Bedrock model id
+        prompt_version: Prompt template version
+
+    Returns:
+        Hex digest identifying the analysis request
+    """
+    content_digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    raw_key = f"{content_digest}|{doc_type}|{model_id}|{prompt_version}"
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+
+class RequestCoalescer:
+    """
+    Singleflight coalescer for RQ jobs and in-process calls
+
+    Args:
+        redis_conn: Redis connection for cross-worker coalescing (None = in-process only)
+        key_prefix: Redis key prefix for in-flight markers
+    """
+
+    def __init__(self, redis_conn=None, key_prefix: str = 'singleflight'):
+        self.redis_conn = redis_conn
+        self.key_prefix = key_prefix
+
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'submitted': 0,
+            'coalesced': 0
+        }
+        self._stats_lock = threading.Lock()
+
+    def _count(self, coalesced: bool):
+        with self._stats_lock:
+            self.stats['submitted'] += 1
+            if coalesced:
+                self.stats['coalesced'] += 1
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def enqueue_once(self, queue, key: str, func: Callable, args: Tuple = (),
+                     job_timeout: int = 300, on_attach: Optional[Callable[[str], None]] = None,
+                     **enqueue_kwargs) -> Tuple[Any, bool]:
+        """
+        Enqueue an RQ job unless an identical one is already in flight
+
+        Args:
+            queue: RQ Queue
+            key: Coalescing key (see analysis_cache_key)
+            func: Task function
+            args: Task arguments
+            job_timeout: Job timeout in seconds (also bounds the in-flight marker)
+            on_attach: Called with a job id before it is enqueued or checked for being
+                in flight (e.g. track_session_job), so a job finishing right after the
+                check already knows about the caller
+            **enqueue_kwargs: Extra Queue.enqueue keyword arguments
+
+        Returns:
+            (job, coalesced) - coalesced is True if attached to an existing job
+        """
+        from rq.job import Job
+        from rq.exceptions import NoSuchJobError
+
+        redis_key = self._redis_key(key)
+        marker_ttl = job_timeout + 60
+        attach = on_attach or (lambda job_id: None)
+
+        for _ in range(2):
+            job_id = str(uuid.uuid4())
+
+            # Claim the key first so concurrent submitters cannot both enqueue
+            if self.redis_conn.set(redis_key, job_id, nx=True, ex=marker_ttl):
+                try:
+                    attach(job_id)
+                    job = queue.enqueue(func, args=args, job_timeout=job_timeout, job_id=job_id, **enqueue_kwargs)
+                except Exception:
+                    # Never leave a marker for a job that does not exist
+                    self._release(redis_key, job_id)
+                    raise
+                self._count(coalesced=False)
+                return job, False
+
+            existing_id = self.redis_conn.get(redis_key)
+            if existing_id is None:
+                continue  # Marker expired between SET and GET - try to claim again
+            if isinstance(existing_id, bytes):
+                existing_id = existing_id.decode('utf-8')
+
+            # Register before looking at the job's state, never after
+            attach(existing_id)
+            try:
+                existing_job = Job.fetch(existing_id, connection=self.redis_conn)
+            except NoSuchJobError:
+                ttl = self.redis_conn.ttl(redis_key)
+                if ttl is not None and ttl >= 0 and marker_ttl - ttl <= PENDING_MARKER_GRACE:
+                    # The claiming submitter is about to enqueue this id
+                    print(f"🔗 Coalesced onto pending job {existing_id[:8]}")
+                    self._count(coalesced=True)
+                    return Job(existing_id, connection=self.redis_conn), True
+                # Stale marker (its job was never enqueued or has expired) - release it and retry
+                self._release(redis_key, existing_id)
+                continue
+
+            if existing_job.get_status(refresh=False) in IN_FLIGHT_STATES:
+                print(f"🔗 Coalesced duplicate request onto job {existing_id[:8]}")
+                self._count(coalesced=True)
+                return existing_job, True
+
+            # Previous job already finished/failed - release its marker and retry
+            self._release(redis_key, existing_id)
+
+        # Could not claim the key (heavy contention) - fall back to a plain enqueue
+        job_id = str(uuid.uuid4())
+        attach(job_id)
+        job = queue.enqueue(func, args=args, job_timeout=job_timeout, job_id=job_id, **enqueue_kwargs)
+        self._count(coalesced=False)
+        return job, False
+
+    def _release(self, redis_key: str, job_id: str):
+        """Delete an in-flight marker if it still points at job_id (compare-and-delete)"""
+        with self.redis_conn.pipeline() as pipe:
+            try:
+                pipe.watch(redis_key)
+                current = pipe.get(redis_key)
+                if isinstance(current, bytes):
+                    current = current.decode('utf-8')
+                pipe.multi()
+                if current == job_id:
+                    pipe.delete(redis_key)
+                pipe.execute()
+            except Exception:
+                pass
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run func once per key; concurrent callers with the same key share the result
+
+        Args:
+            key: Coalescing key
+            func: Callable to run
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            (result, coalesced) - coalesced is True if the result came from another caller
+
+        Raises:
+            Whatever func raised (re-raised for every waiting caller)
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            print(f"🔗 Waiting on in-flight analysis {key[:8]}")
+            self._count(coalesced=True)
+            return future.result(), True
+
+        self._count(coalesced=False)
+        try:
+            result = func(*args, **kwargs)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        with self._stats_lock:
+            stats = self.stats.copy()
+        with self._lock:
+            stats['in_process_inflight'] = len(self._inflight)
+        return stats
+
+
+# Global instance
+_request_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_request_coalescer(redis_conn=None) -> RequestCoalescer:
+    """Get or create the global request coalescer instance"""
+    global _request_coalescer
+
+    with _coalescer_lock:
+        if _request_coalescer is None:
+            _request_coalescer = RequestCoalescer(redis_conn=redis_conn)
+
+        return _request_coalescer
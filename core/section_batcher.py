@@ -0,0 +1,211 @@
+"""
+Section Batching for AI-Prism Analysis
+Packs several small document sections into a single Bedrock request
+
+Why:
+- Many write-ups have a dozen short sections
+- Each section used to cost one full request against the Bedrock RPM budget
+- Each request also resent the same large system prompt
+
+How:
+- Sections under BATCH_SECTION_TOKEN_THRESHOLD are grouped into batches
+- One prompt asks for feedback keyed by section name
+- The response is split back into per-section feedback lists
+
+Usage:
+    from core.section_batcher import plan_section_batches, build_batch_analysis_prompt, split_batch_response
+
+    batches, singles = plan_section_batches(review_session.sections)
+"""
+
+import os
+import re
+import json
+from typing import Dict, List, Tuple, Any
+
+
+# Sections estimated below this many tokens are eligible for batching
+BATCH_SECTION_TOKEN_THRESHOLD = int(os.environ.get('BATCH_SECTION_TOKEN_THRESHOLD', '1500'))
+
+# Upper bound on the combined section content packed into one request
+MAX_BATCH_TOKENS = int(os.environ.get('BATCH_MAX_TOKENS', '6000'))
+
+# Upper bound on sections per request (keeps the response within max_tokens)
+MAX_SECTIONS_PER_BATCH = int(os.environ.get('BATCH_MAX_SECTIONS', '6'))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count for text
+    Claude uses ~4 characters per token on average (same rule as TokenCounter)
+    """
+    if not text:
+        return 0
+    return len(text) // 4
+
+
+def plan_section_batches(sections: Dict[str, str]) -> Tuple[List[List[str]], List[str]]:
+    """
+    Split sections into batches of small sections and large standalone sections
+
+    Args:
+        sections: Ordered dict of section name -> content
+
+    Returns:
+        (batches, singles)
+            batches: List of section-name lists, each analyzed in one request
+            singles: Section names too large to batch (analyzed individually)
+    """
+    batches: List[List[str]] = []
+    singles: List[str] = []
+
+    current: List[str] = []
+    current_tokens = 0
+
+    for section_name, content in sections.items():
+        if not content or not content.strip():
+            continue
+
+        tokens = estimate_tokens(content)
+        if tokens >= BATCH_SECTION_TOKEN_THRESHOLD:
+            singles.append(section_name)
+            continue
+
+        if current and (current_tokens + tokens > MAX_BATCH_TOKENS or len(current) >= MAX_SECTIONS_PER_BATCH):
+            batches.append(current)
+            current, current_tokens = [], 0
+
+        current.append(section_name)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    # A batch of one is just a normal request
+    for batch in [b for b in batches if len(b) == 1]:
+        batches.remove(batch)
+        singles.append(batch[0])
+
+    return batches, singles
+
+
+def build_batch_analysis_prompt(sections: Dict[str, str], doc_type: str = "Full Write-up",
+                                max_feedback_items: int = 5) -> str:
+    """
+    Build one user prompt covering several sections
+
+    Args:
+        sections: Section name -> content for this batch
+        doc_type: Document type
+        max_feedback_items: Max feedback items per section
+
+    Returns:
+        Prompt string asking for feedback keyed by section name
+    """
+    section_blocks = []
+    for index, (section_name, content) in enumerate(sections.items(), 1):
+        section_blocks.append(
+            f"### SECTION {index}: {section_name}\n"
+            f"<section name=\"{section_name}\">\n{content}\n</section>"
+        )
+
+    section_names = json.dumps(list(sections.keys()))
+
+    return f"""Analyze each of the following {len(sections)} sections of this {doc_type} independently.
+
+{chr(10).join(section_blocks)}
+
+ANALYSIS REQUIREMENTS (apply to EACH section separately):
+1. Identify gaps, weaknesses, or areas needing improvement
+2. Provide specific, actionable feedback
+3. Reference relevant Hawkeye checkpoints
+4. Provide at most {max_feedback_items} high-quality feedback items per section
+
+Return your analysis as a JSON object keyed by the EXACT section names {section_names}:
+{{
+    "sections": {{
+        "<section name>": {{
+            "feedback_items": [
+                {{
+                    "id": "unique_id",
+                    "type": "critical|important|suggestion",
+                    "category": "Investigation Process|Documentation|Root Cause|Timeline|etc",
+                    "description": "Clear description of the issue or gap",
+                    "suggestion": "Specific recommendation to fix it",
+                    "example": "Brief example if helpful",
+                    "quote": "Exact words from the section the issue is about (copied verbatim, one sentence at most; empty if it is about something missing)",
+                    "questions": ["Probing question 1?", "Question 2?"],
+                    "hawkeye_refs": [2, 5],
+                    "risk_level": "High|Medium|Low",
+                    "confidence": 0.85
+                }}
+            ]
+        }}
+    }}
+}}
+
+IMPORTANT:
+- Return ONLY valid JSON, no markdown formatting, no text before or after
+- Include EVERY section name listed above, even if its feedback_items list is empty
+- Never mix feedback between sections"""
+
+
+def split_batch_response(response_text: str, section_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a batched analysis response back into per-section feedback items
+
+    Args:
+        response_text: Raw model response
+        section_names: Section names that were sent in the batch
+
+    Returns:
+        Dict of section name -> raw feedback item list, for the sections
+        present in the response only (missing or misnamed sections are left out)
+
+    Raises:
+        ValueError: If the response contains no parseable JSON or is not keyed by section
+    """
+    cleaned = response_text.strip()
+    if cleaned.startswith('```'):
+        cleaned = re.sub(r'^```(?:json)?\s*', '', cleaned)
+        cleaned = re.sub(r'\s*```$', '', cleaned)
+
+    try:
+        parsed = json.loads(cleaned)
+    except json.JSONDecodeError:
+        json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
+        if not json_match:
+            raise ValueError("No JSON found in batched analysis response")
+        parsed = json.loads(json_match.group(0))
+
+    if not isinstance(parsed, dict):
+        raise ValueError("Batched analysis response is not a JSON object")
+
+    keyed_by_section = isinstance(parsed.get('sections'), dict)
+    section_map = parsed['sections'] if keyed_by_section else parsed
+
+    # Match returned keys case/whitespace-insensitively to the names we sent
+    normalized = {name.strip().lower(): name for name in section_names}
+    results: Dict[str, List[Dict[str, Any]]] = {}
+
+    for returned_name, payload in section_map.items():
+        section_name = normalized.get(str(returned_name).strip().lower())
+        if section_name is None:
+            print(f"⚠️ Batch response contained unknown section: {returned_name}")
+            continue
+
+        if isinstance(payload, dict):
+            items = payload.get('feedback_items', [])
+        elif isinstance(payload, list):
+            items = payload
+        else:
+            print(f"⚠️ Batch response for section {returned_name} is not a feedback list")
+            continue
+
+        results[section_name] = [item for item in items if isinstance(item, dict)]
+
+    # A single-section shaped reply (e.g. {"feedback_items": [...]}) cannot be split safely
+    if not keyed_by_section and not results:
+        raise ValueError("Batched analysis response is not keyed by section name")
+
+    return results
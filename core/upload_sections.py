@@ -0,0 +1,226 @@
+"""
+Progressive Section Publishing for background document parsing
+
+/upload used to parse the document and detect sections inside the request.
+Parsing now runs as a background task (app.process_uploaded_document) and
+the request returns as soon as the file is saved.
+
+How:
+- The parse task publishes each section as soon as the next header shows
+  it is complete (publish_section), then the final result (finish) with
+  the detection status (state parsing/done/failed, method, confidence,
+  refining; the task ids let /document_structure detect a task that died)
+- Published sections live outside the session: a Redis list + status hash
+  per session (cross-worker, SESSION_TTL) or an in-process dict
+- get_session() calls apply() while the session is still parsing, which
+  rebuilds the session's sections from the store - the same fold-in
+  pattern as rq_session_store. apply() is idempotent, so a request that
+  saves a stale copy of the session never loses sections: the next load
+  applies them again
+
+Usage:
+    from core.upload_sections import get_upload_section_store
+
+    store = get_upload_section_store(redis_conn)
+    store.start(session_id)
+    store.publish_section(session_id, title, paragraphs)
+    store.finish(session_id, extraction)
+    changed = store.apply(review_session)   # in get_session()
+"""
+
+import json
+import threading
+from dataclasses import astuple
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.docx_reader import DocxParagraph
+
+# Same lifetime as the Redis session itself
+UPLOAD_SECTIONS_TTL = 86400
+
+# Detection states
+PARSING = 'parsing'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class UploadSectionStore:
+    """
+    Sections published by background parse tasks, per session
+
+    Args:
+        redis_conn: Redis connection (None = in-process only)
+        key_prefix: Redis key prefix
+    """
+
+    def __init__(self, redis_conn=None, key_prefix: str = 'upload_sections'):
+        self.redis_conn = redis_conn
+        self.key_prefix = key_prefix
+
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _keys(self, session_id: str) -> Tuple[str, str]:
+        return f"{self.key_prefix}:{session_id}", f"{self.key_prefix}:{session_id}:status"
+
+    def start(self, session_id: str):
+        """Mark a session as parsing (no sections yet)"""
+        self._write(session_id, status={'state': PARSING}, sections=[], replace=True, create=True)
+
+    def publish_section(self, session_id: str, title: str, paragraphs: List[DocxParagraph]):
+        """Add one completed section (a later section with the same title replaces it)"""
+        self._write(session_id, sections=[(title, paragraphs)])
+
+    def finish(self, session_id: str, extraction: Dict[str, Any], refining: Optional[bool] = None,
+               refine_task_id: Optional[str] = None):
+        """
+        Publish the final sections of a document
+
+        Args:
+            session_id: Session id
+            extraction: DocumentAnalyzer.extract_sections() result
+            refining: Whether AI detection still runs (default: extraction['needs_ai'])
+            refine_task_id: Task running the AI detection (lets /document_structure notice if it dies)
+        """
+        status = {
+            'state': DONE,
+            'method': extraction['method'],
+            'confidence': extraction['confidence'],
+            'refining': extraction['needs_ai'] if refining is None else refining
+        }
+        if refine_task_id:
+            status['refine_task_id'] = refine_task_id
+        self._write(
+            session_id,
+            status=status,
+            sections=list(extraction['section_paragraphs'].items()),
+            replace=True
+        )
+
+    def update_status(self, session_id: str, **fields):
+        """Change status fields (e.g. refining=False) without touching the sections"""
+        self._write(session_id, status=fields)
+
+    def fail(self, session_id: str, error: str):
+        """Record that parsing failed"""
+        self._write(session_id, status={'state': FAILED, 'error': error})
+
+    def apply(self, review_session) -> bool:
+        """
+        Bring a session's sections and section_detection up to date with the store
+
+        Args:
+            review_session: ReviewSession whose section_detection state is 'parsing'
+
+        Returns:
+            True if the session changed (caller should save it)
+        """
+        status, sections = self._read(review_session.session_id)
+        if not status:
+            return False
+
+        detection = dict(getattr(review_session, 'section_detection', {}) or {})
+        new_detection = {**detection, **status}
+        titles_before = list(review_session.sections.keys())
+
+        section_texts, section_paragraphs, paragraph_indices = {}, {}, {}
+        for title, paras in sections:
+            section_texts[title] = '\n\n'.join(para.text.strip() for para in paras)
+            section_paragraphs[title] = paras
+            paragraph_indices[title] = [para.index for para in paras]
+
+        review_session.sections = section_texts
+        review_session.section_paragraphs = section_paragraphs
+        review_session.paragraph_indices = paragraph_indices
+        review_session.section_detection = new_detection
+
+        if self.redis_conn is None and status.get('state') in (DONE, FAILED):
+            # In-process sessions are the same object - nothing can overwrite them with a stale copy
+            self.clear(review_session.session_id)
+
+        return titles_before != list(section_texts.keys()) or detection != new_detection
+
+    def clear(self, session_id: str):
+        """Drop a session's published sections"""
+        if self.redis_conn is not None:
+            self.redis_conn.delete(*self._keys(session_id))
+        else:
+            with self._lock:
+                self._local.pop(session_id, None)
+
+    # ------------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------------
+
+    def _write(self, session_id: str, status: Optional[Dict[str, Any]] = None,
+               sections: Optional[List[Tuple[str, List[DocxParagraph]]]] = None, replace: bool = False,
+               create: bool = False):
+        if self.redis_conn is None:
+            with self._lock:
+                if create:
+                    self._local[session_id] = {'status': {}, 'sections': []}
+                entry = self._local.get(session_id)
+                if entry is None:
+                    return  # Already applied to the (in-process) session and cleared
+                if status:
+                    entry['status'].update(status)
+                if replace:
+                    entry['sections'] = []
+                entry['sections'].extend(sections or [])
+            return
+
+        sections_key, status_key = self._keys(session_id)
+        with self.redis_conn.pipeline() as pipe:
+            if replace:
+                pipe.delete(sections_key)
+            if sections:
+                pipe.rpush(sections_key, *[
+                    json.dumps([title, [astuple(para) for para in paras]], separators=(',', ':'))
+                    for title, paras in sections
+                ])
+            if status:
+                pipe.hset(status_key, mapping={name: json.dumps(value) for name, value in status.items()})
+            pipe.expire(sections_key, UPLOAD_SECTIONS_TTL)
+            pipe.expire(status_key, UPLOAD_SECTIONS_TTL)
+            pipe.execute()
+
+    def _read(self, session_id: str) -> Tuple[Dict[str, Any], List[Tuple[str, List[DocxParagraph]]]]:
+        if self.redis_conn is None:
+            with self._lock:
+                entry = self._local.get(session_id)
+                if entry is None:
+                    return {}, []
+                return dict(entry['status']), list(entry['sections'])
+
+        sections_key, status_key = self._keys(session_id)
+        with self.redis_conn.pipeline(transaction=True) as pipe:
+            pipe.hgetall(status_key)
+            pipe.lrange(sections_key, 0, -1)
+            raw_status, raw_sections = pipe.execute()
+
+        status = {}
+        for name, value in raw_status.items():
+            name = name.decode('utf-8') if isinstance(name, bytes) else name
+            status[name] = json.loads(value)
+
+        sections = []
+        for raw in raw_sections:
+            title, rows = json.loads(raw)
+            sections.append((title, [DocxParagraph(*row) for row in rows]))
+        return status, sections
+
+
+# Global instance
+_upload_section_store = None
+_store_lock = threading.Lock()
+
+
+def get_upload_section_store(redis_conn=None) -> UploadSectionStore:
+    """Get or create the global upload section store"""
+    global _upload_section_store
+
+    with _store_lock:
+        if _upload_section_store is None:
+            _upload_section_store = UploadSectionStore(redis_conn=redis_conn)
+
+        return _upload_section_store
@@ -40,15 +40,22 @@ echo ""
 cd "$(dirname "$0")"
 
 echo "💻 Worker command:"
-echo "   rq worker analysis chat monitoring default --url redis://localhost:6379/0"
+echo "   rq worker chat analysis bulk monitoring default --with-scheduler --url redis://localhost:6379/0"
 echo ""
 
 # Start worker with all queues
 # The worker will pick jobs from any of these queues
+# --with-scheduler re-enqueues jobs retried with backoff (see rq_retry.py)
 # ✅ OBJC_DISABLE_INITIALIZE_FORK_SAFETY=YES fixes macOS fork() issues with Objective-C runtime
-OBJC_DISABLE_INITIALIZE_FORK_SAFETY=YES rq worker analysis chat monitoring default --url redis://localhost:6379/0
+OBJC_DISABLE_INITIALIZE_FORK_SAFETY=YES rq worker chat analysis bulk monitoring default --with-scheduler --url redis://localhost:6379/0
 
 # Note: To run multiple workers in parallel, use:
 # rq worker analysis &
 # rq worker chat &
 # rq worker monitoring default &
+#
+# Pre-warmed pool (no fork per job, resources loaded once per worker):
+# python rq_worker.py --workers 4
+#
+# Autoscaling pool (RQ_MIN_WORKERS..RQ_MAX_WORKERS, follows queue depth and wait time):
+# python rq_supervisor.py --min 1 --max 4
@@ -16,6 +16,8 @@ backlog = 4096  # Increased from 2048 for high concurrency
 # With 3 instances minimum = 15 workers handling 100+ users
 workers = (multiprocessing.cpu_count() * 2) + 1  # 5 workers on t3.large
 worker_class = "gevent"  # Changed to gevent for better concurrency
+# CPU-bound docx work runs on CPU_OFFLOAD_WORKERS real threads per worker (core/cpu_offload)
+# so one large document does not stall the other greenlets
 worker_connections = 2000  # Increased from 1000 for more concurrent connections
 max_requests = 2000  # Restart workers after 2000 requests
 max_requests_jitter = 100
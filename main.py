@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 AI-Prism Main Entry Point
-Single file to start everything - Flask + Celery Worker
+Single file to start everything - Flask + autoscaling pre-warmed RQ worker pool
 Works on both local development and App Runner
 """
 
@@ -20,47 +20,78 @@ os.environ.setdefault('PORT', '8080')
 os.environ.setdefault('CELERY_BROKER_URL', 'sqs://')
 os.environ.setdefault('SQS_QUEUE_PREFIX', 'aiprism-')
 
-def start_celery_worker():
-    """Start Celery worker as subprocess"""
-    print("🔧 Starting Celery worker in background...")
+# Seconds the RQ worker pool gets on shutdown to finish in-flight Bedrock calls and requeue jobs
+RQ_DRAIN_TIMEOUT = int(os.environ.get('RQ_DRAIN_TIMEOUT', '45'))
+
+
+def handle_sigterm(signum, frame):
+    """Treat SIGTERM (deploys, scale-down) like Ctrl+C so the worker pool is drained"""
+    raise KeyboardInterrupt()
+
+
+def stop_rq_workers(worker_process):
+    """Ask the worker pool to drain (it requeues unfinished jobs), killing it only after RQ_DRAIN_TIMEOUT"""
+    print(f"   Draining RQ worker pool (PID: {worker_process.pid}, up to {RQ_DRAIN_TIMEOUT}s)")
+    worker_process.terminate()
+    try:
+        worker_process.wait(timeout=RQ_DRAIN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        print("   ⚠️  Worker pool did not drain in time - killing it")
+        worker_process.kill()
+
+def start_bedrock_gateway():
+    """Start the asyncio Bedrock gateway (bedrock_gateway.py) if BEDROCK_GATEWAY_URL is set"""
+    if not os.environ.get('BEDROCK_GATEWAY_URL'):
+        return None
+
+    print(f"🔧 Starting Bedrock gateway on {os.environ['BEDROCK_GATEWAY_URL']}...")
+    sys.stdout.flush()
+
+    try:
+        gateway_process = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bedrock_gateway.py')],
+            env=os.environ.copy(),
+            stdout=None,
+            stderr=None
+        )
+        print(f"✅ Bedrock gateway started (PID: {gateway_process.pid})")
+        sys.stdout.flush()
+        return gateway_process
+
+    except Exception as e:
+        print(f"⚠️  Bedrock gateway error: {e}")
+        return None
+
+def start_rq_workers():
+    """Start the autoscaling RQ worker supervisor (rq_supervisor.py) as a subprocess"""
+    print("🔧 Starting autoscaling RQ worker pool in background...")
     sys.stdout.flush()
 
     try:
-        import subprocess
-
-        # Build celery command
-        celery_cmd = [
-            'celery',
-            '-A', 'celery_config.celery_app',
-            'worker',
-            '--loglevel=INFO',
-            '--concurrency=4',
-            '--queues=analysis,chat,monitoring,celery',
-            '--pool=solo',
-            '--without-gossip',
-            '--without-mingle',
-            '--without-heartbeat',
+        # Bounds come from RQ_MIN_WORKERS / RQ_MAX_WORKERS (see rq_supervisor.py)
+        worker_cmd = [
+            sys.executable,
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rq_supervisor.py'),
         ]
 
-        # Start Celery worker as subprocess
         # Pass current environment to subprocess
         env = os.environ.copy()
 
-        celery_process = subprocess.Popen(
-            celery_cmd,
+        worker_process = subprocess.Popen(
+            worker_cmd,
             env=env,
             # Don't capture output - let it print to console for debugging
             stdout=None,
             stderr=None
         )
 
-        print(f"✅ Celery worker started (PID: {celery_process.pid})")
+        print(f"✅ RQ worker pool started (PID: {worker_process.pid})")
         sys.stdout.flush()
 
-        return celery_process
+        return worker_process
 
     except Exception as e:
-        print(f"⚠️  Celery worker error: {e}")
+        print(f"⚠️  RQ worker pool error: {e}")
         import traceback
         traceback.print_exc()
         return None
@@ -98,11 +129,13 @@ def main():
     print(f"Port: {os.environ.get('PORT', 8080)}")
     print(f"AWS Region: {os.environ.get('AWS_REGION', 'us-east-1')}")
     print(f"S3 Bucket: {os.environ.get('S3_BUCKET_NAME', 'felix-s3-bucket')}")
-    print(f"Celery Backend: {os.environ.get('CELERY_RESULT_BACKEND', 's3://...')}")
+    print(f"Redis URL: {os.environ.get('REDIS_URL', 'redis://localhost:6379/0')}")
     print("=" * 60)
     print()
 
-    celery_process = None
+    worker_process = None
+    gateway_process = None
+    signal.signal(signal.SIGTERM, handle_sigterm)
 
     try:
         # Check if we're on App Runner - it doesn't support background processes
@@ -115,15 +148,16 @@ def main():
 
         if is_app_runner:
             print("🔧 Running on AWS App Runner - Background processes disabled")
-            print("   Using synchronous processing mode (no Celery worker)")
+            print("   Using synchronous processing mode (no RQ workers)")
             print("   All AI analysis will run inline")
             print()
         else:
-            # Local development - start Celery worker as subprocess
+            # Local development - start the RQ worker pool as a subprocess
             print("💻 Running in local development mode")
-            celery_process = start_celery_worker()
+            gateway_process = start_bedrock_gateway()
+            worker_process = start_rq_workers()
 
-            # Give Celery a moment to start
+            # Give the workers a moment to pre-warm
             import time
             time.sleep(3)
 
@@ -132,17 +166,19 @@ def main():
 
     except KeyboardInterrupt:
         print("\n🛑 Shutting down...")
-        if celery_process:
-            print(f"   Stopping Celery worker (PID: {celery_process.pid})")
-            celery_process.terminate()
-            celery_process.wait(timeout=5)
+        if worker_process:
+            stop_rq_workers(worker_process)
+        if gateway_process:
+            gateway_process.terminate()
         print("✅ Cleanup complete")
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
         import traceback
         traceback.print_exc()
-        if celery_process:
-            celery_process.terminate()
+        if worker_process:
+            worker_process.terminate()
+        if gateway_process:
+            gateway_process.terminate()
         return 1
 
     return 0
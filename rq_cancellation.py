@@ -0,0 +1,187 @@
+"""
+RQ-Native Job Cancellation for AI-Prism
+
+Abandoned analysis jobs used to keep running (and burning Bedrock quota)
+after users navigated away or reset their session - /cancel_task only
+revoked Celery tasks, which no longer exist.
+
+How:
+- Queued jobs are removed from their queue (Job.cancel)
+- Running jobs get a Redis cancel flag plus an RQ stop-job command;
+  rq_tasks checks the flag between Bedrock retries and stream chunks
+  and raises JobCancelled, so the worker stops within a chunk
+- Jobs are tracked per session, so resetting or deleting a session
+  cancels everything it still has in flight
+- Coalesced jobs (see core.request_coalescer) can be shared by several
+  sessions; a job is only cancelled once its last owning session lets go
+
+Usage:
+    from rq_cancellation import track_session_job, cancel_job, cancel_session_jobs
+
+    track_session_job(redis_conn, session_id, job.id)
+    cancel_session_jobs(redis_conn, session_id)
+"""
+
+from typing import Any, Dict, Optional
+
+# Redis keys
+CANCEL_KEY = 'cancel:{}'                  # Cancel flag for a running job
+SESSION_JOBS_KEY = 'session_jobs:{}'      # Job ids submitted by a session (set)
+JOB_SESSIONS_KEY = 'job_sessions:{}'      # Sessions sharing a job (set)
+
+# Cancel flags outlive any job timeout; tracking sets outlive the session
+CANCEL_FLAG_TTL = 3600
+SESSION_JOBS_TTL = 86400
+
+# Job states that can still be removed from a queue
+CANCELLABLE_STATES = ('queued', 'deferred', 'scheduled')
+
+
+class JobCancelled(Exception):
+    """Raised inside a task when its job has been cancelled"""
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def track_session_job(connection, session_id: Optional[str], job_id: str):
+    """
+    Record that a session is waiting on a job
+
+    Args:
+        connection: Redis connection
+        session_id: Owning session
+        job_id: RQ job id (new or coalesced)
+    """
+    if connection is None or not session_id:
+        return
+
+    with connection.pipeline() as pipe:
+        pipe.sadd(SESSION_JOBS_KEY.format(session_id), job_id)
+        pipe.expire(SESSION_JOBS_KEY.format(session_id), SESSION_JOBS_TTL)
+        pipe.sadd(JOB_SESSIONS_KEY.format(job_id), session_id)
+        pipe.expire(JOB_SESSIONS_KEY.format(job_id), SESSION_JOBS_TTL)
+        pipe.execute()
+
+
+def is_cancel_requested(connection, job_id: str) -> bool:
+    """Check whether a running job has been asked to stop"""
+    return bool(connection.exists(CANCEL_KEY.format(job_id)))
+
+
+def raise_if_cancelled(job=None):
+    """
+    Raise JobCancelled if the current RQ job has been cancelled
+
+    No-op outside of an RQ worker (e.g. synchronous mode).
+
+    Args:
+        job: RQ job (defaults to rq.get_current_job())
+    """
+    if job is None:
+        from rq import get_current_job
+        job = get_current_job()
+
+    if job is not None and is_cancel_requested(job.connection, job.id):
+        raise JobCancelled(f"Job {job.id} was cancelled")
+
+
+def cancel_job(connection, job_id: str) -> str:
+    """
+    Cancel a job whatever state it is in
+
+    Args:
+        connection: Redis connection
+        job_id: RQ job id
+
+    Returns:
+        'cancelled' (removed from queue), 'stopping' (running, stop signalled),
+        'not_found', or the job's final state if it had already ended
+    """
+    from rq.job import Job
+    from rq.command import send_stop_job_command
+    from rq.exceptions import NoSuchJobError, InvalidJobOperation
+
+    try:
+        job = Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        return 'not_found'
+
+    status = job.get_status(refresh=False)
+
+    if status in CANCELLABLE_STATES:
+        try:
+            job.cancel()
+            print(f"🛑 Cancelled queued job {job_id[:8]}")
+
+            from rq_events import publish_job_event
+            publish_job_event(job, connection, 'REVOKED')
+            return 'cancelled'
+        except InvalidJobOperation:
+            status = job.get_status()
+
+    if status == 'started':
+        # Flag first so the task sees it even if the stop command races the job start
+        connection.set(CANCEL_KEY.format(job_id), 1, ex=CANCEL_FLAG_TTL)
+        try:
+            send_stop_job_command(connection, job_id)
+        except InvalidJobOperation:
+            pass  # Finished between fetch and stop
+        print(f"🛑 Stop requested for running job {job_id[:8]}")
+        return 'stopping'
+
+    return status
+
+
+def release_session_job(connection, session_id: Optional[str], job_id: str) -> Dict[str, Any]:
+    """
+    Drop a session's interest in a job, cancelling it if nobody else waits on it
+
+    Args:
+        connection: Redis connection
+        session_id: Session letting go (None = cancel unconditionally)
+        job_id: RQ job id
+
+    Returns:
+        Dict with job_id, outcome and shared (True if other sessions still wait on it)
+    """
+    owners_key = JOB_SESSIONS_KEY.format(job_id)
+
+    if session_id:
+        connection.srem(SESSION_JOBS_KEY.format(session_id), job_id)
+        connection.srem(owners_key, session_id)
+
+        if connection.scard(owners_key) > 0:
+            return {'job_id': job_id, 'outcome': 'detached', 'shared': True}
+
+    connection.delete(owners_key)
+    return {'job_id': job_id, 'outcome': cancel_job(connection, job_id), 'shared': False}
+
+
+def cancel_session_jobs(connection, session_id: Optional[str]) -> Dict[str, str]:
+    """
+    Cancel every job a session is still waiting on
+
+    Args:
+        connection: Redis connection
+        session_id: Session being reset or deleted
+
+    Returns:
+        Dict of job id -> outcome
+    """
+    if connection is None or not session_id:
+        return {}
+
+    session_key = SESSION_JOBS_KEY.format(session_id)
+    outcomes = {}
+
+    for job_id in connection.smembers(session_key):
+        job_id = _decode(job_id)
+        outcomes[job_id] = release_session_job(connection, session_id, job_id)['outcome']
+
+    connection.delete(session_key)
+
+    if outcomes:
+        print(f"🛑 Session {session_id[:8]}: released {len(outcomes)} job(s) {outcomes}")
+    return outcomes
@@ -0,0 +1,132 @@
+"""
+Checkpointing & Graceful Drain for AI-Prism RQ Jobs
+
+Deploys and scale-downs used to kill in-flight analysis; the job then
+restarted from scratch and paid for the same Bedrock call again.
+
+How:
+- Drain: on SIGTERM/SIGINT the worker (rq_worker.PrewarmedWorker) calls
+  request_drain() and stops taking new jobs. A running job finishes the
+  Bedrock call it is in, but raises JobDrained at its next safe point
+  (before another Bedrock attempt or during a retry backoff); the worker
+  puts the same job back at the front of its queue for another worker
+- Checkpoint: the Bedrock response of a job is saved under
+  checkpoint:<job_id> as soon as it arrives. A resumed, retried or
+  replayed job finds it and skips the call (no tokens spent twice)
+- Checkpoints are dropped when the job succeeds, is cancelled or fails
+  permanently (e.g. an unparseable response must not be reused)
+
+Usage:
+    from rq_checkpoint import checkpointed, raise_if_draining
+
+    result = checkpointed(job, 'bedrock', lambda: invoke_bedrock_model(system_prompt, user_prompt))
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Per-job checkpoint (hash: part name -> JSON value)
+CHECKPOINT_KEY = 'checkpoint:{}'
+
+# Kept long enough for a dead letter to be replayed the next day
+CHECKPOINT_TTL = 86400
+
+# Set once this worker process has been asked to shut down
+_drain_requested = threading.Event()
+
+
+class JobDrained(Exception):
+    """Raised inside a task when its worker is shutting down; the job is requeued"""
+
+
+def request_drain():
+    """Ask jobs in this process to stop at their next safe point"""
+    _drain_requested.set()
+
+
+def is_draining() -> bool:
+    """Check whether this worker process is shutting down"""
+    return _drain_requested.is_set()
+
+
+def raise_if_draining():
+    """
+    Raise JobDrained if this worker is shutting down
+
+    Called only at safe points - never while a Bedrock call is streaming,
+    so a call that has started is always paid for once and checkpointed.
+    """
+    if is_draining():
+        raise JobDrained("Worker is shutting down - job will resume on another worker")
+
+
+def load_checkpoint(job) -> Dict[str, Any]:
+    """
+    All checkpointed parts of a job
+
+    Args:
+        job: RQ job (None outside a worker)
+
+    Returns:
+        Dict of part name -> value
+    """
+    if job is None:
+        return {}
+
+    raw = job.connection.hgetall(CHECKPOINT_KEY.format(job.id))
+    parts = {}
+    for part, value in raw.items():
+        part = part.decode('utf-8') if isinstance(part, bytes) else part
+        try:
+            parts[part] = json.loads(value)
+        except (TypeError, ValueError):
+            continue
+    return parts
+
+
+def save_checkpoint(job, part: str, value: Any):
+    """
+    Store one completed part of a job
+
+    Args:
+        job: RQ job (no-op if None)
+        part: Part name (e.g. 'bedrock')
+        value: JSON-serializable value
+    """
+    if job is None:
+        return
+
+    key = CHECKPOINT_KEY.format(job.id)
+    with job.connection.pipeline() as pipe:
+        pipe.hset(key, part, json.dumps(value))
+        pipe.expire(key, CHECKPOINT_TTL)
+        pipe.execute()
+
+
+def checkpointed(job, part: str, compute: Callable[[], Any]) -> Any:
+    """
+    Return a checkpointed part, computing and saving it if missing
+
+    Args:
+        job: Current RQ job (None = no checkpointing)
+        part: Part name
+        compute: Produces the value (JSON-serializable)
+
+    Returns:
+        The stored or freshly computed value
+    """
+    stored = load_checkpoint(job).get(part)
+    if stored is not None:
+        print(f"⏩ [RQ] Job {job.id[:8]}: resuming from checkpoint '{part}'")
+        return stored
+
+    value = compute()
+    save_checkpoint(job, part, value)
+    return value
+
+
+def clear_checkpoint(connection, job_id: Optional[str]):
+    """Drop a job's checkpoint"""
+    if connection is not None and job_id:
+        connection.delete(CHECKPOINT_KEY.format(job_id))
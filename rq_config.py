@@ -27,9 +27,14 @@ _redis_conn = None
 _queues_initialized = False
 analysis_queue = None
 chat_queue = None
+bulk_queue = None
 monitoring_queue = None
 default_queue = None
 
+# Order workers listen in - RQ always drains earlier queues first, so this IS the priority
+# (interactive chat and on-screen analysis before bulk/background work)
+QUEUE_PRIORITY = ['chat', 'analysis', 'bulk', 'monitoring', 'default']
+
 def get_redis_conn():
     """
     Get Redis connection (lazy initialization)
@@ -53,7 +58,7 @@ def get_redis_conn():
 
 def _initialize_queues():
     """Initialize RQ queues (called only once)"""
-    global _queues_initialized, analysis_queue, chat_queue, monitoring_queue, default_queue
+    global _queues_initialized, analysis_queue, chat_queue, bulk_queue, monitoring_queue, default_queue
 
     if _queues_initialized:
         return
@@ -63,12 +68,14 @@ def _initialize_queues():
         # Create dummy None queues
         analysis_queue = None
         chat_queue = None
+        bulk_queue = None
         monitoring_queue = None
         default_queue = None
     else:
         # Create real queues
         analysis_queue = Queue('analysis', connection=conn, default_timeout=300)
         chat_queue = Queue('chat', connection=conn, default_timeout=120)
+        bulk_queue = Queue('bulk', connection=conn, default_timeout=300)
         monitoring_queue = Queue('monitoring', connection=conn, default_timeout=60)
         default_queue = Queue('default', connection=conn)
 
@@ -79,7 +86,7 @@ def get_queue(queue_name='default'):
     Get a queue by name
 
     Args:
-        queue_name: One of 'analysis', 'chat', 'monitoring', 'default'
+        queue_name: One of 'analysis', 'chat', 'bulk', 'monitoring', 'default'
 
     Returns:
         RQ Queue instance or None if Redis unavailable
@@ -90,6 +97,7 @@ def get_queue(queue_name='default'):
     queues = {
         'analysis': analysis_queue,
         'chat': chat_queue,
+        'bulk': bulk_queue,
         'monitoring': monitoring_queue,
         'default': default_queue
     }
@@ -126,7 +134,7 @@ if __name__ != "__main__":
         if is_rq_available():
             print("✅ RQ configured with local Redis (No AWS costs!)")
             print(f"   Redis URL: {REDIS_URL}")
-            print(f"   Queues: analysis, chat, monitoring, default")
+            print(f"   Queues (priority order): {', '.join(QUEUE_PRIORITY)}")
             print(f"   Free & Open Source: 100%")
         else:
             print(f"⚠️  Redis not available (REDIS_URL={REDIS_URL})")
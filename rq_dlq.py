@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Dead-Letter Queue for Failed AI-Prism RQ Jobs
+
+Jobs that fail permanently or exhaust their retries (see rq_retry) are
+recorded here with their failure category, so they can be inspected and
+replayed in bulk after an incident (e.g. a Bedrock regional outage)
+instead of every user re-running their analysis by hand.
+
+How:
+- The scheduler's on-failure callback calls handle_failed_job(), which
+  classifies the error, lets RQ retry transient failures while retries
+  are left, and dead-letters everything else
+- Dead letters are a Redis sorted set (by failure time) plus a hash of
+  JSON entries; the job itself stays in RQ's FailedJobRegistry
+- Replay puts the SAME job id back on its queue with a fresh retry budget
+  (bulk jobs go back through the fair-share dispatcher), so sessions still
+  waiting on it get the result (see rq_session_store)
+
+Usage:
+    python rq_dlq.py stats
+    python rq_dlq.py list [--category transient] [--limit 50]
+    python rq_dlq.py replay [--category transient] [--limit 100] [job_id ...]
+    python rq_dlq.py purge [job_id ...]
+
+    Also available over HTTP: GET /admin/dead_letters, POST /admin/dead_letters/replay
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rq_retry import TRANSIENT, CANCELLED, DRAINED, classify_failure, get_max_retries
+from rq_checkpoint import clear_checkpoint
+
+# Redis keys
+DLQ_KEY = 'dlq:jobs'              # job id -> failed_at (sorted set)
+DLQ_ENTRIES_KEY = 'dlq:entries'   # job id -> JSON entry (hash)
+
+# Longest error message kept per entry
+MAX_ERROR_LENGTH = 500
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _format_error(exc_type, exc_value) -> str:
+    name = exc_type.__name__ if exc_type is not None else 'Error'
+    return f"{name}: {exc_value}"[:MAX_ERROR_LENGTH]
+
+
+def handle_failed_job(job, connection, exc_type, exc_value) -> str:
+    """
+    Decide what happens to a failed job (called from the on-failure callback)
+
+    Runs before RQ's own failure handling, which reads job.retries_left
+    from this same job object - clearing it here stops the retry.
+
+    Args:
+        job: Failed RQ job
+        connection: Redis connection
+        exc_type: Exception class
+        exc_value: Exception instance
+
+    Returns:
+        'retrying', 'dead', 'cancelled' or 'drained'
+    """
+    category = classify_failure(exc_type, exc_value)
+    error = _format_error(exc_type, exc_value)
+
+    if category == DRAINED:
+        # Not a failure - rq_worker.PrewarmedWorker requeues the job as-is
+        job.meta['drained'] = True
+        job.save_meta()
+        return 'drained'
+
+    job.meta['attempts'] = job.meta.get('attempts', 0) + 1
+    job.meta['failure'] = {'category': category, 'error': error}
+
+    if category == TRANSIENT and (job.retries_left or 0) > 0:
+        outcome = 'retrying'
+        print(f"🔁 [RQ] Job {job.id[:8]} failed ({error}) - {job.retries_left} retr{'y' if job.retries_left == 1 else 'ies'} left")
+    else:
+        job.retries_left = 0
+        if category == CANCELLED:
+            outcome = 'cancelled'
+        else:
+            outcome = 'dead'
+            record_dead_letter(connection, job, category, error)
+
+        # Transient failures keep their checkpoint so a replay skips the finished Bedrock call
+        if category != TRANSIENT:
+            clear_checkpoint(connection, job.id)
+
+    job.save_meta()
+    return outcome
+
+
+def record_dead_letter(connection, job, category: str, error: str):
+    """
+    Add a job to the dead-letter queue
+
+    Args:
+        connection: Redis connection
+        job: Failed RQ job
+        category: Failure category (see rq_retry)
+        error: Error message
+    """
+    failed_at = time.time()
+    entry = {
+        'job_id': job.id,
+        'task': job.func_name,
+        'queue': job.origin,
+        'work_class': job.meta.get('work_class'),
+        'session_id': job.meta.get('session_id'),
+        'category': category,
+        'error': error,
+        'attempts': job.meta.get('attempts', 1),
+        'failed_at': failed_at
+    }
+
+    with connection.pipeline() as pipe:
+        pipe.zadd(DLQ_KEY, {job.id: failed_at})
+        pipe.hset(DLQ_ENTRIES_KEY, job.id, json.dumps(entry))
+        pipe.execute()
+
+    print(f"☠️  [DLQ] Job {job.id[:8]} ({entry['task']}) dead-lettered: {category} - {error}")
+
+
+def _remove_entries(connection, job_ids: Iterable[str]):
+    job_ids = list(job_ids)
+    if job_ids:
+        with connection.pipeline() as pipe:
+            pipe.zrem(DLQ_KEY, *job_ids)
+            pipe.hdel(DLQ_ENTRIES_KEY, *job_ids)
+            pipe.execute()
+
+
+def list_dead_letters(connection, category: Optional[str] = None,
+                      limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+    """
+    Dead letters, newest first
+
+    Args:
+        connection: Redis connection
+        category: Only this failure category (optional)
+        limit: Max entries returned (None = all)
+
+    Returns:
+        List of dead-letter entries
+    """
+    job_ids = [_decode(j) for j in connection.zrevrange(DLQ_KEY, 0, -1)]
+    if not job_ids:
+        return []
+
+    entries = []
+    for job_id, raw in zip(job_ids, connection.hmget(DLQ_ENTRIES_KEY, job_ids)):
+        if raw is None:
+            continue
+        entry = json.loads(_decode(raw))
+        if category and entry.get('category') != category:
+            continue
+        entries.append(entry)
+        if limit is not None and len(entries) >= limit:
+            break
+    return entries
+
+
+def get_dead_letter_stats(connection) -> Dict[str, Any]:
+    """Dead-letter counts per category and task"""
+    by_category = {}
+    by_task = {}
+    entries = list_dead_letters(connection, limit=None)
+    for entry in entries:
+        by_category[entry['category']] = by_category.get(entry['category'], 0) + 1
+        by_task[entry['task']] = by_task.get(entry['task'], 0) + 1
+    return {
+        'total': len(entries),
+        'by_category': by_category,
+        'by_task': by_task,
+        'oldest': entries[-1]['failed_at'] if entries else None
+    }
+
+
+def replay_dead_letter(connection, job_id: str) -> str:
+    """
+    Put a dead-lettered job back on its queue (same job id, fresh retries)
+
+    Args:
+        connection: Redis connection
+        job_id: RQ job id
+
+    Returns:
+        'replayed', 'expired' (job data gone) or 'skipped' (no longer failed)
+    """
+    from rq.job import Job
+    from rq.exceptions import NoSuchJobError
+    from rq.registry import FailedJobRegistry
+    from rq_scheduler import FairScheduler
+
+    try:
+        job = Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        _remove_entries(connection, [job_id])
+        return 'expired'
+
+    if job.get_status(refresh=False) != 'failed':
+        _remove_entries(connection, [job_id])
+        return 'skipped'
+
+    FailedJobRegistry(job.origin, connection=connection).remove(job)
+
+    job.retries_left = get_max_retries(job.func_name) or None
+    job.started_at = None
+    job.ended_at = None
+    job.meta.pop('failure', None)
+    job.meta['attempts'] = 0
+    job.meta['replayed_at'] = time.time()
+    job.meta['submitted_at'] = time.time()
+
+    FairScheduler(connection).requeue(job)
+    _remove_entries(connection, [job_id])
+    return 'replayed'
+
+
+def replay_dead_letters(connection, job_ids: Optional[List[str]] = None,
+                        category: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Replay dead letters in bulk (oldest first, so work resumes in submission order)
+
+    Args:
+        connection: Redis connection
+        job_ids: Specific jobs (default: every dead letter matching category)
+        category: Only this failure category (optional)
+        limit: Max jobs replayed (optional)
+
+    Returns:
+        Dict with per-outcome counts and per-job outcomes
+    """
+    if job_ids is None:
+        entries = list_dead_letters(connection, category=category, limit=None)
+        job_ids = [entry['job_id'] for entry in reversed(entries)]
+    if limit is not None:
+        job_ids = job_ids[:limit]
+
+    outcomes = {job_id: replay_dead_letter(connection, job_id) for job_id in job_ids}
+
+    counts = {}
+    for outcome in outcomes.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    print(f"♻️  [DLQ] Replayed {counts.get('replayed', 0)} of {len(job_ids)} dead letter(s) {counts}")
+    return {'counts': counts, 'jobs': outcomes}
+
+
+def purge_dead_letters(connection, job_ids: Optional[List[str]] = None) -> int:
+    """
+    Drop dead letters without replaying them (the RQ jobs stay in the failed registry)
+
+    Args:
+        connection: Redis connection
+        job_ids: Specific jobs (default: all)
+
+    Returns:
+        Number of entries removed
+    """
+    if job_ids is None:
+        job_ids = [_decode(j) for j in connection.zrange(DLQ_KEY, 0, -1)]
+    _remove_entries(connection, job_ids)
+    return len(job_ids)
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main():
+    from rq_config import REDIS_URL, get_redis_conn
+
+    parser = argparse.ArgumentParser(description='AI-Prism dead-letter queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help='Dead-letter counts per category and task')
+
+    list_parser = subparsers.add_parser('list', help='Show dead letters (newest first)')
+    list_parser.add_argument('--category', help='transient or permanent')
+    list_parser.add_argument('--limit', type=int, default=50)
+
+    replay_parser = subparsers.add_parser('replay', help='Requeue dead letters')
+    replay_parser.add_argument('job_ids', nargs='*', help='Specific job ids (default: all matching)')
+    replay_parser.add_argument('--category', help='transient or permanent')
+    replay_parser.add_argument('--limit', type=int, default=None)
+
+    purge_parser = subparsers.add_parser('purge', help='Drop dead letters without replaying')
+    purge_parser.add_argument('job_ids', nargs='*', help='Specific job ids (default: all)')
+
+    args = parser.parse_args()
+
+    connection = get_redis_conn()
+    if connection is None:
+        print(f"❌ Redis not available (REDIS_URL={REDIS_URL})")
+        return 1
+
+    if args.command == 'stats':
+        print(json.dumps(get_dead_letter_stats(connection), indent=2))
+
+    elif args.command == 'list':
+        for entry in list_dead_letters(connection, category=args.category, limit=args.limit):
+            failed_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['failed_at']))
+            print(f"{failed_at}  {entry['job_id']}  {entry['task']:<28} {entry['category']:<10} "
+                  f"x{entry['attempts']}  {entry['error']}")
+
+    elif args.command == 'replay':
+        result = replay_dead_letters(connection, job_ids=args.job_ids or None,
+                                     category=args.category, limit=args.limit)
+        print(json.dumps(result['counts']))
+
+    elif args.command == 'purge':
+        print(f"Purged {purge_dead_letters(connection, args.job_ids or None)} dead letter(s)")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
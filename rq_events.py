@@ -0,0 +1,164 @@
+"""
+Server-Push Task Events for AI-Prism (SSE over Redis pub/sub)
+
+Every open tab used to poll /task_status/<task_id> once or twice a second
+for every running task, and each poll fetched and deserialized the RQ job.
+
+How:
+- Workers publish task events to the Redis channel events:<session_id>
+  (progress from update_job_progress, completion from the job callbacks,
+  cancellation from rq_cancellation)
+- GET /events streams that channel to the browser as Server-Sent Events
+- The browser subscribes once (static/js/task_events.js) and fetches
+  /task_status only when its task reaches a final state
+
+Event format (SSE event name 'task'):
+    {"task_id": "...", "state": "PROGRESS|SUCCESS|FAILURE|REVOKED",
+     "progress": 0-100, "status": "...", "session_applied": true}
+
+Usage:
+    from rq_events import publish_job_event, sse_stream
+
+    publish_job_event(job, connection, 'PROGRESS', progress=50, status='Invoking model')
+"""
+
+import json
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+from rq_cancellation import JOB_SESSIONS_KEY
+
+# Redis pub/sub channel per session
+EVENTS_CHANNEL = 'events:{}'
+
+# Comment line sent when idle so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = 15
+
+# Streams are recycled after this long; EventSource reconnects automatically
+SSE_MAX_STREAM_SECONDS = 300
+
+# Client reconnect delay (milliseconds)
+SSE_RETRY_MS = 3000
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def publish_event(connection, session_id: str, event_type: str, data: Dict[str, Any]) -> int:
+    """
+    Publish an event to a session's channel
+
+    Args:
+        connection: Redis connection
+        session_id: Target session
+        event_type: SSE event name (e.g. 'task')
+        data: JSON-serializable payload
+
+    Returns:
+        Number of subscribers that received it
+    """
+    message = json.dumps({'event': event_type, 'data': data})
+    return connection.publish(EVENTS_CHANNEL.format(session_id), message)
+
+
+def get_job_sessions(job, connection) -> Set[str]:
+    """
+    Sessions waiting on a job (the submitter plus coalesced attachments)
+
+    Args:
+        job: RQ job
+        connection: Redis connection
+
+    Returns:
+        Set of session ids
+    """
+    sessions = {_decode(s) for s in connection.smembers(JOB_SESSIONS_KEY.format(job.id))}
+    owner = job.meta.get('session_id')
+    if owner and owner != 'anonymous':
+        sessions.add(owner)
+    return sessions
+
+
+def publish_job_event(job, connection, state: str, progress: Optional[int] = None,
+                      status: Optional[str] = None, session_applied: Iterable[str] = ()) -> int:
+    """
+    Publish a task event to every session waiting on a job
+
+    Never raises - a lost event only means the client's safety poll picks it up.
+
+    Args:
+        job: RQ job
+        connection: Redis connection
+        state: PROGRESS, SUCCESS, FAILURE or REVOKED
+        progress: Progress percentage (optional)
+        status: Status message (optional)
+        session_applied: Sessions the result was already stored in (see rq_session_store)
+
+    Returns:
+        Number of sessions notified
+    """
+    try:
+        data = {'task_id': job.id, 'state': state}
+        if progress is not None:
+            data['progress'] = progress
+        if status:
+            data['status'] = status
+        applied = set(session_applied)
+
+        sessions = get_job_sessions(job, connection)
+        for session_id in sessions:
+            if session_id in applied:
+                publish_event(connection, session_id, 'task', dict(data, session_applied=True))
+            else:
+                publish_event(connection, session_id, 'task', data)
+        return len(sessions)
+    except Exception as e:
+        print(f"⚠️ Could not publish {state} event for job {job.id}: {e}")
+        return 0
+
+
+def _format_sse(event_type: str, data: Any) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event_type}\ndata: {payload}\n\n"
+
+
+def sse_stream(connection, session_id: str) -> Iterator[str]:
+    """
+    Generate the Server-Sent Events stream for one session
+
+    Args:
+        connection: Redis connection
+        session_id: Session to stream
+
+    Yields:
+        SSE-formatted strings
+    """
+    pubsub = connection.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(EVENTS_CHANNEL.format(session_id))
+
+    started = time.time()
+    last_sent = started
+
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        yield _format_sse('ready', {'session_id': session_id})
+
+        while time.time() - started < SSE_MAX_STREAM_SECONDS:
+            message = pubsub.get_message(timeout=1.0)
+
+            if message and message.get('type') == 'message':
+                try:
+                    envelope = json.loads(_decode(message['data']))
+                    yield _format_sse(envelope.get('event', 'message'), envelope.get('data', {}))
+                    last_sent = time.time()
+                except (TypeError, ValueError):
+                    continue
+            elif time.time() - last_sent >= SSE_HEARTBEAT_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.time()
+    finally:
+        try:
+            pubsub.close()
+        except Exception:
+            pass
@@ -0,0 +1,347 @@
+"""
+Queue Metrics for AI-Prism RQ Jobs (rolling HDR-style histograms in Redis)
+
+/queue_stats used to report only Celery counts, so there was no way to
+tell whether users were waiting on the queue or on Bedrock.
+
+How:
+- RQ stamps every job with enqueued_at / started_at / ended_at; the
+  scheduler also stamps meta['submitted_at'] (bulk jobs may wait in the
+  fair-share pending list before they reach RQ)
+- When a job ends, the scheduler callbacks record:
+    wait = submitted_at -> started_at   (first attempt only)
+    run  = started_at   -> ended_at     (every attempt)
+  per queue AND per work class, plus the job outcome for throughput
+- Samples go into log-linear histograms (16 linear sub-buckets per power
+  of two, ~6% relative error, like HdrHistogram) held in one Redis hash
+  per series per minute; the last METRICS_WINDOW_MINUTES are merged to
+  answer p50/p95/p99 with no sample lists to trim
+- get_queue_stats() adds live depth (queued, running, scheduled, failed,
+  pending fair-share) and worker counts
+
+Usage:
+    from rq_metrics import get_queue_stats
+
+    stats = get_queue_stats(redis_conn)
+    stats['queues']['analysis']['run']['p95']   # seconds
+"""
+
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+# Minutes of history merged into percentiles and throughput
+METRICS_WINDOW_MINUTES = int(os.environ.get('METRICS_WINDOW_MINUTES', '15'))
+
+# Linear sub-buckets per power of two (16 -> ~6% worst-case relative error)
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Redis keys (one hash per series per minute, expired after the window)
+HISTOGRAM_KEY = 'metrics:{}:{}:{}'       # kind (wait|run), series, minute -> {bucket: count, 'sum': ms}
+OUTCOME_KEY = 'metrics:outcome:{}:{}'   # series, minute -> {finished|failed|cancelled: count}
+
+HISTOGRAM_KINDS = ('wait', 'run')
+
+
+# ============================================================================
+# HISTOGRAM BUCKETS
+# ============================================================================
+
+def bucket_index(value_ms: float) -> int:
+    """
+    Histogram bucket for a duration
+
+    Values below SUB_BUCKETS ms get one bucket each; above that every power
+    of two is split into SUB_BUCKETS equal buckets.
+
+    Args:
+        value_ms: Duration in milliseconds
+
+    Returns:
+        Bucket index
+    """
+    value = max(0, int(value_ms))
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Highest duration (ms) that falls into a bucket"""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub_bucket = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub_bucket + 1) << shift) - 1
+
+
+def histogram_percentile(buckets: Dict[int, int], pct: float) -> float:
+    """
+    Nearest-rank percentile of a bucketed histogram
+
+    Args:
+        buckets: Bucket index -> count
+        pct: Percentile (0-100)
+
+    Returns:
+        Duration in milliseconds (0.0 if empty)
+    """
+    total = sum(buckets.values())
+    if total == 0:
+        return 0.0
+
+    rank = max(1, math.ceil(pct / 100.0 * total))
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        if seen >= rank:
+            return float(bucket_upper_bound(index))
+    return float(bucket_upper_bound(max(buckets)))
+
+
+# ============================================================================
+# RECORDING (called from the scheduler's job callbacks, inside the worker)
+# ============================================================================
+
+def _minute(timestamp: Optional[float] = None) -> int:
+    return int((timestamp if timestamp is not None else time.time()) // 60)
+
+
+def _timestamp(dt) -> Optional[float]:
+    if dt is None:
+        return None
+    from datetime import timezone
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _job_series(job) -> List[str]:
+    series = [f"queue:{job.origin}"]
+    work_class = job.meta.get('work_class')
+    if work_class:
+        series.append(f"class:{work_class}")
+    return series
+
+
+def _record(pipe, kind: str, series: List[str], value_ms: float, minute: int):
+    bucket = bucket_index(value_ms)
+    ttl = (METRICS_WINDOW_MINUTES + 2) * 60
+    for name in series:
+        key = HISTOGRAM_KEY.format(kind, name, minute)
+        pipe.hincrby(key, bucket, 1)
+        pipe.hincrbyfloat(key, 'sum', round(value_ms, 1))
+        pipe.expire(key, ttl)
+
+
+def job_timing(job) -> Dict[str, Optional[float]]:
+    """
+    Queue wait and execution time of a job
+
+    Args:
+        job: RQ job
+
+    Returns:
+        Dict with wait and run in seconds (None when not known yet)
+    """
+    started_at = _timestamp(job.started_at)
+    if started_at is None:
+        return {'wait': None, 'run': None}
+
+    submitted_at = job.meta.get('submitted_at') or _timestamp(job.enqueued_at)
+    ended_at = _timestamp(job.ended_at)
+    return {
+        'wait': max(0.0, started_at - submitted_at) if submitted_at else None,
+        'run': max(0.0, ended_at - started_at) if ended_at else None
+    }
+
+
+def record_job_timing(job, connection) -> Dict[str, Optional[float]]:
+    """
+    Record queue wait and execution time of a job that just ended
+
+    Wait is only recorded for a job's first attempt - retries and resumed
+    jobs include backoff/earlier runs, not queue time.
+
+    Args:
+        job: RQ job (started_at and ended_at set)
+        connection: Redis connection
+
+    Returns:
+        Dict with wait and run in seconds (None when not recorded)
+    """
+    timing = job_timing(job)
+    if timing['run'] is None:
+        return {'wait': None, 'run': None}
+
+    first_attempt = not job.meta.get('attempts') and not job.meta.get('resumes')
+    wait = timing['wait'] if first_attempt else None
+
+    series = _job_series(job)
+    minute = _minute()
+    with connection.pipeline(transaction=False) as pipe:
+        if wait is not None:
+            _record(pipe, 'wait', series, wait * 1000, minute)
+        _record(pipe, 'run', series, timing['run'] * 1000, minute)
+        pipe.execute()
+
+    return {'wait': wait, 'run': timing['run']}
+
+
+def record_job_outcome(job, connection, outcome: str):
+    """
+    Count a job that reached a final state (for throughput)
+
+    Args:
+        job: RQ job
+        connection: Redis connection
+        outcome: 'finished', 'failed' or 'cancelled'
+    """
+    minute = _minute()
+    ttl = (METRICS_WINDOW_MINUTES + 2) * 60
+    with connection.pipeline(transaction=False) as pipe:
+        for name in _job_series(job):
+            key = OUTCOME_KEY.format(name, minute)
+            pipe.hincrby(key, outcome, 1)
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def get_series_stats(connection, series_names: List[str],
+                     window_minutes: int = METRICS_WINDOW_MINUTES) -> Dict[str, Dict[str, Any]]:
+    """
+    Percentiles and throughput for several series over the rolling window
+
+    All minute hashes are read in one pipeline.
+
+    Args:
+        connection: Redis connection
+        series_names: e.g. ['queue:analysis', 'class:bulk']
+        window_minutes: Minutes of history to merge
+
+    Returns:
+        Dict of series -> {wait: {...}, run: {...}, throughput: {...}}
+    """
+    now_minute = _minute()
+    minutes = list(range(now_minute - window_minutes + 1, now_minute + 1))
+
+    with connection.pipeline(transaction=False) as pipe:
+        for name in series_names:
+            for kind in HISTOGRAM_KINDS:
+                for minute in minutes:
+                    pipe.hgetall(HISTOGRAM_KEY.format(kind, name, minute))
+            for minute in minutes:
+                pipe.hgetall(OUTCOME_KEY.format(name, minute))
+        responses = iter(pipe.execute())
+
+    stats = {}
+    for name in series_names:
+        series_stats = {}
+
+        for kind in HISTOGRAM_KINDS:
+            buckets = {}
+            total_ms = 0.0
+            for _ in minutes:
+                for field, count in next(responses).items():
+                    field = _decode(field)
+                    if field == 'sum':
+                        total_ms += float(count)
+                    else:
+                        buckets[int(field)] = buckets.get(int(field), 0) + int(count)
+
+            samples = sum(buckets.values())
+            series_stats[kind] = {
+                'samples': samples,
+                'mean': round(total_ms / samples / 1000, 3) if samples else 0.0,
+                'p50': round(histogram_percentile(buckets, 50) / 1000, 3),
+                'p95': round(histogram_percentile(buckets, 95) / 1000, 3),
+                'p99': round(histogram_percentile(buckets, 99) / 1000, 3),
+            }
+
+        outcomes = {}
+        last_minute = 0
+        for minute in minutes:
+            counts = {_decode(k): int(v) for k, v in next(responses).items()}
+            for outcome, count in counts.items():
+                outcomes[outcome] = outcomes.get(outcome, 0) + count
+            if minute == now_minute:
+                last_minute = sum(counts.values())
+
+        series_stats['throughput'] = {
+            'per_minute': round(sum(outcomes.values()) / window_minutes, 2),
+            'last_minute': last_minute,
+            'outcomes': outcomes
+        }
+        stats[name] = series_stats
+
+    return stats
+
+
+def get_queue_stats(connection, window_minutes: int = METRICS_WINDOW_MINUTES) -> Dict[str, Any]:
+    """
+    Queue depth, workers and wait/run percentiles for /queue_stats
+
+    Args:
+        connection: Redis connection
+        window_minutes: Minutes of history to merge
+
+    Returns:
+        Dict with per-queue and per-work-class stats (durations in seconds)
+    """
+    from rq import Queue, Worker
+    from rq_config import QUEUE_PRIORITY
+    from rq_scheduler import WORK_CLASSES, PENDING_KEY, SESSIONS_KEY
+
+    queues = [Queue(name, connection=connection) for name in QUEUE_PRIORITY]
+
+    with connection.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.llen(queue.key)
+            pipe.zcard(queue.started_job_registry.key)
+            pipe.zcard(queue.scheduled_job_registry.key)
+            pipe.zcard(queue.failed_job_registry.key)
+        depths = iter(pipe.execute())
+
+    series = get_series_stats(
+        connection,
+        [f"queue:{q.name}" for q in queues] + [f"class:{c}" for c in WORK_CLASSES],
+        window_minutes
+    )
+
+    queue_stats = {}
+    for queue in queues:
+        queue_stats[queue.name] = {
+            'queued': next(depths),
+            'running': next(depths),
+            'scheduled': next(depths),
+            'failed': next(depths),
+            **series[f"queue:{queue.name}"]
+        }
+
+    sessions = [_decode(s) for s in connection.lrange(SESSIONS_KEY, 0, -1)]
+    pending_bulk = sum(connection.llen(PENDING_KEY.format(s)) for s in sessions)
+
+    workers = Worker.all(connection=connection)
+    busy = sum(1 for worker in workers if worker.get_state() == 'busy')
+
+    return {
+        'available': True,
+        'window_minutes': window_minutes,
+        'workers': len(workers),
+        'busy_workers': busy,
+        'active_tasks': sum(q['running'] for q in queue_stats.values()),
+        'scheduled_tasks': sum(q['scheduled'] for q in queue_stats.values()),
+        'queued_tasks': sum(q['queued'] for q in queue_stats.values()) + pending_bulk,
+        'pending_fair_share': pending_bulk,
+        'queues': queue_stats,
+        'work_classes': {c: series[f"class:{c}"] for c in WORK_CLASSES}
+    }
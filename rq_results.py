@@ -0,0 +1,217 @@
+"""
+Result Storage Limits for AI-Prism RQ Jobs (TTL, compression, spill)
+
+Analysis and chat results were kept in Redis as full pickled dicts for
+RQ's default TTL, next to the session blobs. Large feedback payloads
+under sustained load grew Redis memory without bound.
+
+How:
+- Per-queue result TTLs (RESULT_TTLS) sized to how long the client polls
+  for that kind of job; analysis feedback also lands in the session
+  (rq_session_store), so the RQ result is only needed until the next poll.
+  Failed jobs keep FAILURE_TTL (long enough to replay from rq_dlq)
+- Tasks return pack_result(result): results under COMPRESS_THRESHOLD are
+  stored as-is, larger ones as a zlib-compressed JSON envelope
+- Envelopes still over MAX_INLINE_BYTES are spilled to local disk
+  (RESULT_SPILL_DIR) or S3 (RQ_RESULT_SPILL=s3) and only a reference is
+  kept in Redis; spilled files are purged once every job that could
+  reference them has expired
+- Readers call unpack_result() (build_task_status, scheduler callbacks);
+  plain results pass through untouched
+
+Usage:
+    from rq_results import pack_result, unpack_result, get_result_ttl
+
+    queue.enqueue(task, args=(...), result_ttl=get_result_ttl('analysis'))
+    return pack_result(result)               # inside the task
+    result = unpack_result(job.return_value())
+"""
+
+import json
+import os
+import time
+import uuid
+import zlib
+from typing import Any, Optional
+
+# Seconds a finished job's result stays in Redis, per queue
+# (the UI polls analysis/chat for up to 2 minutes; bulk runs are checked on later)
+RESULT_TTLS = {
+    'chat': int(os.environ.get('RQ_RESULT_TTL_CHAT', '300')),
+    'analysis': int(os.environ.get('RQ_RESULT_TTL_ANALYSIS', '900')),
+    'bulk': int(os.environ.get('RQ_RESULT_TTL_BULK', '1800')),
+    'monitoring': int(os.environ.get('RQ_RESULT_TTL_MONITORING', '120')),
+    'default': int(os.environ.get('RQ_RESULT_TTL_DEFAULT', '500')),
+}
+
+# Seconds a failed job stays in Redis (RQ's default is one year)
+FAILURE_TTL = int(os.environ.get('RQ_FAILURE_TTL', str(7 * 86400)))
+
+# Results larger than this (JSON bytes) are compressed
+COMPRESS_THRESHOLD = int(os.environ.get('RQ_RESULT_COMPRESS_BYTES', '8192'))
+
+# Compressed results larger than this are spilled out of Redis
+MAX_INLINE_BYTES = int(os.environ.get('RQ_RESULT_MAX_BYTES', '262144'))
+
+# Spill storage: 'local' (shared disk) or 's3'
+RESULT_SPILL = os.environ.get('RQ_RESULT_SPILL', 'local').lower()
+RESULT_SPILL_DIR = os.environ.get(
+    'RQ_RESULT_SPILL_DIR',
+    '/tmp/data/rq_results' if os.environ.get('FLASK_ENV') == 'production'  # App Runner: read-only filesystem
+    else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'rq_results')
+)
+S3_SPILL_PREFIX = os.environ.get('S3_BASE_PATH', 'tara/') + 'rq-results/'
+
+# Spilled results older than this are no longer referenced by any job
+SPILL_MAX_AGE = max(RESULT_TTLS.values()) + 3600
+
+# Seconds between opportunistic purges of old spilled results (per process)
+PURGE_INTERVAL = 600
+
+# Marks a packed result
+PACKED_KEY = '__rq_packed__'
+
+_last_purge = 0.0
+_s3 = None
+
+
+def get_result_ttl(queue_name: str) -> int:
+    """Result TTL for jobs of a queue"""
+    return RESULT_TTLS.get(queue_name, RESULT_TTLS['default'])
+
+
+def is_packed(value: Any) -> bool:
+    """Check whether a job return value is a packed result"""
+    return isinstance(value, dict) and PACKED_KEY in value
+
+
+def pack_result(result: Any, job_id: Optional[str] = None) -> Any:
+    """
+    Shrink a task result before RQ stores it in Redis
+
+    Args:
+        result: JSON-serializable task result
+        job_id: Names the spilled object (default: a random id)
+
+    Returns:
+        The result itself if small, otherwise a packed envelope
+    """
+    raw = json.dumps(result, separators=(',', ':')).encode('utf-8')
+    if len(raw) < COMPRESS_THRESHOLD:
+        return result
+
+    data = zlib.compress(raw, 6)
+    if len(data) <= MAX_INLINE_BYTES:
+        return {PACKED_KEY: 'zlib', 'size': len(raw), 'data': data}
+
+    ref = _spill_write(job_id or uuid.uuid4().hex, data)
+    print(f"📦 [RQ] Result of {len(raw)} bytes ({len(data)} compressed) spilled to {ref}")
+    return {PACKED_KEY: 'ref', 'size': len(raw), 'ref': ref}
+
+
+def unpack_result(value: Any) -> Any:
+    """
+    Restore a task result stored by pack_result
+
+    Args:
+        value: Job return value (packed or not)
+
+    Returns:
+        The original result. A spilled result that can no longer be read
+        comes back as a failed result with an error message.
+    """
+    if not is_packed(value):
+        return value
+
+    try:
+        data = value['data'] if value[PACKED_KEY] == 'zlib' else _spill_read(value['ref'])
+        return json.loads(zlib.decompress(data))
+    except Exception as e:
+        print(f"⚠️ [RQ] Could not unpack result ({value.get('ref', 'inline')}): {e}")
+        return {'success': False, 'error': 'Result is no longer available - please run the analysis again'}
+
+
+# ============================================================================
+# SPILL STORAGE
+# ============================================================================
+
+def _spill_write(name: str, data: bytes) -> str:
+    _maybe_purge()
+
+    if RESULT_SPILL == 's3':
+        bucket = os.environ.get('S3_BUCKET_NAME', 'felix-s3-bucket')
+        key = f"{S3_SPILL_PREFIX}{name}.json.z"
+        _s3_client().put_object(Bucket=bucket, Key=key, Body=data)
+        return f"s3://{bucket}/{key}"
+
+    os.makedirs(RESULT_SPILL_DIR, exist_ok=True)
+    path = os.path.join(RESULT_SPILL_DIR, f"{name}.json.z")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return f"file://{path}"
+
+
+def _spill_read(ref: str) -> bytes:
+    if ref.startswith('s3://'):
+        bucket, key = ref[len('s3://'):].split('/', 1)
+        return _s3_client().get_object(Bucket=bucket, Key=key)['Body'].read()
+
+    with open(ref[len('file://'):], 'rb') as f:
+        return f.read()
+
+
+def _s3_client():
+    global _s3
+    if _s3 is None:
+        import boto3
+        _s3 = boto3.client('s3', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+    return _s3
+
+
+def _maybe_purge():
+    global _last_purge
+    if time.time() - _last_purge >= PURGE_INTERVAL:
+        _last_purge = time.time()
+        try:
+            purge_spilled_results()
+        except Exception as e:
+            print(f"⚠️ [RQ] Could not purge spilled results: {e}")
+
+
+def purge_spilled_results(max_age: int = SPILL_MAX_AGE) -> int:
+    """
+    Delete spilled results no job can reference any more
+
+    Args:
+        max_age: Seconds after which a spilled result is deleted
+
+    Returns:
+        Number of objects deleted
+    """
+    cutoff = time.time() - max_age
+    deleted = 0
+
+    if RESULT_SPILL == 's3':
+        bucket = os.environ.get('S3_BUCKET_NAME', 'felix-s3-bucket')
+        paginator = _s3_client().get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=S3_SPILL_PREFIX):
+            old = [{'Key': obj['Key']} for obj in page.get('Contents', [])
+                   if obj['LastModified'].timestamp() < cutoff]
+            if old:
+                _s3_client().delete_objects(Bucket=bucket, Delete={'Objects': old, 'Quiet': True})
+                deleted += len(old)
+        return deleted
+
+    if not os.path.isdir(RESULT_SPILL_DIR):
+        return 0
+    for entry in os.scandir(RESULT_SPILL_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                deleted += 1
+        except OSError:
+            continue
+    return deleted
+
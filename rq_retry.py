@@ -0,0 +1,128 @@
+"""
+Retry Policies & Failure Classification for AI-Prism RQ Jobs
+
+Tasks used to swallow every error and return {'success': False}, which RQ
+records as a successful job: nothing was retried and failures were invisible.
+
+How:
+- Tasks now raise; RQ retries them according to RETRY_POLICIES (per task
+  type, with backoff intervals sized for Bedrock throttling/outages - the
+  in-process retries in rq_tasks.invoke_bedrock_model cover short blips)
+- classify_failure() sorts an exception into:
+    transient  - throttling, 5xx, connection errors, timeouts (retried)
+    permanent  - bad input, unparseable model output, access denied
+                 (not retried, dead-lettered immediately)
+    cancelled  - JobCancelled (never retried, never dead-lettered)
+    drained    - JobDrained, worker shutting down (requeued as-is by the
+                 worker, no retry used - see rq_checkpoint)
+- Jobs that fail permanently or run out of retries go to the dead-letter
+  queue (see rq_dlq)
+
+Interval retries are scheduled, so workers run with the RQ scheduler
+enabled (rq_worker.PrewarmedWorker).
+
+Usage:
+    from rq_retry import get_retry_policy, classify_failure
+
+    queue.enqueue(analyze_section_task, args=(...), retry=get_retry_policy(analyze_section_task))
+"""
+
+from typing import Callable, Optional, Union
+
+from rq import Retry
+
+from rq_cancellation import JobCancelled
+from rq_checkpoint import JobDrained
+
+# Failure categories
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+CANCELLED = 'cancelled'
+DRAINED = 'drained'
+
+# Bedrock error codes worth retrying
+RETRYABLE_ERROR_CODES = (
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'InternalServerException'
+)
+
+# Task name -> (max retries, backoff intervals in seconds)
+RETRY_POLICIES = {
+    'analyze_section_task': (3, [15, 60, 180]),
+    'analyze_sections_batch_task': (3, [30, 90, 240]),
+    'process_chat_task': (1, [5]),      # The user is waiting in the chat window
+    'monitor_health': (0, []),
+}
+
+
+class TransientTaskError(Exception):
+    """Raised by tasks for failures that are worth retrying later (e.g. Bedrock still throttling)"""
+
+
+def _task_name(func_or_name: Union[Callable, str]) -> str:
+    name = func_or_name if isinstance(func_or_name, str) else getattr(func_or_name, '__name__', '')
+    return name.rsplit('.', 1)[-1]
+
+
+def get_retry_policy(func_or_name: Union[Callable, str]) -> Optional[Retry]:
+    """
+    RQ Retry policy for a task
+
+    Args:
+        func_or_name: Task function or its (dotted) name
+
+    Returns:
+        rq.Retry, or None if the task is not retried
+    """
+    max_retries, intervals = RETRY_POLICIES.get(_task_name(func_or_name), (0, []))
+    if max_retries <= 0:
+        return None
+    return Retry(max=max_retries, interval=intervals)
+
+
+def get_max_retries(func_or_name: Union[Callable, str]) -> int:
+    """Number of retries a task gets (0 if not retried)"""
+    return RETRY_POLICIES.get(_task_name(func_or_name), (0, []))[0]
+
+
+def classify_failure(exc_type, exc_value) -> str:
+    """
+    Classify a job failure
+
+    Args:
+        exc_type: Exception class raised by the job
+        exc_value: Exception instance
+
+    Returns:
+        TRANSIENT, PERMANENT, CANCELLED or DRAINED
+    """
+    if exc_type is None:
+        return PERMANENT
+
+    if issubclass(exc_type, JobCancelled):
+        return CANCELLED
+
+    if issubclass(exc_type, JobDrained):
+        return DRAINED
+
+    from rq.timeouts import JobTimeoutException
+    if issubclass(exc_type, (TransientTaskError, JobTimeoutException, ConnectionError, TimeoutError)):
+        return TRANSIENT
+
+    try:
+        from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
+    except ImportError:
+        return PERMANENT
+
+    if issubclass(exc_type, (BotoConnectionError, ReadTimeoutError)):
+        return TRANSIENT
+
+    if isinstance(exc_value, ClientError):
+        error_code = exc_value.response.get('Error', {}).get('Code', '')
+        if error_code in RETRYABLE_ERROR_CODES:
+            return TRANSIENT
+
+    return PERMANENT
@@ -0,0 +1,456 @@
+"""
+Priority & Fair-Share Scheduling for AI-Prism RQ Queues
+
+The RQ queues are plain FIFOs: one reviewer who kicks off analysis of 30
+sections used to delay everyone else's chat and single-section requests.
+
+Work classes (highest priority first):
+- chat:        Chat messages                      -> 'chat' queue (direct)
+- interactive: The section currently on screen    -> 'analysis' queue (direct)
+- bulk:        Analyze-all / batch analysis       -> 'bulk' queue (fair-share)
+
+Priority comes from queue order: workers listen on QUEUE_PRIORITY from
+rq_config, so a worker always drains chat/analysis before bulk.
+
+Fair share: bulk jobs are held in per-session pending lists and released
+into the 'bulk' queue by a Deficit Round Robin dispatcher weighted by
+estimated token cost. Only BULK_DISPATCH_WINDOW bulk jobs sit in RQ at a
+time, so a session with 30 sections cannot starve a session with 2.
+
+Retries of bulk jobs go back through the dispatcher too: instead of RQ's
+Retry (which re-enqueues straight onto the 'bulk' queue), the failure
+callback marks the job and the worker schedules release_bulk_retry, which
+parks it in its session's pending list once the backoff has passed.
+
+Queue-wait (submit -> worker start) is recorded per work class by
+rq_metrics and exposed as p50/p95/p99 through get_wait_percentiles() and
+/queue_stats.
+
+Usage:
+    from rq_scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+    lane = scheduler.lane('bulk', session_id=session_id, cost=estimated_tokens)
+    job = lane.enqueue(analyze_sections_batch_task, args=(...), job_timeout=300)
+"""
+
+import os
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import WatchError
+from rq import Callback
+from rq_config import get_queue, get_redis_conn
+from rq_events import publish_job_event
+from rq_session_store import store_result_for_sessions
+from rq_retry import get_retry_policy
+from rq_dlq import handle_failed_job
+from rq_checkpoint import clear_checkpoint
+from rq_metrics import get_series_stats, record_job_timing, record_job_outcome
+from rq_results import FAILURE_TTL, get_result_ttl, unpack_result
+
+
+# Work class -> target queue and whether it goes through the fair-share dispatcher
+WORK_CLASSES = {
+    'chat': {'queue': 'chat', 'fair_share': False},
+    'interactive': {'queue': 'analysis', 'fair_share': False},
+    'bulk': {'queue': 'bulk', 'fair_share': True},
+}
+
+# Deficit Round Robin quantum (estimated tokens granted per session per round)
+DRR_QUANTUM = int(os.environ.get('SCHED_DRR_QUANTUM', '4000'))
+
+# Max bulk jobs released into RQ at once (the rest wait in per-session lists)
+BULK_DISPATCH_WINDOW = int(os.environ.get('SCHED_BULK_WINDOW', '4'))
+
+# Redis keys
+SESSIONS_KEY = 'sched:sessions'          # Active session ring (list)
+DEFICIT_KEY = 'sched:deficit'            # session -> deficit counter (hash)
+TURN_KEY = 'sched:turn'                  # session -> quantum granted this turn (hash)
+LOCK_KEY = 'sched:lock'                  # Dispatcher lock (holder's token)
+PUMP_REQUESTED_KEY = 'sched:pump'        # Set by every pump() call; the lock holder re-checks it
+PENDING_KEY = 'sched:pending:{}'         # Per-session pending job ids (list)
+
+# Dispatcher lock lifetime (milliseconds) - only reached if a dispatcher dies mid-pass
+LOCK_TTL_MS = 5000
+
+# Queue for the (millisecond) control job that re-parks a bulk retry after its backoff
+RETRY_RELEASE_QUEUE = 'chat'
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class SchedulerLane:
+    """
+    Queue-like submission handle for one work class (and session)
+
+    Exposes enqueue() with the same calling convention as rq.Queue.enqueue,
+    so it can be passed anywhere a queue is expected (e.g. RequestCoalescer).
+    """
+
+    def __init__(self, scheduler: 'FairScheduler', work_class: str, session_id: Optional[str], cost: int):
+        self.scheduler = scheduler
+        self.work_class = work_class
+        self.session_id = session_id or 'anonymous'
+        self.cost = max(1, int(cost))
+
+    def enqueue(self, func: Callable, args: Tuple = (), job_timeout: Optional[int] = None,
+                job_id: Optional[str] = None, **kwargs):
+        return self.scheduler.submit(
+            self.work_class, func, args=args, session_id=self.session_id, cost=self.cost,
+            job_timeout=job_timeout, job_id=job_id, **kwargs
+        )
+
+
+class FairScheduler:
+    """
+    Priority + per-session fair-share scheduler on top of RQ
+
+    Args:
+        connection: Redis connection (defaults to rq_config connection)
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection or get_redis_conn()
+
+    def lane(self, work_class: str, session_id: Optional[str] = None, cost: int = 1) -> SchedulerLane:
+        """Get a submission handle for a work class"""
+        if work_class not in WORK_CLASSES:
+            raise ValueError(f"Unknown work class: {work_class}")
+        return SchedulerLane(self, work_class, session_id, cost)
+
+    def submit(self, work_class: str, func: Callable, args: Tuple = (), session_id: str = 'anonymous',
+               cost: int = 1, job_timeout: Optional[int] = None, job_id: Optional[str] = None, **kwargs):
+        """
+        Submit a job under a work class
+
+        Args:
+            work_class: 'chat', 'interactive' or 'bulk'
+            func: Task function
+            args: Task arguments
+            session_id: Owning session (fair-share unit)
+            cost: Estimated token cost (DRR weight)
+            job_timeout: Job timeout in seconds
+            job_id: Optional pre-generated job id
+            **kwargs: Extra job options (meta, result_ttl, retry, ...)
+
+        Returns:
+            rq.job.Job
+        """
+        class_config = WORK_CLASSES[work_class]
+        queue = get_queue(class_config['queue'])
+
+        meta = dict(kwargs.pop('meta', None) or {})
+        meta.update({
+            'work_class': work_class,
+            'session_id': session_id,
+            'cost': cost,
+            'submitted_at': time.time()
+        })
+
+        job_options = dict(
+            args=args,
+            timeout=job_timeout,
+            job_id=job_id or str(uuid.uuid4()),
+            meta=meta,
+            on_success=Callback(on_scheduled_job_success),
+            on_failure=Callback(on_scheduled_job_failure),
+            retry=get_retry_policy(func),
+            result_ttl=get_result_ttl(queue.name),
+            failure_ttl=FAILURE_TTL,
+        )
+        job_options.update(kwargs)
+
+        if not class_config['fair_share']:
+            return queue.enqueue_call(func, **job_options)
+
+        # Bulk: persist the job, park its id in the session's pending list, then dispatch
+        job = queue.create_job(func, **job_options)
+        job.origin = queue.name
+        job.save()
+
+        self._park(job, session_id)
+        return job
+
+    def requeue(self, job, at_front: bool = False):
+        """
+        Put an existing job back in line under its work class
+
+        Used for replayed dead letters and for jobs drained by a stopping worker.
+
+        Args:
+            job: rq.job.Job (keeps its id, meta and callbacks)
+            at_front: Put it ahead of its work class's waiting jobs
+
+        Returns:
+            rq.job.Job
+        """
+        class_config = WORK_CLASSES.get(job.meta.get('work_class'))
+        if class_config is None or not class_config['fair_share']:
+            queue = get_queue(class_config['queue']) if class_config else get_queue(job.origin)
+            return queue.enqueue_job(job, at_front=at_front)
+
+        job.set_status('queued')
+        job.save()
+        self._park(job, job.meta.get('session_id') or 'anonymous', at_front=at_front)
+        return job
+
+    def schedule_retry(self, job, delay: int):
+        """
+        Put a failed bulk job back in line after delay seconds (instead of RQ's Retry)
+
+        The job shows as 'scheduled' meanwhile; release_bulk_retry parks it.
+
+        Args:
+            job: rq.job.Job (retries_left already decremented)
+            delay: Backoff in seconds
+        """
+        job.set_status('scheduled')
+        job.save()
+        get_queue(RETRY_RELEASE_QUEUE).enqueue_in(
+            timedelta(seconds=delay), release_bulk_retry, job.id, result_ttl=0, failure_ttl=FAILURE_TTL
+        )
+
+    def _park(self, job, session_id: str, at_front: bool = False):
+        """Hold a bulk job in its session's pending list and run the dispatcher"""
+        pending_key = PENDING_KEY.format(session_id)
+        with self.connection.pipeline() as pipe:
+            if at_front:
+                pipe.lpush(pending_key, job.id)
+            else:
+                pipe.rpush(pending_key, job.id)
+            pipe.execute()
+
+        self._register_session(session_id)
+        self.pump()
+
+    def _register_session(self, session_id: str):
+        """Add a session to the ring unless it is already in it (WATCH/MULTI, never twice)"""
+        with self.connection.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(SESSIONS_KEY)
+                    if pipe.lpos(SESSIONS_KEY, session_id) is not None:
+                        pipe.unwatch()
+                        return
+                    pipe.multi()
+                    pipe.rpush(SESSIONS_KEY, session_id)
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue  # The dispatcher rotated the ring meanwhile - check again
+
+    def _retire_session(self, session_id: str) -> bool:
+        """
+        Take a drained session (head of the ring) out of the ring
+
+        Returns False if a job was parked for it meanwhile (it stays in the ring).
+        """
+        pending_key = PENDING_KEY.format(session_id)
+        with self.connection.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(pending_key)
+                    if pipe.llen(pending_key):
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.lpop(SESSIONS_KEY)
+                    pipe.hdel(DEFICIT_KEY, session_id)
+                    pipe.hdel(TURN_KEY, session_id)
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    def _release_lock(self, token: str):
+        """Delete the dispatcher lock only if this dispatcher still holds it"""
+        with self.connection.pipeline() as pipe:
+            try:
+                pipe.watch(LOCK_KEY)
+                if _decode(pipe.get(LOCK_KEY)) != token:
+                    pipe.unwatch()
+                    return
+                pipe.multi()
+                pipe.delete(LOCK_KEY)
+                pipe.execute()
+            except WatchError:
+                pass  # Expired and taken by another dispatcher - leave it
+
+    def _bulk_depth(self) -> int:
+        return get_queue(WORK_CLASSES['bulk']['queue']).count
+
+    def pump(self) -> int:
+        """
+        Release pending bulk jobs into RQ using Deficit Round Robin
+
+        Safe to call from anywhere (web requests, job callbacks); a Redis lock
+        ensures only one dispatcher runs at a time. A call that finds the lock
+        taken leaves a request flag instead, and the holder runs another pass
+        for it before returning, so no call is ever dropped.
+
+        Returns:
+            Number of jobs dispatched
+        """
+        self.connection.set(PUMP_REQUESTED_KEY, 1, px=LOCK_TTL_MS * 12)
+
+        dispatched = 0
+        while self.connection.exists(PUMP_REQUESTED_KEY):
+            token = str(uuid.uuid4())
+            if not self.connection.set(LOCK_KEY, token, nx=True, px=LOCK_TTL_MS):
+                break  # The holder sees the flag after its pass
+
+            try:
+                self.connection.delete(PUMP_REQUESTED_KEY)
+                dispatched += self._dispatch()
+            finally:
+                self._release_lock(token)
+
+        if dispatched:
+            print(f"⚖️  [Scheduler] Dispatched {dispatched} bulk job(s) (DRR)")
+        return dispatched
+
+    def _dispatch(self) -> int:
+        """One Deficit Round Robin pass (caller holds the dispatcher lock)"""
+        from rq.job import Job
+        from rq.exceptions import NoSuchJobError
+
+        dispatched = 0
+        bulk_queue = get_queue(WORK_CLASSES['bulk']['queue'])
+
+        while self._bulk_depth() < BULK_DISPATCH_WINDOW:
+            session_id = _decode(self.connection.lindex(SESSIONS_KEY, 0))
+            if session_id is None:
+                break
+
+            pending_key = PENDING_KEY.format(session_id)
+            head_id = _decode(self.connection.lindex(pending_key, 0))
+
+            if head_id is None:
+                # Session drained - leave the ring and forfeit its deficit (unless a job just arrived)
+                self._retire_session(session_id)
+                continue
+
+            try:
+                job = Job.fetch(head_id, connection=self.connection)
+            except NoSuchJobError:
+                self.connection.lpop(pending_key)
+                continue
+
+            if job.get_status(refresh=False) != 'queued':
+                # Cancelled (or otherwise handled) while waiting - drop it
+                self.connection.lpop(pending_key)
+                continue
+
+            # New turn for this session: grant one quantum
+            if not self.connection.hget(TURN_KEY, session_id):
+                self.connection.hincrbyfloat(DEFICIT_KEY, session_id, DRR_QUANTUM)
+                self.connection.hset(TURN_KEY, session_id, 1)
+
+            deficit = float(self.connection.hget(DEFICIT_KEY, session_id) or 0)
+            cost = float(job.meta.get('cost', 1))
+
+            if cost <= deficit:
+                self.connection.lpop(pending_key)
+                self.connection.hincrbyfloat(DEFICIT_KEY, session_id, -cost)
+                bulk_queue.enqueue_job(job)
+                dispatched += 1
+            else:
+                # Turn over - rotate the session to the back of the ring (deficit carries over)
+                with self.connection.pipeline() as pipe:
+                    pipe.lpop(SESSIONS_KEY)
+                    pipe.rpush(SESSIONS_KEY, session_id)
+                    pipe.hdel(TURN_KEY, session_id)
+                    pipe.execute()
+
+        return dispatched
+
+    def get_wait_percentiles(self) -> Dict[str, Dict[str, float]]:
+        """Queue-wait p50/p95/p99 (seconds) per work class (see rq_metrics)"""
+        series = get_series_stats(self.connection, [f"class:{work_class}" for work_class in WORK_CLASSES])
+        return {work_class: series[f"class:{work_class}"]['wait'] for work_class in WORK_CLASSES}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler state for /queue_stats"""
+        sessions = [_decode(s) for s in self.connection.lrange(SESSIONS_KEY, 0, -1)]
+        return {
+            'bulk_window': BULK_DISPATCH_WINDOW,
+            'drr_quantum': DRR_QUANTUM,
+            'active_sessions': len(sessions),
+            'pending_per_session': {
+                session_id: self.connection.llen(PENDING_KEY.format(session_id))
+                for session_id in sessions
+            },
+            'queue_wait': self.get_wait_percentiles()
+        }
+
+
+# ============================================================================
+# RQ CALLBACKS (run inside the worker after each scheduled job)
+# ============================================================================
+
+def on_scheduled_job_success(job, connection, result, *args, **kwargs):
+    """Record timings, store feedback in waiting sessions, notify them and release the next bulk job"""
+    scheduler = FairScheduler(connection)
+    record_job_timing(job, connection)
+    record_job_outcome(job, connection, 'finished')
+    applied = store_result_for_sessions(job, connection, unpack_result(result))
+    clear_checkpoint(connection, job.id)
+    publish_job_event(job, connection, 'SUCCESS', progress=100, session_applied=applied)
+    scheduler.pump()
+
+
+def on_scheduled_job_failure(job, connection, exc_type, exc_value, traceback):
+    """Record timings, retry or dead-letter the job, notify waiting sessions and release the next bulk job"""
+    scheduler = FairScheduler(connection)
+    record_job_timing(job, connection)
+
+    outcome = handle_failed_job(job, connection, exc_type, exc_value)
+    if outcome == 'retrying' and WORK_CLASSES.get(job.meta.get('work_class'), {}).get('fair_share'):
+        # Retried through the dispatcher (rq_worker.PrewarmedWorker calls schedule_retry), not RQ's Retry
+        job.meta['retry_in'] = job.get_retry_interval()
+        job.save_meta()
+    if outcome in ('dead', 'cancelled'):
+        record_job_outcome(job, connection, 'failed' if outcome == 'dead' else 'cancelled')
+    if outcome == 'retrying':
+        publish_job_event(job, connection, 'PROGRESS', progress=0, status='Retrying after a temporary error')
+    elif outcome == 'drained':
+        publish_job_event(job, connection, 'PROGRESS', progress=0, status='Worker restarting - analysis will resume')
+    else:
+        publish_job_event(job, connection, 'REVOKED' if outcome == 'cancelled' else 'FAILURE')
+    scheduler.pump()
+
+
+def release_bulk_retry(job_id: str):
+    """Control job: park a bulk job whose retry backoff has passed (unless it was cancelled meanwhile)"""
+    from rq.job import Job
+    from rq.exceptions import NoSuchJobError
+
+    connection = get_redis_conn()
+    try:
+        job = Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        return
+
+    if job.get_status(refresh=False) != 'scheduled':
+        return
+
+    FairScheduler(connection).requeue(job)
+
+
+# Global instance
+_scheduler = None
+
+
+def get_scheduler() -> FairScheduler:
+    """Get or create the global scheduler instance"""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = FairScheduler()
+
+    return _scheduler
@@ -0,0 +1,170 @@
+"""
+Worker-Side Result Application for AI-Prism Sessions
+
+Analysis feedback used to reach the session only when the browser polled
+/task_status and that request copied the result into the pickled
+ReviewSession. The payload travelled through the RQ result, the HTTP
+response and the session pickle, and was lost if the tab closed mid-analysis.
+
+How:
+- When an analysis job succeeds, the worker's on-success hook writes each
+  section's feedback into the Redis hash session_feedback:<session_id>
+  (one HSET per job, so a section update is atomic)
+- The hash is the source of truth for analysis feedback: get_session()
+  merges it into review_session.feedback_data on every load and never
+  deletes it, so a request that saves an older copy of the session cannot
+  lose feedback. Loading stays read-only
+- Feedback produced in the web process (sync fallback, /task_status) is
+  written to the same hash
+- The hash is dropped with the session (delete_session / delete_document)
+- The job records which sessions it was stored in (meta['session_applied'])
+  and the SUCCESS event tells those sessions, letting /task_status skip its
+  own session load/save. A session that attached to the job after the
+  result was stored is not in the list and is applied by /task_status
+
+Usage:
+    from rq_session_store import store_result_for_sessions, is_session_applied, parse_session_feedback
+
+    feedback = parse_session_feedback(redis_conn.hgetall(SESSION_FEEDBACK_KEY.format(session_id)))
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Per-session pending feedback (hash: section name -> JSON feedback items)
+SESSION_FEEDBACK_KEY = 'session_feedback:{}'
+
+# Same lifetime as the Redis session itself
+SESSION_FEEDBACK_TTL = 86400
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def extract_section_feedback(result: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Per-section feedback carried by an analysis task result
+
+    Args:
+        result: Return value of analyze_section_task / analyze_sections_batch_task
+
+    Returns:
+        Dict of section name -> feedback items (empty for other/failed results)
+    """
+    if not isinstance(result, dict) or not result.get('success'):
+        return {}
+
+    if result.get('batch') and isinstance(result.get('results'), dict):
+        return {
+            section_name: section_result.get('feedback_items', [])
+            for section_name, section_result in result['results'].items()
+        }
+
+    if 'feedback_items' in result and 'section' in result:
+        return {result['section']: result.get('feedback_items', [])}
+
+    return {}
+
+
+def store_result_for_sessions(job, connection, result: Any) -> Set[str]:
+    """
+    Write a finished analysis result into every waiting session's storage
+
+    Runs in the worker (job on-success hook). Never raises - if this fails
+    the result is still applied by /task_status as before.
+
+    Args:
+        job: RQ job that produced the result
+        connection: Redis connection
+        result: Job return value
+
+    Returns:
+        Session ids updated (empty if none)
+    """
+    from rq_events import get_job_sessions
+
+    try:
+        feedback = extract_section_feedback(result)
+        if not feedback:
+            return set()
+
+        sessions = get_job_sessions(job, connection)
+        if not sessions:
+            return set()
+
+        store_session_feedback(connection, sessions, feedback)
+
+        job.meta['session_applied'] = sorted(sessions)
+        job.save_meta()
+
+        print(f"💾 [RQ] Stored feedback for {len(feedback)} section(s) in {len(sessions)} session(s)")
+        return sessions
+
+    except Exception as e:
+        print(f"⚠️ Could not store result of job {job.id} in session: {e}")
+        return set()
+
+
+def is_session_applied(job, session_id: Optional[str]) -> bool:
+    """
+    Whether the worker already stored a job's result in this session
+
+    Args:
+        job: Finished RQ job
+        session_id: Session asking (None = any session)
+
+    Returns:
+        True if /task_status can skip applying the result itself
+    """
+    applied = job.meta.get('session_applied')
+    if isinstance(applied, list):
+        return bool(applied) and (session_id is None or session_id in applied)
+    return bool(applied)
+
+
+def store_session_feedback(connection, session_ids: Iterable[str], feedback: Dict[str, List[Dict[str, Any]]]):
+    """
+    Write per-section feedback into sessions' feedback hashes
+
+    Args:
+        connection: Redis connection
+        session_ids: Sessions to update
+        feedback: Dict of section name -> feedback items (replaces those sections)
+    """
+    if not feedback:
+        return
+
+    mapping = {section_name: json.dumps(items) for section_name, items in feedback.items()}
+
+    with connection.pipeline() as pipe:
+        for session_id in session_ids:
+            key = SESSION_FEEDBACK_KEY.format(session_id)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, SESSION_FEEDBACK_TTL)
+        pipe.execute()
+
+
+def parse_session_feedback(raw: Dict[Any, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Decode a session feedback hash (HGETALL result)
+
+    Args:
+        raw: Section name -> JSON feedback items, as returned by Redis
+
+    Returns:
+        Dict of section name -> feedback items
+    """
+    feedback = {}
+    for section_name, items in (raw or {}).items():
+        try:
+            feedback[_decode(section_name)] = json.loads(_decode(items))
+        except (TypeError, ValueError):
+            continue
+    return feedback
+
+
+def clear_session_feedback(connection, session_id: Optional[str]):
+    """Drop a session's feedback hash (session reset / document deleted)"""
+    if connection is not None and session_id:
+        connection.delete(SESSION_FEEDBACK_KEY.format(session_id))
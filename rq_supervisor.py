@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Queue-Depth Autoscaling Supervisor for AI-Prism RQ Workers
+
+Worker counts were fixed (RQ_WORKERS, Procfile, start scripts): idle
+processes at night, a backlog at peak.
+
+How:
+- AutoscalingWorkerPool extends rq.worker_pool.WorkerPool (pre-warmed
+  workers from rq_worker) and re-evaluates its size every SCALE_INTERVAL
+- ScalingPolicy (pure, no Redis) turns a metrics snapshot into a worker
+  count:
+    demand   = running jobs + queued jobs (incl. fair-share pending)
+    +1 step  while any queue's recent wait p95 exceeds WAIT_TARGET_SECONDS
+    ceiling  = useful Bedrock concurrency (Little's law: requests/minute
+               limit x observed run p50 / 60) - more workers than that
+               would only queue up behind throttling
+    bounds   = min_workers .. max_workers
+- Hysteresis: scale up as soon as demand is sustained for UP_STABLE_SECONDS,
+  scale down one worker at a time only after DOWN_STABLE_SECONDS of low
+  demand, with COOLDOWN_SECONDS between any two changes
+- Retired workers get SIGINT: they drain (rq_checkpoint) and exit, idle
+  workers first
+
+Usage:
+    python rq_supervisor.py --min 1 --max 8
+    python rq_supervisor.py --demo --min 1 --max 6     # Fake jobs, local Redis
+    python rq_supervisor.py --dry-run                  # Print decisions only
+
+    main.py starts the supervisor in local development.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from rq.worker_pool import WorkerPool
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rq_config import QUEUE_PRIORITY, REDIS_URL, get_redis_conn
+
+# Worker bounds
+MIN_WORKERS = int(os.environ.get('RQ_MIN_WORKERS', '1'))
+MAX_WORKERS = int(os.environ.get('RQ_MAX_WORKERS', os.environ.get('RQ_WORKERS', '4')))
+
+# Seconds between scaling decisions
+SCALE_INTERVAL = 5
+
+# Scale up one step when the recent queue-wait p95 exceeds this (seconds)
+WAIT_TARGET_SECONDS = float(os.environ.get('RQ_WAIT_TARGET', '10'))
+
+# Hysteresis
+UP_STABLE_SECONDS = 10
+DOWN_STABLE_SECONDS = 120
+COOLDOWN_SECONDS = 30
+
+# Minutes of metrics history used for wait/run percentiles
+METRICS_WINDOW = 5
+
+
+@dataclass
+class ScalingSnapshot:
+    """Queue state the scaling decision is based on"""
+    queued: int = 0           # Jobs waiting (RQ queues + fair-share pending)
+    running: int = 0          # Jobs being executed
+    wait_p95: float = 0.0     # Worst recent queue-wait p95 across queues (seconds)
+    run_p50: float = 0.0      # Recent median execution time (seconds, 0 = unknown)
+
+
+class ScalingPolicy:
+    """
+    Decide the worker count from a snapshot, with hysteresis
+
+    Args:
+        min_workers: Lower bound
+        max_workers: Upper bound
+        requests_per_minute: Bedrock request budget
+        fallback_ceiling: Useful concurrency while no run times are known
+    """
+
+    def __init__(self, min_workers: int, max_workers: int, requests_per_minute: int,
+                 fallback_ceiling: int):
+        self.min_workers = max(0, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.requests_per_minute = requests_per_minute
+        self.fallback_ceiling = fallback_ceiling
+
+        self._up_since = None
+        self._down_since = None
+        self._last_change = 0.0
+
+    def bedrock_ceiling(self, snapshot: ScalingSnapshot) -> int:
+        """Workers that can usefully call Bedrock at once (Little's law)"""
+        if snapshot.run_p50 <= 0:
+            return self.fallback_ceiling
+        return max(1, math.ceil(self.requests_per_minute * snapshot.run_p50 / 60.0))
+
+    def target(self, current: int, snapshot: ScalingSnapshot) -> int:
+        """Worker count the snapshot calls for, before hysteresis"""
+        demand = snapshot.running + snapshot.queued
+        if snapshot.wait_p95 > WAIT_TARGET_SECONDS and snapshot.queued > 0:
+            demand = max(demand, current + 1)
+
+        ceiling = min(self.max_workers, self.bedrock_ceiling(snapshot))
+        return max(self.min_workers, min(demand, ceiling))
+
+    def decide(self, current: int, snapshot: ScalingSnapshot, now: Optional[float] = None) -> int:
+        """
+        Worker count to run now
+
+        Args:
+            current: Workers currently running
+            snapshot: Queue state
+            now: Current time (for tests)
+
+        Returns:
+            New worker count (== current when no change is due)
+        """
+        now = time.time() if now is None else now
+        target = self.target(current, snapshot)
+
+        # Bounds changed or violated - fix immediately
+        if current < self.min_workers or current > self.max_workers:
+            self._reset(now)
+            return max(self.min_workers, min(current, self.max_workers))
+
+        in_cooldown = now - self._last_change < COOLDOWN_SECONDS
+
+        if target > current:
+            self._down_since = None
+            self._up_since = self._up_since or now
+            if now - self._up_since >= UP_STABLE_SECONDS and not in_cooldown:
+                self._reset(now)
+                return target
+        elif target < current:
+            self._up_since = None
+            self._down_since = self._down_since or now
+            if now - self._down_since >= DOWN_STABLE_SECONDS and not in_cooldown:
+                self._reset(now)
+                return current - 1
+        else:
+            self._up_since = None
+            self._down_since = None
+
+        return current
+
+    def _reset(self, now: float):
+        self._up_since = None
+        self._down_since = None
+        self._last_change = now
+
+
+def collect_snapshot(connection, queue_names=None) -> ScalingSnapshot:
+    """
+    Build a scaling snapshot from Redis (see rq_metrics)
+
+    Args:
+        connection: Redis connection
+        queue_names: Queues the pool serves
+
+    Returns:
+        ScalingSnapshot
+    """
+    from rq_metrics import get_queue_stats
+
+    queue_names = queue_names or QUEUE_PRIORITY
+    stats = get_queue_stats(connection, window_minutes=METRICS_WINDOW)
+    queues = [stats['queues'][name] for name in queue_names if name in stats['queues']]
+
+    run_samples = sum(q['run']['samples'] for q in queues)
+    run_p50 = (
+        sum(q['run']['p50'] * q['run']['samples'] for q in queues) / run_samples
+        if run_samples else 0.0
+    )
+
+    return ScalingSnapshot(
+        queued=sum(q['queued'] for q in queues) + stats['pending_fair_share'],
+        running=sum(q['running'] for q in queues),
+        wait_p95=max((q['wait']['p95'] for q in queues), default=0.0),
+        run_p50=run_p50
+    )
+
+
+def default_policy(min_workers: int = MIN_WORKERS, max_workers: int = MAX_WORKERS) -> ScalingPolicy:
+    """Scaling policy using the Bedrock limits from core.async_request_manager"""
+    from core.async_request_manager import RateLimitConfig
+
+    requests_per_minute = int(os.environ.get('BEDROCK_MAX_RPM', RateLimitConfig.MAX_REQUESTS_PER_MINUTE))
+    fallback_ceiling = int(os.environ.get('BEDROCK_MAX_CONCURRENCY', RateLimitConfig.MAX_CONCURRENT_REQUESTS))
+    return ScalingPolicy(min_workers, max_workers, requests_per_minute, fallback_ceiling)
+
+
+# ============================================================================
+# AUTOSCALING POOL
+# ============================================================================
+
+class AutoscalingWorkerPool(WorkerPool):
+    """
+    WorkerPool whose size follows a ScalingPolicy
+
+    Args:
+        queues: Queue names (priority order)
+        connection: Redis connection
+        policy: ScalingPolicy
+        **kwargs: Passed to WorkerPool (worker_class, ...)
+    """
+
+    def __init__(self, queues, connection, policy: ScalingPolicy, **kwargs):
+        super().__init__(queues, connection=connection, num_workers=policy.min_workers, **kwargs)
+        self.policy = policy
+        self._retiring = set()
+        self._last_check = 0.0
+
+    def check_workers(self, respawn: bool = True) -> None:
+        self.reap_workers()
+        self._retiring &= set(self.worker_dict)
+
+        if self.status == self.Status.STOPPED:
+            return
+
+        if time.time() - self._last_check >= SCALE_INTERVAL:
+            self._last_check = time.time()
+            self.autoscale()
+
+        # Keep num_workers alive (retiring workers don't count)
+        if respawn:
+            for _ in range(self.num_workers - self.serving_workers):
+                self.start_worker(burst=self._burst, _sleep=self._sleep)
+
+    @property
+    def serving_workers(self) -> int:
+        return len(self.worker_dict) - len(self._retiring)
+
+    def autoscale(self) -> int:
+        """Apply the policy once; returns the new target worker count"""
+        try:
+            snapshot = collect_snapshot(self.connection, self._queue_names)
+        except Exception as e:
+            print(f"⚠️  [Supervisor] Could not read queue metrics: {e}", flush=True)
+            return self.num_workers
+
+        current = self.num_workers
+        desired = self.policy.decide(current, snapshot)
+        if desired != current:
+            print(f"📈 [Supervisor] {current} -> {desired} workers "
+                  f"(queued={snapshot.queued}, running={snapshot.running}, "
+                  f"wait p95={snapshot.wait_p95}s, bedrock ceiling={self.policy.bedrock_ceiling(snapshot)})",
+                  flush=True)
+            self.num_workers = desired
+            if desired < current:
+                self.retire_workers(current - desired)
+        return self.num_workers
+
+    def retire_workers(self, count: int):
+        """Stop workers (idle ones first); they drain and exit"""
+        from rq import Worker
+
+        idle_names = set()
+        try:
+            for worker in Worker.all(connection=self.connection):
+                if worker.get_state() != 'busy':
+                    idle_names.add(worker.name)
+        except Exception:
+            pass
+
+        candidates = [data for name, data in self.worker_dict.items() if name not in self._retiring]
+        candidates.sort(key=lambda data: data.name not in idle_names)
+
+        for data in candidates[:count]:
+            self._retiring.add(data.name)
+            self.stop_worker(data)
+
+
+def run_supervisor(min_workers: int = MIN_WORKERS, max_workers: int = MAX_WORKERS,
+                   queue_names=None, burst: bool = False):
+    """
+    Run the autoscaling pool (blocks until stopped)
+
+    Args:
+        min_workers: Lower bound
+        max_workers: Upper bound
+        queue_names: Queues to serve in priority order (default: QUEUE_PRIORITY)
+        burst: Workers exit once the queues are empty
+    """
+    from rq_worker import PrewarmedWorker
+
+    connection = get_redis_conn()
+    if connection is None:
+        print(f"❌ Redis not available (REDIS_URL={REDIS_URL}) - cannot start workers")
+        return 1
+
+    queue_names = queue_names or QUEUE_PRIORITY
+
+    # Import task modules in the parent so forked workers share the loaded code
+    import rq_tasks  # noqa: F401
+
+    policy = default_policy(min_workers, max_workers)
+    print(f"🔧 Autoscaling {policy.min_workers}-{policy.max_workers} pre-warmed RQ worker(s) on: "
+          f"{', '.join(queue_names)} (Bedrock budget {policy.requests_per_minute} req/min)", flush=True)
+
+    pool = AutoscalingWorkerPool(queue_names, connection, policy, worker_class=PrewarmedWorker)
+    pool.start(burst=burst)
+    return 0
+
+
+# ============================================================================
+# LOCAL DEMO / DRY RUN
+# ============================================================================
+
+def fake_job(seconds: float) -> Dict[str, Any]:
+    """Stand-in for a Bedrock-bound analysis job (sleeps, checking for drain)"""
+    from rq_checkpoint import raise_if_draining
+
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        raise_if_draining()
+        time.sleep(min(0.5, max(0, deadline - time.time())))
+    return {'success': True, 'slept': seconds}
+
+
+def run_demo_load(connection, duration: int = 300, peak_rate: float = 2.0, job_seconds: float = 8.0):
+    """
+    Submit fake jobs in waves (quiet -> peak -> quiet) from a child process
+
+    Args:
+        connection: Redis connection
+        duration: Seconds of load
+        peak_rate: Jobs per second at the peak
+        job_seconds: Mean fake job duration
+    """
+    from rq_scheduler import FairScheduler
+
+    scheduler = FairScheduler(connection)
+    start = time.time()
+    submitted = 0
+    while time.time() - start < duration:
+        phase = (time.time() - start) / duration
+        rate = peak_rate * math.sin(math.pi * phase) ** 2
+        if random.random() < rate:
+            work_class = random.choice(['interactive', 'bulk', 'bulk'])
+            session_id = f"demo-{random.randint(1, 5)}"
+            scheduler.submit(work_class, 'rq_supervisor.fake_job', args=(random.uniform(0.5, 1.5) * job_seconds,),
+                             session_id=session_id, cost=1000, job_timeout=120)
+            submitted += 1
+        time.sleep(1)
+    print(f"🧪 [Demo] Submitted {submitted} fake jobs", flush=True)
+
+
+def dry_run(min_workers: int, max_workers: int):
+    """Print the decisions the policy would take against live queues (no workers started)"""
+    connection = get_redis_conn()
+    if connection is None:
+        print(f"❌ Redis not available (REDIS_URL={REDIS_URL})")
+        return 1
+
+    policy = default_policy(min_workers, max_workers)
+    current = policy.min_workers
+    while True:
+        snapshot = collect_snapshot(connection)
+        desired = policy.decide(current, snapshot)
+        print(f"{time.strftime('%H:%M:%S')} {snapshot} -> {desired} worker(s)"
+              f"{' (change)' if desired != current else ''}", flush=True)
+        current = desired
+        time.sleep(SCALE_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI-Prism autoscaling RQ worker supervisor')
+    parser.add_argument('--min', type=int, default=MIN_WORKERS, help=f'Minimum workers (default: {MIN_WORKERS})')
+    parser.add_argument('--max', type=int, default=MAX_WORKERS, help=f'Maximum workers (default: {MAX_WORKERS})')
+    parser.add_argument('--queues', nargs='+', default=None,
+                        help=f'Queues in priority order (default: {" ".join(QUEUE_PRIORITY)})')
+    parser.add_argument('--demo', action='store_true', help='Also submit waves of fake jobs (local testing)')
+    parser.add_argument('--dry-run', action='store_true', help='Only print scaling decisions')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        return dry_run(args.min, args.max)
+
+    if args.demo:
+        from multiprocessing import Process
+
+        load = Process(target=run_demo_load, args=(get_redis_conn(),), daemon=True)
+        load.start()
+
+    return run_supervisor(args.min, args.max, args.queues)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
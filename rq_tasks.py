@@ -22,6 +22,7 @@ import sys
 import json
 import time
 import re
+import threading
 import boto3
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -32,6 +33,33 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config.bedrock_prompt_templates import BedrockPromptTemplate
 from config.model_config_enhanced import get_primary_model, FEEDBACK_MIN_CONFIDENCE
+from core.section_batcher import build_batch_analysis_prompt, split_batch_response
+from core.request_coalescer import analysis_cache_key
+from core.bedrock_gateway_client import is_gateway_enabled, invoke_via_gateway
+from rq import get_current_job
+from rq_cancellation import JobCancelled, raise_if_cancelled
+from rq_checkpoint import JobDrained, checkpointed, raise_if_draining
+from rq_retry import RETRYABLE_ERROR_CODES, TransientTaskError
+from rq_events import publish_job_event
+from rq_results import pack_result
+
+
+# Bump whenever analysis prompts change so coalescing/caching never mixes prompt versions
+ANALYSIS_PROMPT_VERSION = 'hawkeye-analysis-v2'
+
+# Bedrock attempts per call (retried here, not in botocore, so cancellation is checked in between)
+BEDROCK_MAX_ATTEMPTS = 3
+
+# Seconds between cancellation checks while a response streams in
+CANCEL_CHECK_INTERVAL = 0.5
+
+# Per-process caches (built once per long-lived worker, see prewarm() / rq_worker.py)
+_bedrock_client = None
+_bedrock_client_pid = None
+_hawkeye_checklist = None
+_analysis_system_prompt = None
+_chat_system_prompt = None
+_cache_lock = threading.Lock()
 
 
 # ============================================================================
@@ -40,15 +68,29 @@ from config.model_config_enhanced import get_primary_model, FEEDBACK_MIN_CONFIDE
 
 def get_bedrock_client():
     """
-    Create AWS Bedrock client with optimized configuration
+    Get the process-wide AWS Bedrock client (created on first use)
+
+    The client is thread-safe and keeps its connection pool between jobs.
+    It is rebuilt after a fork, since boto3 clients must not cross processes.
 
     Returns:
         boto3.client: Configured Bedrock Runtime client
     """
+    global _bedrock_client, _bedrock_client_pid
+
+    with _cache_lock:
+        if _bedrock_client is None or _bedrock_client_pid != os.getpid():
+            _bedrock_client = _create_bedrock_client()
+            _bedrock_client_pid = os.getpid()
+        return _bedrock_client
+
+
+def _create_bedrock_client():
+    """Create a new Bedrock Runtime client with optimized configuration"""
     boto_config = Config(
         connect_timeout=15,
         read_timeout=240,
-        retries={'max_attempts': 3, 'mode': 'standard'},
+        retries={'max_attempts': 1, 'mode': 'standard'},  # Retries handled in invoke_bedrock_model
         max_pool_connections=50
     )
 
@@ -65,6 +107,13 @@ def invoke_bedrock_model(system_prompt: str, user_prompt: str) -> Dict[str, Any]
     """
     Invoke AWS Bedrock Claude model with prompts
 
+    The response is streamed so a cancelled job stops within
+    CANCEL_CHECK_INTERVAL instead of waiting for the full completion.
+    With BEDROCK_GATEWAY_URL set the call goes through the asyncio gateway
+    (bedrock_gateway.py), which owns the host-wide rate limit and cache.
+    Throttling and transient errors are retried up to BEDROCK_MAX_ATTEMPTS
+    times, checking for cancellation before every attempt.
+
     Args:
         system_prompt: System instruction prompt
         user_prompt: User query/task prompt
@@ -73,12 +122,51 @@ def invoke_bedrock_model(system_prompt: str, user_prompt: str) -> Dict[str, Any]
         Dict with result, model_used, and tokens
 
     Raises:
+        JobCancelled: If the running RQ job was cancelled
+        JobDrained: If the worker is shutting down (checked between attempts only)
+        TransientTaskError: If Bedrock is still throttling/unavailable after all attempts
         Exception: If invocation fails
     """
-    bedrock_client = get_bedrock_client()
-    model_config = get_primary_model()
+    from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, ReadTimeoutError
+
+    last_error = None
 
-    request_body = {
+    for attempt in range(1, BEDROCK_MAX_ATTEMPTS + 1):
+        raise_if_cancelled()
+        raise_if_draining()
+
+        try:
+            if is_gateway_enabled():
+                return _invoke_bedrock_gateway(system_prompt, user_prompt)
+            return _invoke_bedrock_stream(system_prompt, user_prompt)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', '')
+            if error_code not in RETRYABLE_ERROR_CODES:
+                raise
+            last_error = e
+        except (BotoConnectionError, ReadTimeoutError) as e:
+            last_error = e
+
+        if attempt < BEDROCK_MAX_ATTEMPTS:
+            backoff = 2 ** attempt
+            print(f"⚠️ Bedrock attempt {attempt} failed ({last_error}), retrying in {backoff}s")
+            _sleep_unless_cancelled(backoff)
+
+    raise TransientTaskError(f"Bedrock invocation failed after {BEDROCK_MAX_ATTEMPTS} attempts: {last_error}")
+
+
+def _sleep_unless_cancelled(seconds: float):
+    """Sleep in small steps, raising JobCancelled/JobDrained as soon as the job is cancelled or the worker stops"""
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        raise_if_cancelled()
+        raise_if_draining()
+        time.sleep(min(CANCEL_CHECK_INTERVAL, max(0, deadline - time.time())))
+
+
+def _build_request_body(model_config, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    """Bedrock (Anthropic messages) request body"""
+    return {
         'anthropic_version': 'bedrock-2023-05-31',
         'max_tokens': model_config.max_tokens,
         'temperature': model_config.temperature,
@@ -91,41 +179,98 @@ def invoke_bedrock_model(system_prompt: str, user_prompt: str) -> Dict[str, Any]
         ]
     }
 
-    response = bedrock_client.invoke_model(
+
+def _invoke_bedrock_gateway(system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    """Single Bedrock call through the gateway, checking for cancellation while it waits"""
+    model_config = get_primary_model()
+
+    response = invoke_via_gateway(
+        model_config.id,
+        _build_request_body(model_config, system_prompt, user_prompt),
+        region=os.environ.get('BEDROCK_REGION', 'us-east-2'),
+        on_wait=raise_if_cancelled
+    )
+
+    return {
+        'success': True,
+        'result': response['text'],
+        'model_used': model_config.name,
+        'tokens': {
+            'input': response['usage'].get('input_tokens', 0),
+            'output': response['usage'].get('output_tokens', 0)
+        }
+    }
+
+
+def _invoke_bedrock_stream(system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+    """Single streamed Bedrock call, checking for cancellation between chunks"""
+    bedrock_client = get_bedrock_client()
+    model_config = get_primary_model()
+
+    request_body = _build_request_body(model_config, system_prompt, user_prompt)
+
+    response = bedrock_client.invoke_model_with_response_stream(
         modelId=model_config.id,
         body=json.dumps(request_body)
     )
 
-    response_body = json.loads(response['body'].read())
-
-    # Extract text from content blocks
-    content_blocks = response_body.get('content', [])
-    result_text = ''
-    for block in content_blocks:
-        if block.get('type') == 'text':
-            result_text += block.get('text', '')
+    stream = response['body']
+    text_parts = []
+    input_tokens = 0
+    output_tokens = 0
+    next_cancel_check = time.time() + CANCEL_CHECK_INTERVAL
 
-    # Get usage stats
-    usage = response_body.get('usage', {})
+    try:
+        for event in stream:
+            if time.time() >= next_cancel_check:
+                raise_if_cancelled()
+                next_cancel_check = time.time() + CANCEL_CHECK_INTERVAL
+
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+
+            payload = json.loads(chunk['bytes'])
+            event_type = payload.get('type')
+
+            if event_type == 'content_block_delta':
+                delta = payload.get('delta', {})
+                if delta.get('type') == 'text_delta':
+                    text_parts.append(delta.get('text', ''))
+            elif event_type == 'message_start':
+                input_tokens = payload.get('message', {}).get('usage', {}).get('input_tokens', 0)
+            elif event_type == 'message_delta':
+                output_tokens = payload.get('usage', {}).get('output_tokens', output_tokens)
+    finally:
+        stream.close()
 
     return {
         'success': True,
-        'result': result_text,
+        'result': ''.join(text_parts),
         'model_used': model_config.name,
         'tokens': {
-            'input': usage.get('input_tokens', 0),
-            'output': usage.get('output_tokens', 0)
+            'input': input_tokens,
+            'output': output_tokens
         }
     }
 
 
 def load_hawkeye_checklist() -> str:
     """
-    Load Hawkeye framework checklist
+    Load Hawkeye framework checklist (read from disk once per process)
 
     Returns:
         Checklist content as string
     """
+    global _hawkeye_checklist
+
+    if _hawkeye_checklist is None:
+        _hawkeye_checklist = _read_hawkeye_checklist()
+    return _hawkeye_checklist
+
+
+def _read_hawkeye_checklist() -> str:
+    """Read the Hawkeye checklist file (with built-in fallback)"""
     try:
         checklist_path = os.path.join(
             os.path.dirname(__file__),
@@ -164,6 +309,138 @@ def load_hawkeye_checklist() -> str:
         return "Hawkeye Investigation Framework - Standard investigation checklist"
 
 
+def build_analysis_system_prompt() -> str:
+    """
+    Build the system prompt shared by single-section and batched analysis
+
+    Built once per process - it only depends on the checklist.
+
+    Returns:
+        System prompt string
+    """
+    global _analysis_system_prompt
+
+    if _analysis_system_prompt is None:
+        _analysis_system_prompt = BedrockPromptTemplate.build_system_prompt(
+            role="Senior Investigation Analyst",
+            expertise=[
+                "Hawkeye investigation framework",
+                "Document quality assessment",
+                "Risk analysis and compliance",
+                "Investigation best practices"
+            ],
+            guidelines=load_hawkeye_checklist()
+        )
+    return _analysis_system_prompt
+
+
+def build_chat_system_prompt() -> str:
+    """
+    Build the chat system prompt (once per process)
+
+    Returns:
+        System prompt string
+    """
+    global _chat_system_prompt
+
+    if _chat_system_prompt is None:
+        _chat_system_prompt = BedrockPromptTemplate.build_system_prompt(
+            role="Hawkeye Framework Expert",
+            expertise=[
+                "Investigation framework guidance",
+                "Document review assistance",
+                "Best practices consulting"
+            ]
+        )
+    return _chat_system_prompt
+
+
+def prewarm() -> Dict[str, float]:
+    """
+    Build every per-process resource up front
+
+    Called by long-lived workers at startup so the first job does not pay for
+    client creation, file reads or prompt building.
+
+    Returns:
+        Dict of resource name -> seconds spent building it
+    """
+    timings = {}
+    for name, builder in (
+        ('model_config', get_primary_model),
+        ('bedrock_client', get_bedrock_client),
+        ('hawkeye_checklist', load_hawkeye_checklist),
+        ('analysis_system_prompt', build_analysis_system_prompt),
+        ('chat_system_prompt', build_chat_system_prompt),
+    ):
+        start = time.time()
+        builder()
+        timings[name] = round(time.time() - start, 4)
+    return timings
+
+
+def parse_json_response(response_text: str) -> Dict[str, Any]:
+    """
+    Parse a JSON model response, tolerating markdown fences and surrounding text
+
+    Args:
+        response_text: Raw model response
+
+    Returns:
+        Parsed JSON object
+
+    Raises:
+        Exception: If no JSON object can be parsed
+    """
+    # Clean up response (remove markdown if present)
+    cleaned = response_text.strip()
+    if cleaned.startswith('```'):
+        cleaned = re.sub(r'^```(?:json)?\s*', '', cleaned)
+        cleaned = re.sub(r'\s*```$', '', cleaned)
+
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        print(f"⚠️ JSON parse error: {e}")
+        print(f"Response preview: {response_text[:500]}")
+
+        # Try to extract JSON
+        json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(0))
+        raise Exception(f"Failed to parse AI response: {e}")
+
+
+def filter_feedback_items(feedback_items: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Keep only well-formed feedback items with confidence >= FEEDBACK_MIN_CONFIDENCE
+
+    Args:
+        feedback_items: Raw feedback items from the model
+
+    Returns:
+        High quality feedback items
+    """
+    return [
+        item for item in feedback_items
+        if isinstance(item, dict) and item.get('confidence', 0) >= FEEDBACK_MIN_CONFIDENCE
+    ]
+
+
+def get_analysis_cache_key(content: str, doc_type: str) -> str:
+    """
+    Analysis cache key for a section (or batch) of content
+
+    Args:
+        content: Section text (batches pass their concatenated text)
+        doc_type: Document type
+
+    Returns:
+        Key combining content digest, doc_type, model id and prompt version
+    """
+    return analysis_cache_key(content, doc_type, get_primary_model().id, ANALYSIS_PROMPT_VERSION)
+
+
 def get_hawkeye_sections() -> Dict[int, str]:
     """
     Get Hawkeye framework section checkpoints
@@ -226,26 +503,20 @@ def analyze_section_task(
             - model_used: AI model name
             - tokens: Token usage stats
             - feedback_count: Number of feedback items
+
+    Raises:
+        Exception: On failure, so RQ can retry or dead-letter the job (see rq_retry)
     """
     start_time = time.time()
 
     try:
         print(f"📝 [RQ] Analyzing section: {section_name}")
+        job = get_current_job()
+        update_job_progress(job, 10, 'Building prompts')
 
         # Build prompts using AWS Bedrock templates
         hawkeye_checkpoints = get_hawkeye_sections()
-        hawkeye_guidelines = load_hawkeye_checklist()
-
-        system_prompt = BedrockPromptTemplate.build_system_prompt(
-            role="Senior Investigation Analyst",
-            expertise=[
-                "Hawkeye investigation framework",
-                "Document quality assessment",
-                "Risk analysis and compliance",
-                "Investigation best practices"
-            ],
-            guidelines=hawkeye_guidelines
-        )
+        system_prompt = build_analysis_system_prompt()
 
         user_prompt = BedrockPromptTemplate.build_analysis_prompt(
             section_name=section_name,
@@ -255,49 +526,26 @@ def analyze_section_task(
             max_feedback_items=10
         )
 
-        # Invoke Bedrock API
-        result = invoke_bedrock_model(system_prompt, user_prompt)
+        # Invoke Bedrock API (skipped when resuming from a checkpoint)
+        update_job_progress(job, 30, 'Analyzing with AI')
+        result = checkpointed(job, 'bedrock', lambda: invoke_bedrock_model(system_prompt, user_prompt))
 
         if not result['success']:
             raise Exception("Bedrock invocation failed")
 
         # Parse response
-        response_text = result['result']
-
-        # Clean up response (remove markdown if present)
-        cleaned = response_text.strip()
-        if cleaned.startswith('```'):
-            cleaned = re.sub(r'^```(?:json)?\s*', '', cleaned)
-            cleaned = re.sub(r'\s*```$', '', cleaned)
-
-        # Parse JSON
-        try:
-            analysis_result = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON parse error: {e}")
-            print(f"Response preview: {response_text[:500]}")
-
-            # Try to extract JSON
-            json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-            if json_match:
-                analysis_result = json.loads(json_match.group(0))
-            else:
-                raise Exception(f"Failed to parse AI response: {e}")
+        update_job_progress(job, 90, 'Processing feedback')
+        analysis_result = parse_json_response(result['result'])
 
         # Validate and filter feedback
-        feedback_items = analysis_result.get('feedback_items', [])
-
-        # Filter by confidence >= 0.80 (configurable via FEEDBACK_MIN_CONFIDENCE)
-        high_quality_items = [
-            item for item in feedback_items
-            if isinstance(item, dict) and item.get('confidence', 0) >= FEEDBACK_MIN_CONFIDENCE
-        ]
+        high_quality_items = filter_feedback_items(analysis_result.get('feedback_items', []))
 
         duration = time.time() - start_time
 
         print(f"✅ [RQ] Complete: {len(high_quality_items)} items ({duration:.2f}s)")
 
-        return {
+        # Large results are compressed or spilled out of Redis (see rq_results)
+        return pack_result({
             'success': True,
             'feedback_items': high_quality_items,
             'section': section_name,
@@ -305,20 +553,132 @@ def analyze_section_task(
             'model_used': result['model_used'],
             'tokens': result['tokens'],
             'feedback_count': len(high_quality_items)
-        }
+        }, job.id if job else None)
+
+    except JobCancelled:
+        print(f"🛑 [RQ] Job cancelled after {time.time() - start_time:.2f}s")
+        raise
+
+    except JobDrained:
+        print(f"⏸️  [RQ] Job paused for worker shutdown after {time.time() - start_time:.2f}s")
+        raise
 
     except Exception as e:
-        error_msg = str(e)
+        print(f"❌ [RQ] Error analyzing {section_name} after {time.time() - start_time:.2f}s: {e}")
+        raise
+
+
+# ============================================================================
+# RQ TASK 1b: BATCHED SECTION ANALYSIS
+# ============================================================================
+
+def analyze_sections_batch_task(
+    sections: Dict[str, str],
+    doc_type: str = "Investigation Report",
+    session_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Analyze several small sections with ONE Bedrock call
+
+    The system prompt is sent once and the model returns feedback keyed by
+    section name, which is split back into per-section results.
+
+    Args:
+        sections: Section name -> content (see core.section_batcher.plan_section_batches)
+        doc_type: Document type (default: "Investigation Report")
+        session_id: Session ID for tracking (optional)
+
+    Returns:
+        Dict with:
+            - success: bool
+            - batch: True (marks a batched result)
+            - results: Dict of section name -> {feedback_items, feedback_count}
+            - duration: Processing time in seconds
+            - model_used: AI model name
+            - tokens: Token usage stats
+
+    Raises:
+        Exception: On failure, so RQ can retry or dead-letter the job (see rq_retry)
+    """
+    start_time = time.time()
+    section_names = list(sections.keys())
+
+    try:
+        print(f"📦 [RQ] Analyzing {len(section_names)} sections in one batch: {section_names}")
+        job = get_current_job()
+        update_job_progress(job, 10, 'Building batch prompt')
+
+        system_prompt = build_analysis_system_prompt()
+        user_prompt = build_batch_analysis_prompt(sections, doc_type=doc_type)
+
+        # Invoke Bedrock API once for the whole batch
+        update_job_progress(job, 30, 'Analyzing with AI')
+        result = checkpointed(job, 'bedrock', lambda: invoke_bedrock_model(system_prompt, user_prompt))
+
+        if not result['success']:
+            raise Exception("Bedrock invocation failed")
+
+        update_job_progress(job, 90, 'Processing feedback')
+
+        per_section = split_batch_response(result['result'], section_names)
+
+        # Sections the model left out or misnamed get their own request
+        for section_name in [name for name in section_names if name not in per_section]:
+            print(f"⚠️ [RQ] Batch response missing section {section_name}, analyzing individually")
+            per_section[section_name] = _analyze_single_section(job, section_name, sections[section_name], doc_type)
+
+        results = {}
+        for section_name in section_names:
+            feedback_items = per_section[section_name]
+            high_quality_items = filter_feedback_items(feedback_items)
+            results[section_name] = {
+                'feedback_items': high_quality_items,
+                'feedback_count': len(high_quality_items)
+            }
+
         duration = time.time() - start_time
 
-        print(f"❌ [RQ] Error analyzing {section_name}: {error_msg}")
+        print(f"✅ [RQ] Batch complete: {len(results)} sections ({duration:.2f}s)")
 
-        return {
-            'success': False,
-            'error': error_msg,
-            'section': section_name,
-            'duration': round(duration, 2)
-        }
+        return pack_result({
+            'success': True,
+            'batch': True,
+            'results': results,
+            'sections': section_names,
+            'duration': round(duration, 2),
+            'model_used': result['model_used'],
+            'tokens': result['tokens']
+        }, job.id if job else None)
+
+    except JobCancelled:
+        print(f"🛑 [RQ] Job cancelled after {time.time() - start_time:.2f}s")
+        raise
+
+    except JobDrained:
+        print(f"⏸️  [RQ] Job paused for worker shutdown after {time.time() - start_time:.2f}s")
+        raise
+
+    except Exception as e:
+        print(f"❌ [RQ] Error analyzing batch {section_names} after {time.time() - start_time:.2f}s: {e}")
+        raise
+
+
+def _analyze_single_section(job, section_name: str, content: str, doc_type: str) -> List[Dict[str, Any]]:
+    """Raw feedback items for one section left out of a batched response"""
+    user_prompt = BedrockPromptTemplate.build_analysis_prompt(
+        section_name=section_name,
+        content=content,
+        framework_checkpoints=get_hawkeye_sections(),
+        doc_type=doc_type,
+        max_feedback_items=10
+    )
+    result = checkpointed(job, f'bedrock:{section_name}',
+                          lambda: invoke_bedrock_model(build_analysis_system_prompt(), user_prompt))
+
+    if not result['success']:
+        raise Exception(f"Bedrock invocation failed for section {section_name}")
+
+    return parse_json_response(result['result']).get('feedback_items', [])
 
 
 # ============================================================================
@@ -342,11 +702,15 @@ def process_chat_task(query: str, context: Dict[str, Any]) -> Dict[str, Any]:
             - duration: Processing time
             - model_used: AI model name
             - tokens: Token usage stats
+
+    Raises:
+        Exception: On failure, so RQ can retry or dead-letter the job (see rq_retry)
     """
     start_time = time.time()
 
     try:
         print(f"💬 [RQ] Processing chat: {query[:50]}...")
+        job = get_current_job()
 
         # Build prompts
         framework_overview = """Hawkeye 20-Point Investigation Checklist covering:
@@ -355,14 +719,7 @@ Verification, Appeals, Security, Funds, Outreach, Sentiment, Root Cause,
 Prevention, Documentation, Collaboration, QC, Improvement, Communication,
 Metrics, Legal, Launch."""
 
-        system_prompt = BedrockPromptTemplate.build_system_prompt(
-            role="Hawkeye Framework Expert",
-            expertise=[
-                "Investigation framework guidance",
-                "Document review assistance",
-                "Best practices consulting"
-            ]
-        )
+        system_prompt = build_chat_system_prompt()
 
         user_prompt = BedrockPromptTemplate.build_chat_prompt(
             user_query=query,
@@ -371,7 +728,7 @@ Metrics, Legal, Launch."""
         )
 
         # Invoke Bedrock
-        result = invoke_bedrock_model(system_prompt, user_prompt)
+        result = checkpointed(job, 'bedrock', lambda: invoke_bedrock_model(system_prompt, user_prompt))
 
         if not result['success']:
             raise Exception("Bedrock invocation failed")
@@ -380,25 +737,25 @@ Metrics, Legal, Launch."""
 
         print(f"✅ [RQ] Chat complete ({duration:.2f}s)")
 
-        return {
+        return pack_result({
             'success': True,
             'response': result['result'],
             'duration': round(duration, 2),
             'model_used': result['model_used'],
             'tokens': result['tokens']
-        }
+        }, job.id if job else None)
 
-    except Exception as e:
-        error_msg = str(e)
-        duration = time.time() - start_time
+    except JobCancelled:
+        print(f"🛑 [RQ] Job cancelled after {time.time() - start_time:.2f}s")
+        raise
 
-        print(f"❌ [RQ] Chat error: {error_msg}")
+    except JobDrained:
+        print(f"⏸️  [RQ] Job paused for worker shutdown after {time.time() - start_time:.2f}s")
+        raise
 
-        return {
-            'success': False,
-            'error': error_msg,
-            'duration': round(duration, 2)
-        }
+    except Exception as e:
+        print(f"❌ [RQ] Chat error after {time.time() - start_time:.2f}s: {e}")
+        raise
 
 
 # ============================================================================
@@ -412,15 +769,19 @@ def monitor_health() -> Dict[str, Any]:
     Can be scheduled with RQ Scheduler for periodic health monitoring
 
     Returns:
-        Dict with health status and timestamp
+        Dict with health status, timestamp, request stats and queue stats
     """
     try:
         from core.async_request_manager import get_async_request_manager
+        from rq_metrics import get_queue_stats
 
         # Get stats from request manager
         async_manager = get_async_request_manager()
         stats = async_manager.get_stats()
 
+        job = get_current_job()
+        queue_stats = get_queue_stats(job.connection) if job else None
+
         print("=" * 60)
         print("📊 SYSTEM HEALTH CHECK")
         print("=" * 60)
@@ -432,13 +793,20 @@ def monitor_health() -> Dict[str, Any]:
         print(f"Requests/min: {stats['requests_last_minute']}")
         print(f"Tokens/min: {stats['tokens_last_minute']}")
         print(f"Avg Response: {stats['avg_response_time']:.2f}s")
+        if queue_stats:
+            print(f"Workers: {queue_stats['busy_workers']}/{queue_stats['workers']} busy")
+            for name, queue in queue_stats['queues'].items():
+                print(f"  {name:<10} queued={queue['queued']:<4} running={queue['running']:<3} "
+                      f"wait p95={queue['wait']['p95']}s run p95={queue['run']['p95']}s "
+                      f"{queue['throughput']['per_minute']}/min")
         print("=" * 60)
 
         return {
             'success': True,
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
-            'stats': stats
+            'stats': stats,
+            'queues': queue_stats
         }
 
     except Exception as e:
@@ -458,7 +826,7 @@ def monitor_health() -> Dict[str, Any]:
 
 def update_job_progress(job, progress: int, status: str):
     """
-    Update RQ job progress metadata
+    Update RQ job progress metadata and push it to waiting sessions
 
     Args:
         job: RQ Job instance
@@ -469,6 +837,7 @@ def update_job_progress(job, progress: int, status: str):
         job.meta['progress'] = progress
         job.meta['status'] = status
         job.save_meta()
+        publish_job_event(job, job.connection, 'PROGRESS', progress=progress, status=status)
 
 
 # ============================================================================
@@ -481,8 +850,11 @@ if __name__ == "__main__":
     print("=" * 70)
     print("\nAvailable Tasks:")
     print("  1. analyze_section_task(section_name, content, doc_type, session_id)")
+    print("     analyze_sections_batch_task(sections, doc_type, session_id)")
     print("  2. process_chat_task(query, context)")
     print("  3. monitor_health()")
+    print("\nWorkers:")
+    print("  python rq_worker.py --workers 4   # pre-warmed, long-lived (no fork per job)")
     print("\nUsage:")
     print("  from rq_config import get_queue")
     print("  from rq_tasks import analyze_section_task")
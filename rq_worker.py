@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed Long-Lived RQ Workers for AI-Prism
+
+The default `rq worker` forks a work horse for EVERY job, so each
+analyze_section_task re-imported modules, re-read the Hawkeye checklist,
+rebuilt the system prompt and created a new boto3 client (seconds per job).
+
+This module runs a pool of long-lived worker processes instead:
+- Each process is a SimpleWorker subclass: jobs run in-process, no fork
+- rq_tasks.prewarm() builds the Bedrock client, checklist and prompts once
+  at worker startup - every job after that reuses them
+- Job timeouts are still enforced, via SIGALRM (UnixSignalDeathPenalty),
+  which does not need a forked horse
+- rq.worker_pool.WorkerPool supervises the processes and respawns dead ones
+- Stop-job commands are cooperative (see rq_cancellation): the job stops
+  at its next cancellation check instead of the process being killed
+- Shutdown drains instead of killing work (see rq_checkpoint): on SIGTERM /
+  SIGINT the running job finishes its current Bedrock call (checkpointed),
+  then is requeued at the front of its queue and resumes on another worker
+- Retries of bulk jobs are put back in their session's fair-share line
+  (rq_scheduler.FairScheduler.schedule_retry) instead of RQ re-enqueueing
+  them straight onto the 'bulk' queue
+- Every worker runs with the RQ scheduler enabled, so retries with backoff
+  (rq_retry) are re-enqueued on time; RQ's lock keeps it to one scheduler
+  per queue
+
+Usage:
+    python rq_worker.py                     # RQ_WORKERS processes, all queues
+    python rq_worker.py --workers 2 --queues chat analysis
+    python rq_worker.py --burst             # Drain queues and exit
+
+    main.py starts this pool automatically in local development.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from rq import SimpleWorker
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rq_config import QUEUE_PRIORITY, REDIS_URL, get_redis_conn
+
+# Number of long-lived worker processes in the pool
+WORKER_POOL_SIZE = int(os.environ.get('RQ_WORKERS', '4'))
+
+
+class PrewarmedWorker(SimpleWorker):
+    """
+    SimpleWorker that loads task resources once at startup
+
+    Jobs run inside the worker process itself, so everything built by
+    rq_tasks.prewarm() (boto3 client, checklist, prompts) stays warm
+    across jobs.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prewarm_timings = self._prewarm()
+
+    def _prewarm(self):
+        start = time.time()
+        try:
+            import rq_tasks
+            timings = rq_tasks.prewarm()
+            print(f"🔥 [Worker {os.getpid()}] Pre-warmed in {time.time() - start:.2f}s: {timings}", flush=True)
+            return timings
+        except Exception as e:
+            # Resources are still built lazily on first use
+            print(f"⚠️  [Worker {os.getpid()}] Pre-warm failed, continuing lazily: {e}", flush=True)
+            return {}
+
+    def work(self, *args, **kwargs):
+        """Start working with the RQ scheduler enabled (needed for interval retries)"""
+        kwargs.setdefault('with_scheduler', True)
+        return super().work(*args, **kwargs)
+
+    def request_stop(self, signum, frame):
+        """Warm shutdown that also tells the running job to stop at its next safe point"""
+        from rq_checkpoint import request_drain
+
+        request_drain()
+        print(f"⏸️  [Worker {os.getpid()}] Draining - current Bedrock call will finish, then the job is requeued", flush=True)
+        super().request_stop(signum, frame)
+
+    def handle_job_failure(self, job, queue, started_job_registry=None, exc_string=''):
+        """
+        Requeue drained jobs (not a failure, no retry used) and send bulk retries
+        back through the fair-share dispatcher; everything else as usual
+        """
+        retry_in = job.meta.get('retry_in')
+        if not job.meta.get('drained') and retry_in is None:
+            return super().handle_job_failure(job, queue, started_job_registry=started_job_registry,
+                                              exc_string=exc_string)
+
+        from rq_scheduler import FairScheduler
+
+        if started_job_registry is None:
+            started_job_registry = queue.started_job_registry
+
+        with self.connection.pipeline() as pipe:
+            started_job_registry.remove(job, pipeline=pipe)
+            self.set_current_job_id(None, pipeline=pipe)
+            pipe.execute()
+
+        if retry_in is not None:
+            job.meta.pop('retry_in', None)
+            job.retries_left = (job.retries_left or 1) - 1
+            job.started_at = None
+            FairScheduler(self.connection).schedule_retry(job, retry_in)
+            print(f"🔁 [Worker {os.getpid()}] Bulk job {job.id[:8]} goes back through the scheduler in {retry_in}s", flush=True)
+            return
+
+        job.meta.pop('drained', None)
+        job.meta['resumes'] = job.meta.get('resumes', 0) + 1
+        job.started_at = None
+        job.ended_at = None
+        FairScheduler(self.connection).requeue(job, at_front=True)
+        print(f"⏸️  [Worker {os.getpid()}] Requeued job {job.id[:8]} to resume elsewhere", flush=True)
+
+    def kill_horse(self, sig=None):
+        """
+        Stop the running job cooperatively - there is no horse to kill
+
+        The base implementation would killpg() our own process group
+        (horse_pid is 0), taking down the whole long-lived worker. Instead
+        the job's cancel flag is set; rq_tasks raises JobCancelled at its
+        next check (between Bedrock retries / stream chunks).
+        """
+        from rq_cancellation import CANCEL_KEY, CANCEL_FLAG_TTL
+
+        job_id = self.get_current_job_id()
+        if job_id:
+            self.connection.set(CANCEL_KEY.format(job_id), 1, ex=CANCEL_FLAG_TTL)
+            print(f"🛑 [Worker {os.getpid()}] Stopping job {job_id[:8]} at its next cancellation check", flush=True)
+
+
+def run_pool(num_workers: int = WORKER_POOL_SIZE, queue_names=None, burst: bool = False):
+    """
+    Run a supervised pool of pre-warmed workers (blocks until stopped)
+
+    Args:
+        num_workers: Number of worker processes
+        queue_names: Queues to listen on, in priority order (default: QUEUE_PRIORITY)
+        burst: Exit once the queues are empty
+    """
+    from rq.worker_pool import WorkerPool
+
+    connection = get_redis_conn()
+    if connection is None:
+        print(f"❌ Redis not available (REDIS_URL={REDIS_URL}) - cannot start workers")
+        return 1
+
+    queue_names = queue_names or QUEUE_PRIORITY
+
+    # Import task modules in the parent so forked workers share the loaded code
+    import rq_tasks  # noqa: F401
+
+    print(f"🔧 Starting {num_workers} pre-warmed RQ worker(s) on: {', '.join(queue_names)}", flush=True)
+
+    pool = WorkerPool(
+        queue_names,
+        connection=connection,
+        num_workers=num_workers,
+        worker_class=PrewarmedWorker
+    )
+    pool.start(burst=burst)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI-Prism pre-warmed RQ worker pool')
+    parser.add_argument('--workers', type=int, default=WORKER_POOL_SIZE,
+                        help=f'Number of worker processes (default: {WORKER_POOL_SIZE})')
+    parser.add_argument('--queues', nargs='+', default=None,
+                        help=f'Queues in priority order (default: {" ".join(QUEUE_PRIORITY)})')
+    parser.add_argument('--burst', action='store_true', help='Exit when queues are empty')
+    args = parser.parse_args()
+
+    return run_pool(args.workers, args.queues, burst=args.burst)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -50,6 +50,7 @@ function startAnalysis() {
         body: formData
     })
     .then(response => response.json())
+    .then(waitForUploadSections)
     .then(data => {
         hideProgress();
 
@@ -81,6 +82,153 @@ function startAnalysis() {
     });
 }
 
+// /upload returns before the document is parsed (parsing: true). Resolves with
+// the upload response once the first sections are published, then keeps the
+// section list up to date until parsing (and AI section detection) is done.
+function waitForUploadSections(data) {
+    if (!data.success || !(data.parsing || data.sections_refining)) {
+        return Promise.resolve(data);
+    }
+
+    currentSession = data.session_id;
+    window.currentSession = data.session_id;
+
+    return new Promise((resolve, reject) => {
+        let resolved = false;
+        if (data.sections && data.sections.length > 0) {
+            resolved = true;
+            resolve(data);
+        }
+
+        pollDocumentStructure(data.session_id, (data.sections || []).slice(), (structure, error) => {
+            if (error) {
+                if (!resolved) {
+                    resolved = true;
+                    reject(error);
+                } else {
+                    showNotification(error.message, 'error');
+                }
+                return;
+            }
+
+            const finished = structure.state !== 'parsing';
+            if (!resolved) {
+                if (structure.sections.length > 0 || finished) {
+                    resolved = true;
+                    resolve({...data, sections: structure.sections, total_sections: structure.sections.length});
+                }
+                return;
+            }
+            updateSectionList(structure.sections);
+            if (finished && !structure.refining) {
+                showNotification(`${structure.sections.length} sections detected`, 'info');
+            }
+        });
+    });
+}
+
+// Poll /document_structure; onUpdate(structure) runs whenever the sections or
+// state change, onUpdate(null, error) if the document could not be parsed or
+// the structure is still pending when polling gives up
+function pollDocumentStructure(sessionId, shownSections, onUpdate, attempt = 0) {
+    if (currentSession !== sessionId) return;
+    if (attempt >= 200) {
+        onUpdate(null, new Error('Timed out waiting for section detection to finish'));
+        return;
+    }
+
+    const delay = attempt < 20 ? 500 : 3000;
+    setTimeout(() => {
+        fetch('/document_structure?session_id=' + encodeURIComponent(sessionId))
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success || data.state === 'failed') {
+                onUpdate(null, new Error('Could not read document: ' + (data.error || 'Unknown error')));
+                return;
+            }
+
+            const pending = data.state === 'parsing' || data.refining;
+            if (JSON.stringify(data.sections) !== JSON.stringify(shownSections) || !pending) {
+                shownSections = data.sections.slice();
+                onUpdate(data);
+            }
+            if (pending) {
+                pollDocumentStructure(sessionId, shownSections, onUpdate, attempt + 1);
+            }
+        })
+        .catch(error => {
+            console.warn('Structure poll failed:', error);
+            pollDocumentStructure(sessionId, shownSections, onUpdate, attempt + 1);
+        });
+    }, delay);
+}
+
+// Replace the section list with a newer one from background parsing
+function updateSectionList(sectionNames) {
+    if (JSON.stringify(sectionNames) === JSON.stringify(sections)) return;
+
+    const firstChanged = sections[0] !== sectionNames[0];
+    sections = sectionNames;
+    window.sections = sectionNames;
+    sessionStorage.setItem('sections', JSON.stringify(sectionNames));
+    if (typeof totalSections !== 'undefined') {
+        totalSections = sectionNames.length;
+    }
+    if (typeof sectionAnalysisStatus !== 'undefined') {
+        sectionNames.forEach(section => {
+            if (!sectionAnalysisStatus[section]) {
+                sectionAnalysisStatus[section] = 'pending';
+            }
+        });
+    }
+
+    const select = document.getElementById('sectionSelect');
+    const selected = select ? select.value : '';
+    if (typeof populateSectionSelect === 'function') {
+        populateSectionSelect(sectionNames);
+        if (select) select.value = selected;
+    }
+    console.log('✅ Sections updated:', sectionNames.length);
+
+    // Sections were re-detected (AI) - reload only if the user is still on the first one
+    if (firstChanged && currentSectionIndex === 0 && sectionNames.length > 0) {
+        loadSection(0);
+    }
+}
+
+// /complete_review queues the document generation (async: true). Resolves with
+// the task result ({success, output_file, download_url, comments_count,
+// s3_export}) once /task_status reports it, or {success: false, error}.
+function waitForReviewDocument(data, attempt = 0) {
+    if (!data.success || !data.async || !data.task_id) {
+        return Promise.resolve(data);
+    }
+    if (attempt >= 600) {
+        return Promise.resolve({success: false, error: 'Timed out waiting for the reviewed document'});
+    }
+
+    const sessionId = window.currentSession || currentSession;
+    const url = `/task_status/${data.task_id}` + (sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : '');
+    return new Promise(resolve => setTimeout(resolve, attempt < 30 ? 1000 : 3000))
+    .then(() => fetch(url))
+    .then(response => response.json())
+    .then(status => {
+        if (status.state === 'SUCCESS') {
+            return status.result || {success: false, error: 'Review task returned no result'};
+        }
+        if (status.state === 'FAILURE' || status.state === 'REVOKED') {
+            return {success: false, error: status.error || status.status || 'Review task failed'};
+        }
+        if (status.state === 'PROGRESS' && typeof showProgress === 'function') {
+            showProgress(`${status.status} (${status.progress}%)`);
+        }
+        return waitForReviewDocument(data, attempt + 1);
+    }, error => {
+        console.warn('Review status poll failed:', error);
+        return waitForReviewDocument(data, attempt + 1);
+    });
+}
+
 // Helper functions
 function showProgress(message) {
     const container = document.getElementById('progressContainer');
@@ -203,6 +203,7 @@ window.proceedWithCompleteReview = function(exportToS3 = false) {
         })
     })
     .then(response => response.json())
+    .then(waitForReviewDocument)
     .then(data => {
         hideProgress();
 
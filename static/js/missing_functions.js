@@ -124,6 +124,7 @@ function uploadAndAnalyze(analysisFile, guidelinesFile, guidelinesPreference) {
         }
         return response.json();
     })
+    .then(waitForUploadSections)
     .then(data => {
         if (data.success) {
             // Set session in multiple places to ensure compatibility
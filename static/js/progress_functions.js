@@ -242,6 +242,7 @@ function startAnalysis() {
         body: formData
     })
     .then(response => response.json())
+    .then(waitForUploadSections)
     .then(data => {
         if (data.success) {
             // CRITICAL: Set session in multiple scopes for reliability
@@ -1095,117 +1096,116 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('   - saveInlineFeedback:', typeof window.saveInlineFeedback);
 });
 
-// Task polling function for async analysis
+// Task watcher for async analysis
+// Completion is pushed over /events (task_events.js); falls back to 1s polling without SSE
 function pollTaskResult(taskId, sectionName) {
-    console.log(`Polling task ${taskId} for section: ${sectionName}`);
-
-    const maxAttempts = 120; // 2 minutes max (120 * 1 second)
-    let attempts = 0;
-
-    const pollInterval = setInterval(() => {
-        attempts++;
+    console.log(`Watching task ${taskId} for section: ${sectionName}`);
 
+    TaskEvents.watchTask(taskId, {
         // ✅ CRITICAL FIX: Pass session_id so backend can store feedback_data
-        fetch(`/task_status/${taskId}?session_id=${currentSession}`)
-            .then(response => response.json())
-            .then(data => {
-                console.log(`Task ${taskId} status:`, data.status, 'state:', data.state);
-
-                // Check both data.state and data.status for SUCCESS
-                if (data.state === 'SUCCESS' || data.status === 'SUCCESS' || data.status === 'Task completed successfully') {
-                    clearInterval(pollInterval);
-
-                    // ✅ CRITICAL FIX: Check if task completed but analysis actually failed
-                    if (data.result && data.result.success === false) {
-                        isAnalyzing = false;
-                        sectionAnalysisStatus[sectionName] = 'failed';
-
-                        const error = data.result.error || 'Analysis failed';
-                        console.error('❌ Task completed but analysis failed for section:', sectionName, error);
-
-                        // Show error message in feedback container
-                        const feedbackContainer = document.getElementById('feedbackContainer');
-                        if (feedbackContainer) {
-                            feedbackContainer.innerHTML = `
-                                <div style="text-align: center; padding: 40px; background: #fff5f5; border: 2px solid #ef4444; border-radius: 15px; margin: 20px 0;">
-                                    <div style="font-size: 3em; margin-bottom: 20px;">⏱️</div>
-                                    <h3 style="color: #ef4444; margin-bottom: 15px;">Analysis Failed</h3>
-                                    <p style="color: #666; margin-bottom: 20px;">Section: "${sectionName}"</p>
-                                    <p style="color: #ef4444; font-size: 0.9em; margin-bottom: 10px;"><strong>Error:</strong> ${error}</p>
-                                    <p style="color: #999; font-size: 0.85em; margin-bottom: 20px;">This is usually due to AWS Bedrock API timeout. Please try again.</p>
-                                    <button class="btn btn-primary" onclick="retryAnalysis()" style="margin-top: 15px;">🔄 Retry Analysis</button>
-                                </div>
-                            `;
-                        }
-
-                        showNotification('Analysis failed: ' + error, 'error');
-                        return; // Stop here, don't proceed to success path
-                    }
-
-                    // Normal success path - analysis actually succeeded
-                    isAnalyzing = false;
-                    sectionAnalysisStatus[sectionName] = 'analyzed';
-
-                    // Extract feedback items from result
-                    const feedbackItems = data.result?.feedback_items || [];
-                    console.log('📊 Extracted feedback items:', {
-                        count: feedbackItems.length,
-                        items: feedbackItems,
-                        sectionName: sectionName
-                    });
-
-                    console.log('✅ Analysis completed for section:', sectionName, 'Feedback items:', feedbackItems.length);
-                    displaySectionFeedback(feedbackItems, sectionName);
-                    showNotification(`Analysis completed for "${sectionName}"!`, 'success');
-
-                } else if (data.state === 'FAILURE' || data.status === 'FAILURE') {
-                    clearInterval(pollInterval);
+        sessionId: currentSession,
+        pollInterval: 1000,
+        timeoutMs: 120000, // 2 minutes max
+        onStatus: (data) => {
+            console.log(`Task ${taskId} status:`, data.status, 'state:', data.state);
+
+            // Check both data.state and data.status for SUCCESS
+            if (data.state === 'SUCCESS' || data.status === 'SUCCESS' || data.status === 'Task completed successfully') {
+                // ✅ CRITICAL FIX: Check if task completed but analysis actually failed
+                if (data.result && data.result.success === false) {
                     isAnalyzing = false;
                     sectionAnalysisStatus[sectionName] = 'failed';
 
-                    const error = data.result?.error || data.error || 'Task failed';
-                    console.error('Analysis failed for section:', sectionName, error);
+                    const error = data.result.error || 'Analysis failed';
+                    console.error('❌ Task completed but analysis failed for section:', sectionName, error);
 
+                    // Show error message in feedback container
                     const feedbackContainer = document.getElementById('feedbackContainer');
                     if (feedbackContainer) {
                         feedbackContainer.innerHTML = `
                             <div style="text-align: center; padding: 40px; background: #fff5f5; border: 2px solid #ef4444; border-radius: 15px; margin: 20px 0;">
-                                <div style="font-size: 3em; margin-bottom: 20px;">❌</div>
+                                <div style="font-size: 3em; margin-bottom: 20px;">⏱️</div>
                                 <h3 style="color: #ef4444; margin-bottom: 15px;">Analysis Failed</h3>
                                 <p style="color: #666; margin-bottom: 20px;">Section: "${sectionName}"</p>
-                                <p style="color: #ef4444; font-size: 0.9em;">${error}</p>
+                                <p style="color: #ef4444; font-size: 0.9em; margin-bottom: 10px;"><strong>Error:</strong> ${error}</p>
+                                <p style="color: #999; font-size: 0.85em; margin-bottom: 20px;">This is usually due to AWS Bedrock API timeout. Please try again.</p>
                                 <button class="btn btn-primary" onclick="retryAnalysis()" style="margin-top: 15px;">🔄 Retry Analysis</button>
                             </div>
                         `;
                     }
 
                     showNotification('Analysis failed: ' + error, 'error');
+                    return true; // Stop here, don't proceed to success path
+                }
 
-                } else if (attempts >= maxAttempts) {
-                    clearInterval(pollInterval);
-                    isAnalyzing = false;
-                    sectionAnalysisStatus[sectionName] = 'failed';
-
-                    console.error('Analysis timeout for section:', sectionName);
-                    showNotification('Analysis timeout - please try again', 'error');
+                // Normal success path - analysis actually succeeded
+                isAnalyzing = false;
+                sectionAnalysisStatus[sectionName] = 'analyzed';
+
+                // Extract feedback items from result
+                const feedbackItems = data.result?.feedback_items || [];
+                console.log('📊 Extracted feedback items:', {
+                    count: feedbackItems.length,
+                    items: feedbackItems,
+                    sectionName: sectionName
+                });
+
+                console.log('✅ Analysis completed for section:', sectionName, 'Feedback items:', feedbackItems.length);
+                displaySectionFeedback(feedbackItems, sectionName);
+                showNotification(`Analysis completed for "${sectionName}"!`, 'success');
+                return true;
+
+            } else if (data.state === 'FAILURE' || data.status === 'FAILURE') {
+                isAnalyzing = false;
+                sectionAnalysisStatus[sectionName] = 'failed';
 
-                    const feedbackContainer = document.getElementById('feedbackContainer');
-                    if (feedbackContainer) {
-                        feedbackContainer.innerHTML = `
-                            <div style="text-align: center; padding: 40px; background: #fff5f5; border: 2px solid #f59e0b; border-radius: 15px; margin: 20px 0;">
-                                <div style="font-size: 3em; margin-bottom: 20px;">⏱️</div>
-                                <h3 style="color: #f59e0b; margin-bottom: 15px;">Analysis Timeout</h3>
-                                <p style="color: #666; margin-bottom: 20px;">Section: "${sectionName}"</p>
-                                <p style="color: #f59e0b; font-size: 0.9em;">The analysis is taking longer than expected</p>
-                                <button class="btn btn-primary" onclick="retryAnalysis()" style="margin-top: 15px;">🔄 Retry Analysis</button>
-                            </div>
-                        `;
-                    }
+                const error = data.result?.error || data.error || 'Task failed';
+                console.error('Analysis failed for section:', sectionName, error);
+
+                const feedbackContainer = document.getElementById('feedbackContainer');
+                if (feedbackContainer) {
+                    feedbackContainer.innerHTML = `
+                        <div style="text-align: center; padding: 40px; background: #fff5f5; border: 2px solid #ef4444; border-radius: 15px; margin: 20px 0;">
+                            <div style="font-size: 3em; margin-bottom: 20px;">❌</div>
+                            <h3 style="color: #ef4444; margin-bottom: 15px;">Analysis Failed</h3>
+                            <p style="color: #666; margin-bottom: 20px;">Section: "${sectionName}"</p>
+                            <p style="color: #ef4444; font-size: 0.9em;">${error}</p>
+                            <button class="btn btn-primary" onclick="retryAnalysis()" style="margin-top: 15px;">🔄 Retry Analysis</button>
+                        </div>
+                    `;
                 }
-            })
-            .catch(error => {
-                console.error('Error polling task:', error);
-                // Don't stop polling on network errors, just log and continue
-            });
-    }, 1000); // Poll every 1 second
+
+                showNotification('Analysis failed: ' + error, 'error');
+                return true;
+
+            } else if (data.state === 'REVOKED') {
+                // Cancelled (session reset, document deleted or explicit cancel) - stop polling quietly
+                isAnalyzing = false;
+                sectionAnalysisStatus[sectionName] = 'cancelled';
+                console.log('🛑 Analysis cancelled for section:', sectionName);
+                return true;
+            }
+            return false;
+        },
+        onTimeout: () => {
+            isAnalyzing = false;
+            sectionAnalysisStatus[sectionName] = 'failed';
+
+            console.error('Analysis timeout for section:', sectionName);
+            showNotification('Analysis timeout - please try again', 'error');
+
+            const feedbackContainer = document.getElementById('feedbackContainer');
+            if (feedbackContainer) {
+                feedbackContainer.innerHTML = `
+                    <div style="text-align: center; padding: 40px; background: #fff5f5; border: 2px solid #f59e0b; border-radius: 15px; margin: 20px 0;">
+                        <div style="font-size: 3em; margin-bottom: 20px;">⏱️</div>
+                        <h3 style="color: #f59e0b; margin-bottom: 15px;">Analysis Timeout</h3>
+                        <p style="color: #666; margin-bottom: 20px;">Section: "${sectionName}"</p>
+                        <p style="color: #f59e0b; font-size: 0.9em;">The analysis is taking longer than expected</p>
+                        <button class="btn btn-primary" onclick="retryAnalysis()" style="margin-top: 15px;">🔄 Retry Analysis</button>
+                    </div>
+                `;
+            }
+        }
+    });
 }
\ No newline at end of file
@@ -0,0 +1,230 @@
+/**
+ * Task Events (Server-Sent Events)
+ *
+ * Replaces per-task setInterval polling of /task_status with ONE EventSource
+ * per tab on /events. The server pushes PROGRESS / SUCCESS / FAILURE / REVOKED
+ * events; /task_status is fetched once when a task reaches a final state
+ * to get the result. The worker has already stored analysis feedback in the
+ * backend session by then (session_applied), so closing the tab loses nothing.
+ *
+ * If /events is unavailable (no Redis/RQ, old browser), watchTask falls back
+ * to polling - several running tasks share one /task_status/batch request.
+ */
+
+window.TaskEvents = (function() {
+    const FINAL_STATES = ['SUCCESS', 'FAILURE', 'REVOKED'];
+    const SAFETY_POLL_MS = 15000;   // Slow poll while connected, in case an event is missed
+    const FINAL_FETCH_RETRIES = 5;  // Completion events can arrive just before RQ marks the job finished
+    const FINAL_FETCH_DELAY_MS = 300;
+
+    let source = null;
+    let sourceSession = null;
+    let connected = false;
+    const watchers = {};  // taskId -> watcher
+    let pollTimer = null;
+
+    function getSessionId() {
+        return window.currentSession ||
+               (typeof currentSession !== 'undefined' ? currentSession : null) ||
+               sessionStorage.getItem('currentSession');
+    }
+
+    function connect(sessionId) {
+        if (!window.EventSource || !sessionId) {
+            return;
+        }
+        if (source && sourceSession === sessionId) {
+            return;
+        }
+        disconnect();
+
+        sourceSession = sessionId;
+        source = new EventSource(`/events?session_id=${encodeURIComponent(sessionId)}`);
+
+        source.addEventListener('ready', () => {
+            connected = true;
+            console.log('📡 Task events connected');
+            reschedulePoll();
+        });
+
+        source.addEventListener('task', (event) => {
+            let data;
+            try {
+                data = JSON.parse(event.data);
+            } catch (e) {
+                return;
+            }
+            const watcher = watchers[data.task_id];
+            if (!watcher) {
+                return;
+            }
+            if (FINAL_STATES.includes(data.state)) {
+                fetchStatus(data.task_id, FINAL_FETCH_RETRIES);
+            } else if (watcher.onProgress) {
+                watcher.onProgress(data);
+            }
+        });
+
+        source.onerror = () => {
+            connected = false;
+            reschedulePoll();
+            // 503/400 means events are not available - stop retrying and fall back to polling
+            if (source && source.readyState === EventSource.CLOSED) {
+                console.warn('📡 Task events unavailable - falling back to polling');
+                disconnect();
+            }
+        };
+    }
+
+    function disconnect() {
+        if (source) {
+            source.close();
+        }
+        source = null;
+        sourceSession = null;
+        connected = false;
+    }
+
+    function deliver(taskId, data) {
+        const watcher = watchers[taskId];
+        if (watcher && watcher.onStatus(data)) {
+            delete watchers[taskId];
+        }
+    }
+
+    function statusUrl(taskId, sessionId) {
+        return sessionId
+            ? `/task_status/${taskId}?session_id=${encodeURIComponent(sessionId)}`
+            : `/task_status/${taskId}`;
+    }
+
+    // Single-task fetch, retried a few times when a final event beats RQ's own bookkeeping
+    function fetchStatus(taskId, retriesLeft) {
+        const watcher = watchers[taskId];
+        if (!watcher) {
+            return;
+        }
+        fetch(statusUrl(taskId, watcher.sessionId))
+            .then(response => response.json())
+            .then(data => {
+                deliver(taskId, data);
+                if (watchers[taskId] && retriesLeft > 0) {
+                    setTimeout(() => fetchStatus(taskId, retriesLeft - 1), FINAL_FETCH_DELAY_MS);
+                }
+            })
+            .catch(error => {
+                console.error(`Error fetching status for task ${taskId}:`, error);
+            });
+    }
+
+    // One /task_status/batch request for all watched tasks of a session
+    function fetchBatch(sessionId, taskIds) {
+        if (taskIds.length === 1) {
+            fetchStatus(taskIds[0], 0);
+            return;
+        }
+        fetch('/task_status/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ task_ids: taskIds, session_id: sessionId })
+        })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Batch status unavailable (${response.status})`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                Object.entries(data.tasks || {}).forEach(([taskId, status]) => {
+                    deliver(taskId, Object.assign({ task_id: taskId }, status));
+                });
+            })
+            .catch(error => {
+                console.warn('Batch status failed, checking tasks individually:', error.message);
+                taskIds.forEach(taskId => fetchStatus(taskId, 0));
+            });
+    }
+
+    function pollAll() {
+        pollTimer = null;
+        const now = Date.now();
+        const bySession = {};
+
+        Object.entries(watchers).forEach(([taskId, watcher]) => {
+            if (now >= watcher.deadline) {
+                delete watchers[taskId];
+                if (watcher.onTimeout) {
+                    watcher.onTimeout();
+                }
+                return;
+            }
+            const key = watcher.sessionId || '';
+            (bySession[key] = bySession[key] || []).push(taskId);
+        });
+
+        Object.entries(bySession).forEach(([sessionId, taskIds]) => fetchBatch(sessionId || null, taskIds));
+        schedulePoll();
+    }
+
+    function schedulePoll() {
+        const pending = Object.values(watchers);
+        if (pollTimer || pending.length === 0) {
+            return;
+        }
+        const delay = connected
+            ? SAFETY_POLL_MS
+            : Math.min(...pending.map(watcher => watcher.pollInterval));
+        pollTimer = setTimeout(pollAll, delay);
+    }
+
+    // Poll interval depends on whether events are live - re-arm the timer when that changes
+    function reschedulePoll() {
+        clearTimeout(pollTimer);
+        pollTimer = null;
+        schedulePoll();
+    }
+
+    /**
+     * Watch a task until it reaches a final state
+     *
+     * options:
+     *   sessionId     - session to subscribe to (defaults to the current session)
+     *   onStatus      - called with /task_status data; return true when the task is done
+     *   onProgress    - optional, called with pushed PROGRESS events
+     *   onTimeout     - called once if the task is not done within timeoutMs
+     *   pollInterval  - polling interval (ms) when events are unavailable
+     *   timeoutMs     - overall timeout (ms)
+     *
+     * All watched tasks share one poll timer; several tasks are checked with a
+     * single POST /task_status/batch request.
+     */
+    function watchTask(taskId, options) {
+        const sessionId = options.sessionId || getSessionId();
+
+        connect(sessionId);
+
+        watchers[taskId] = {
+            sessionId: sessionId,
+            onStatus: options.onStatus,
+            onProgress: options.onProgress,
+            onTimeout: options.onTimeout,
+            pollInterval: options.pollInterval || 2000,
+            deadline: Date.now() + options.timeoutMs
+        };
+
+        // First check right away when events are live (the task may already be done, e.g. coalesced)
+        if (connected) {
+            fetchStatus(taskId, 0);
+        }
+        schedulePoll();
+
+        return { cancel: () => delete watchers[taskId] };
+    }
+
+    return {
+        connect: connect,
+        disconnect: disconnect,
+        watchTask: watchTask,
+        isConnected: () => connected
+    };
+})();
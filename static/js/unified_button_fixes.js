@@ -674,6 +674,7 @@ window.confirmSubmitAllFeedbacks = function(sessionId) {
         }
         return response.json();
     })
+    .then(waitForReviewDocument)
     .then(data => {
         // Hide progress
         if (typeof hideProgress === 'function') {
@@ -1,19 +1,251 @@
 import os
+import copy
+import hashlib
 import json
+import re
+import tempfile
+import time
 import zipfile
 import shutil
-import uuid
 from datetime import datetime
 from docx import Document
 from docx.shared import RGBColor, Pt
 from lxml import etree
 
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_BODY = f'{{{W_NS}}}body'
+W_P = f'{{{W_NS}}}p'
+W_R = f'{{{W_NS}}}r'
+W_T = f'{{{W_NS}}}t'
+W_RPR = f'{{{W_NS}}}rPr'
+W_PPR = f'{{{W_NS}}}pPr'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CONTENT_TYPES_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+# Package parts rewritten when comments are added (everything else is copied as is)
+DOCUMENT_PART = 'word/document.xml'
+COMMENTS_PART = 'word/comments.xml'
+DOCUMENT_RELS_PART = 'word/_rels/document.xml.rels'
+CONTENT_TYPES_PART = '[Content_Types].xml'
+COMMENT_REFERENCE = f'{{{W_NS}}}commentReference'
+COMMENT_MARK_TAGS = (f'{{{W_NS}}}commentRangeStart', f'{{{W_NS}}}commentRangeEnd', COMMENT_REFERENCE)
+COMMENTS_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments'
+COMMENTS_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml'
+
+# Members larger than this need zip64 headers when streamed into the output
+ZIP64_THRESHOLD = 0x7FFFFFFF
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Last generated package + comment manifest per review session (incremental exports);
+# /tmp on App Runner (read-only filesystem)
+EXPORT_CACHE_DIR = os.environ.get(
+    'EXPORT_CACHE_DIR',
+    '/tmp/data/export_cache' if os.environ.get('FLASK_ENV') == 'production'
+    else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'export_cache')
+)
+EXPORT_CACHE_TTL = int(os.environ.get('EXPORT_CACHE_TTL', str(2 * 86400)))
+EXPORT_MANIFEST_VERSION = 2
+
+# Exports of one session are serialized (striped locks, keyed by session id). Real
+# locks: exports run on CPU offload threads, which gevent's patched Lock does not cover
+try:
+    from gevent import monkey as _gevent_monkey
+    _RealLock = _gevent_monkey.get_original('threading', 'Lock')
+except ImportError:
+    from threading import Lock as _RealLock
+_EXPORT_LOCKS = [_RealLock() for _ in range(64)]
+
+# Seconds between purges of expired export cache entries (per process)
+PURGE_INTERVAL = 3600
+_last_purge = 0.0
+
+# Characters XML 1.0 does not allow (lxml refuses them)
+INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# Run children that contribute to the paragraph text (as in core.docx_reader): w:t text, one char each for these
+SINGLE_CHAR_TAGS = {f'{{{W_NS}}}tab', f'{{{W_NS}}}br', f'{{{W_NS}}}cr'}
+
+
+def _xml_text(value):
+    """Text safe for an XML attribute/element (lxml escapes &, < and quotes itself)"""
+    return INVALID_XML_CHARS.sub('', str(value))
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file (None if it cannot be read)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def _replace_file(path, data):
+    """Write data to path atomically (unique temp file in the same directory, then rename)"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def comment_keys(comments_data):
+    """
+    Stable identity per comment: hash of its anchor, author and text
+
+    A changed comment therefore counts as removed + added; identical
+    comments are told apart by an occurrence counter.
+    """
+    keys = []
+    occurrences = {}
+    for comment in comments_data:
+        payload = json.dumps([comment.get('paragraph_index', 0), comment.get('highlight_span'),
+                              comment.get('author', 'AI Feedback'), comment.get('comment', '')])
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+        occurrences[digest] = occurrences.get(digest, 0) + 1
+        keys.append(f"{digest}-{occurrences[digest]}")
+    return keys
+
+
+class ParagraphIndex:
+    """
+    Body paragraphs of a document.xml tree by ordinal, with run offsets
+
+    Built once per document: paragraph lookup is O(1) and a paragraph's run
+    offsets are computed when a comment first targets it, so anchoring is
+    linear in the number of comments. Ordinals and character offsets are
+    those of python-docx doc.paragraphs / core.docx_reader (direct runs,
+    w:tab as one character, w:br/w:cr as one character).
+    """
+
+    def __init__(self, root):
+        body = root.find(W_BODY)
+        self.paragraphs = list(body.iterchildren(W_P)) if body is not None else []
+        self._runs = {}
+
+    def __len__(self):
+        return len(self.paragraphs)
+
+    def runs(self, ordinal):
+        """[(start, end, run element)] for a paragraph's direct runs"""
+        if ordinal not in self._runs:
+            offsets = []
+            pos = 0
+            for run in self.paragraphs[ordinal].iterchildren(W_R):
+                length = sum(self._child_length(child) for child in run)
+                offsets.append((pos, pos + length, run))
+                pos += length
+            self._runs[ordinal] = offsets
+        return self._runs[ordinal]
+
+    def anchor_comment(self, ordinal, comment_id, span=None):
+        """
+        Mark a comment range on a paragraph
+
+        Args:
+            ordinal: Paragraph ordinal (doc.paragraphs position)
+            comment_id: w:id of the comment in comments.xml
+            span: [start, end] character offsets to highlight (None = whole paragraph)
+        """
+        para = self.paragraphs[ordinal]
+        first_run = last_run = None
+        if span:
+            first_run, last_run = self._isolate_span(ordinal, span[0], span[1])
+
+        range_start = etree.Element(f'{{{W_NS}}}commentRangeStart')
+        range_start.set(f'{{{W_NS}}}id', str(comment_id))
+        range_end = etree.Element(f'{{{W_NS}}}commentRangeEnd')
+        range_end.set(f'{{{W_NS}}}id', str(comment_id))
+        reference = etree.Element(W_R)
+        etree.SubElement(reference, f'{{{W_NS}}}commentReference').set(f'{{{W_NS}}}id', str(comment_id))
+
+        if first_run is not None:
+            first_run.addprevious(range_start)
+            last_run.addnext(range_end)
+        else:
+            # Whole paragraph (after w:pPr, which must stay the first child)
+            ppr = para.find(W_PPR)
+            para.insert(para.index(ppr) + 1 if ppr is not None else 0, range_start)
+            para.append(range_end)
+        range_end.addnext(reference)
+
+    def _isolate_span(self, ordinal, start, end):
+        """Split runs so [start, end) is covered by whole runs; returns (first run, last run) or (None, None)"""
+        runs = self.runs(ordinal)
+        if not runs or start >= end or end > runs[-1][1]:
+            return None, None
+
+        for pos, run_end, run in runs:
+            # End first: the head keeps its offsets, so a start in the same run is still valid
+            if pos < end < run_end:
+                self._split_run(run, end - pos)
+            if pos < start < run_end:
+                self._split_run(run, start - pos)
+        self._runs.pop(ordinal, None)
+
+        covered = [run for pos, run_end, run in self.runs(ordinal) if pos >= start and run_end <= end and run_end > pos]
+        if not covered:
+            return None, None
+        return covered[0], covered[-1]
+
+    def _split_run(self, run, offset):
+        """Split a run in two at a character offset (formatting is copied to both halves)"""
+        tail = copy.deepcopy(run)
+        self._trim_run(run, 0, offset)
+        self._trim_run(tail, offset, None)
+        run.addnext(tail)
+
+    def _trim_run(self, run, start, end):
+        """Keep only the run content in [start, end)"""
+        pos = 0
+        for child in list(run):
+            if child.tag == W_RPR:
+                continue
+            length = self._child_length(child)
+            child_start, child_end = pos, pos + length
+            pos = child_end
+
+            keep_from = max(start, child_start)
+            keep_to = child_end if end is None else min(end, child_end)
+            if length == 0:
+                # Zero-width content (fields, drawings) stays with the part it starts in
+                if child_start < start or (end is not None and child_start >= end):
+                    run.remove(child)
+            elif keep_from >= keep_to:
+                run.remove(child)
+            elif child.tag == W_T and (keep_from, keep_to) != (child_start, child_end):
+                child.text = child.text[keep_from - child_start:keep_to - child_start]
+                child.set(XML_SPACE, 'preserve')
+
+    @staticmethod
+    def _child_length(child):
+        if child.tag == W_T:
+            return len(child.text or '')
+        return 1 if child.tag in SINGLE_CHAR_TAGS else 0
+
+
 class DocumentProcessor:
     def __init__(self):
         self.temp_dirs = []
 
-    def create_document_with_comments(self, original_path, comments_data, output_filename=None):
-        """Create a Word document with proper comments"""
+    def create_document_with_comments(self, original_path, comments_data, output_filename=None, cache_key=None):
+        """
+        Create a Word document with proper comments
+
+        Args:
+            original_path: Uploaded document
+            comments_data: Comments (paragraph_index, highlight_span, comment, author, ...)
+            output_filename: Output path (default: timestamped name)
+            cache_key: Review session id - enables incremental regeneration from the
+                previous export of the same session (see _create_incrementally)
+        """
         if not output_filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_filename = f"reviewed_document_{timestamp}.docx"
@@ -33,7 +265,12 @@ class DocumentProcessor:
         try:
             # Use the advanced comment insertion method
             print("🔧 Attempting XML comment insertion method...")
-            result = self._create_with_xml_comments(original_path, comments_data, output_filename)
+            if cache_key and re.fullmatch(r'[\w-]+', cache_key):
+                with _EXPORT_LOCKS[int(hashlib.sha1(cache_key.encode('utf-8')).hexdigest(), 16) % len(_EXPORT_LOCKS)]:
+                    result = self._create_incrementally(original_path, comments_data, output_filename, cache_key)
+            else:
+                self._create_with_xml_comments(original_path, comments_data, output_filename)
+                result = output_filename
             print(f"✅ XML comment method succeeded: {result}")
             return result
         except Exception as e:
@@ -46,183 +283,250 @@ class DocumentProcessor:
             print(f"✅ Annotation method result: {result}")
             return result
 
-    def _create_with_xml_comments(self, original_path, comments_data, output_filename):
-        """Create document with XML-based comments"""
-        temp_dir = f"temp_{uuid.uuid4()}"
-        self.temp_dirs.append(temp_dir)
-
-        print(f"📦 XML Method - Creating temp directory: {temp_dir}")
+    def _create_incrementally(self, original_path, comments_data, output_filename, cache_key):
+        """
+        Create the document from the session's previous export where possible
+
+        The last package generated for a session is cached with a manifest
+        (comment key -> w:id, the original's size/mtime and the cached package's
+        SHA-256, so a package/manifest pair left by a concurrent export from
+        another process is never mixed up). If the original is unchanged and
+        the package matches its manifest, only the difference is applied:
+        removed comments are taken out, added ones anchored. No difference at
+        all is a file copy. Anything else is a full build.
+        """
+        cache_path = os.path.join(EXPORT_CACHE_DIR, f"{cache_key}.docx")
+        manifest_path = os.path.join(EXPORT_CACHE_DIR, f"{cache_key}.json")
+        stat = os.stat(original_path)
+        source = {'path': os.path.abspath(original_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        keys = comment_keys(comments_data)
+
+        manifest = None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if (manifest and manifest.get('version') == EXPORT_MANIFEST_VERSION
+                and manifest.get('source') == source and file_sha256(cache_path) == manifest.get('package_sha256')):
+            previous = manifest['comments']
+            current = set(keys)
+            remove_ids = {comment_id for key, comment_id in previous.items() if key not in current}
+            added = [(key, comment) for key, comment in zip(keys, comments_data) if key not in previous]
+            comment_ids = {key: comment_id for key, comment_id in previous.items() if key in current}
+
+            if not remove_ids and not added:
+                print("⚡ No comment changes since the last export - reusing it")
+                shutil.copyfile(cache_path, output_filename)
+                return output_filename
+
+            print(f"⚡ Incremental export: +{len(added)} / -{len(remove_ids)} comments "
+                  f"(of {len(comments_data)})")
+            new_ids = self._create_with_xml_comments(cache_path, [comment for _, comment in added],
+                                                     output_filename, remove_ids)
+            comment_ids.update(zip([key for key, _ in added], new_ids))
+        else:
+            comment_ids = dict(zip(keys, self._create_with_xml_comments(original_path, comments_data, output_filename)))
 
         try:
-            # Create a copy of the original document
-            temp_docx = f"{temp_dir}_temp.docx"
-            print(f"📋 Copying original document to: {temp_docx}")
-            doc = Document(original_path)
-            doc.save(temp_docx)
+            self._store_export(output_filename, cache_path, manifest_path, {
+                'version': EXPORT_MANIFEST_VERSION,
+                'source': source,
+                'comments': comment_ids
+            })
+        except OSError as e:
+            print(f"⚠️ Could not cache export for {cache_key}: {e}")
+        return output_filename
+
+    def _store_export(self, output_filename, cache_path, manifest_path, manifest):
+        """Keep a copy of the generated package and its manifest (each replaced atomically)"""
+        global _last_purge
+
+        os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+        with open(output_filename, 'rb') as f:
+            package = f.read()
+        manifest = dict(manifest, package_sha256=hashlib.sha256(package).hexdigest())
+        _replace_file(cache_path, package)
+        _replace_file(manifest_path, json.dumps(manifest).encode('utf-8'))
+
+        if time.time() - _last_purge > PURGE_INTERVAL:
+            _last_purge = time.time()
+            cutoff = time.time() - EXPORT_CACHE_TTL
+            for entry in os.scandir(EXPORT_CACHE_DIR):
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
 
-            # Extract the docx as a zip
-            os.makedirs(temp_dir, exist_ok=True)
-            print(f"📂 Extracting docx to: {temp_dir}")
-            with zipfile.ZipFile(temp_docx, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
+    def _create_with_xml_comments(self, original_path, comments_data, output_filename, remove_ids=()):
+        """
+        Create document with XML-based comments
 
-            # Create comments.xml
-            print(f"💬 Generating comments.xml with {len(comments_data)} comments...")
-            comments_xml = self._generate_comments_xml(comments_data)
-            comments_path = os.path.join(temp_dir, 'word', 'comments.xml')
+        Zip to zip: every member of the original package is streamed into the
+        output unchanged, except the parts that carry comments - comments.xml,
+        document.xml, its relationships and [Content_Types].xml - which are
+        edited with lxml in memory. No temp files, no python-docx round trip.
 
-            with open(comments_path, 'w', encoding='utf-8') as f:
-                f.write(comments_xml)
-            print(f"✅ Created comments.xml at: {comments_path}")
+        Args:
+            remove_ids: w:ids of comments already in the package to take out
 
-            # Update document.xml.rels
-            print(f"🔗 Updating document.xml.rels...")
-            self._update_document_rels(temp_dir)
+        Returns:
+            w:ids given to comments_data, in order
+        """
+        with zipfile.ZipFile(original_path, 'r') as source:
+            names = set(source.namelist())
 
-            # Update [Content_Types].xml
-            print(f"📑 Updating [Content_Types].xml...")
-            self._update_content_types(temp_dir)
+            def read_part(name):
+                return source.read(name) if name in names else None
+
+            print(f"💬 Generating comments.xml with {len(comments_data)} comments...")
+            comments_xml, first_id = self._generate_comments_xml(comments_data, read_part(COMMENTS_PART), remove_ids)
 
-            # Update document.xml with comment references
             print(f"🔖 Inserting comment references into document.xml...")
-            self._insert_comment_references(temp_dir, comments_data)
-
-            # Repackage as docx
-            print(f"📦 Repackaging as docx: {output_filename}")
-            with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, temp_dir)
-                        zipf.write(file_path, arcname)
-
-            print(f"✅ Successfully created document with {len(comments_data)} comments")
-            return output_filename
+            document_xml = self._insert_comment_references(read_part(DOCUMENT_PART), comments_data, first_id, remove_ids)
+
+            replacements = {
+                COMMENTS_PART: comments_xml,
+                DOCUMENT_PART: document_xml,
+                DOCUMENT_RELS_PART: self._update_document_rels(read_part(DOCUMENT_RELS_PART)),
+                CONTENT_TYPES_PART: self._update_content_types(read_part(CONTENT_TYPES_PART))
+            }
+
+            print(f"📦 Writing docx: {output_filename}")
+            try:
+                with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as target:
+                    for info in source.infolist():
+                        if info.filename in replacements:
+                            continue
+                        # Unchanged member: same name, date and compression, content streamed across
+                        with source.open(info) as src, \
+                                target.open(self._member_info(info.filename, info, info.compress_type), 'w',
+                                            force_zip64=info.file_size > ZIP64_THRESHOLD) as dst:
+                            shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+                    for name, data in replacements.items():
+                        original = source.getinfo(name) if name in names else None
+                        target.writestr(self._member_info(name, original), data)
+            except Exception:
+                if os.path.exists(output_filename):
+                    os.remove(output_filename)
+                raise
+
+        print(f"✅ Successfully created document with {len(comments_data)} comments")
+        return [first_id + i for i in range(len(comments_data))]
+
+    @staticmethod
+    def _member_info(name, original=None, compress_type=zipfile.ZIP_DEFLATED):
+        """Fresh ZipInfo for an output member (date and attributes of the original when there is one)"""
+        if original is None:
+            info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+        else:
+            info = zipfile.ZipInfo(name, date_time=original.date_time)
+            info.external_attr = original.external_attr
+        info.compress_type = compress_type
+        return info
+
+    def _generate_comments_xml(self, comments_data, existing_xml=None, remove_ids=()):
+        """
+        Build comments.xml (text is escaped by lxml)
+
+        Args:
+            comments_data: Comments to add
+            existing_xml: The document's current comments.xml, kept (None = new part)
+            remove_ids: w:ids of existing comments to drop
+
+        Returns:
+            Tuple of (comments.xml bytes, w:id of the first added comment)
+        """
+        if existing_xml:
+            root = etree.fromstring(existing_xml)
+            remove = {str(comment_id) for comment_id in remove_ids}
+            for existing in list(root.iterchildren(f'{{{W_NS}}}comment')):
+                if existing.get(f'{{{W_NS}}}id') in remove:
+                    root.remove(existing)
+            ids = [int(c.get(f'{{{W_NS}}}id')) for c in root.iterchildren(f'{{{W_NS}}}comment')
+                   if (c.get(f'{{{W_NS}}}id') or '').isdigit()]
+            first_id = max(ids) + 1 if ids else 1
+        else:
+            root = etree.Element(f'{{{W_NS}}}comments', nsmap={'w': W_NS})
+            first_id = 1
 
-        finally:
-            # Cleanup
-            print(f"🧹 Cleaning up temporary files...")
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-            if os.path.exists(temp_docx):
-                os.remove(temp_docx)
-
-    def _generate_comments_xml(self, comments_data):
-        """Generate the comments.xml content"""
-        xml_content = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
-<w:comments xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'''
-        
+        date = datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
         for i, comment in enumerate(comments_data):
-            comment_id = i + 1
-            author = comment.get('author', 'AI Feedback')
-            date = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-            text = comment.get('comment', '')
-            
-            xml_content += f'''
-    <w:comment w:id="{comment_id}" w:author="{author}" w:date="{date}">
-        <w:p>
-            <w:r>
-                <w:t>{text}</w:t>
-            </w:r>
-        </w:p>
-    </w:comment>'''
-        
-        xml_content += '\n</w:comments>'
-        return xml_content
-
-    def _update_document_rels(self, temp_dir):
-        """Update document.xml.rels to include comments relationship"""
-        rels_path = os.path.join(temp_dir, 'word', '_rels', 'document.xml.rels')
-        
-        if os.path.exists(rels_path):
-            with open(rels_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if 'comments.xml' not in content:
-                # Find the highest rId number
-                import re
-                rids = re.findall(r'rId(\d+)', content)
-                max_rid = max([int(rid) for rid in rids]) if rids else 0
-                new_rid = f"rId{max_rid + 1}"
-                
-                new_rel = f'<Relationship Id="{new_rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/comments" Target="comments.xml"/>'
-                content = content.replace('</Relationships>', f'{new_rel}</Relationships>')
-                
-                with open(rels_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-    def _update_content_types(self, temp_dir):
-        """Update [Content_Types].xml to include comments content type"""
-        content_types_path = os.path.join(temp_dir, '[Content_Types].xml')
-        
-        if os.path.exists(content_types_path):
-            with open(content_types_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if 'comments.xml' not in content:
-                new_type = '<Override PartName="/word/comments.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml"/>'
-                content = content.replace('</Types>', f'{new_type}</Types>')
-                
-                with open(content_types_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-    def _insert_comment_references(self, temp_dir, comments_data):
-        """Insert comment references into document.xml"""
-        doc_xml_path = os.path.join(temp_dir, 'word', 'document.xml')
-
-        print(f"🔖 Inserting {len(comments_data)} comment references...")
-        print(f"   Document path: {doc_xml_path}")
-
-        if not os.path.exists(doc_xml_path):
-            print(f"❌ ERROR: document.xml not found at {doc_xml_path}")
-            return
-
-        # Parse the document XML
-        tree = etree.parse(doc_xml_path)
-        root = tree.getroot()
-
-        # Find paragraphs and insert comment references
-        paragraphs = root.xpath('//w:p', namespaces={'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'})
-        print(f"   Found {len(paragraphs)} paragraphs in document")
-
+            element = etree.SubElement(root, f'{{{W_NS}}}comment')
+            element.set(f'{{{W_NS}}}id', str(first_id + i))
+            element.set(f'{{{W_NS}}}author', _xml_text(comment.get('author', 'AI Feedback')))
+            element.set(f'{{{W_NS}}}date', date)
+
+            # One comment paragraph per line (a line break inside w:t is not shown by Word)
+            for line in _xml_text(comment.get('comment', '')).split('\n'):
+                run = etree.SubElement(etree.SubElement(element, W_P), W_R)
+                text = etree.SubElement(run, W_T)
+                text.text = line
+                text.set(XML_SPACE, 'preserve')
+
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True), first_id
+
+    def _update_document_rels(self, rels_xml):
+        """document.xml.rels with a relationship to comments.xml"""
+        if rels_xml:
+            root = etree.fromstring(rels_xml)
+        else:
+            root = etree.Element(f'{{{PKG_REL_NS}}}Relationships', nsmap={None: PKG_REL_NS})
+
+        relationships = list(root.iterchildren(f'{{{PKG_REL_NS}}}Relationship'))
+        if not any(rel.get('Type') == COMMENTS_REL_TYPE for rel in relationships):
+            rids = [int(rel.get('Id')[3:]) for rel in relationships
+                    if (rel.get('Id') or '').startswith('rId') and rel.get('Id')[3:].isdigit()]
+            rel = etree.SubElement(root, f'{{{PKG_REL_NS}}}Relationship')
+            rel.set('Id', f"rId{max(rids) + 1 if rids else 1}")
+            rel.set('Type', COMMENTS_REL_TYPE)
+            rel.set('Target', 'comments.xml')
+
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    def _update_content_types(self, content_types_xml):
+        """[Content_Types].xml with the comments part registered"""
+        root = etree.fromstring(content_types_xml)
+        part_name = f'/{COMMENTS_PART}'
+        if not any(o.get('PartName') == part_name for o in root.iterchildren(f'{{{CONTENT_TYPES_NS}}}Override')):
+            override = etree.SubElement(root, f'{{{CONTENT_TYPES_NS}}}Override')
+            override.set('PartName', part_name)
+            override.set('ContentType', COMMENTS_CONTENT_TYPE)
+
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    def _insert_comment_references(self, document_xml, comments_data, first_id=1, remove_ids=()):
+        """document.xml with a comment range and reference per comment (and removed comments' marks gone)"""
+        root = etree.fromstring(document_xml, parser=etree.XMLParser(huge_tree=True, resolve_entities=False))
+
+        if remove_ids:
+            remove = {str(comment_id) for comment_id in remove_ids}
+            for mark in list(root.iter(*COMMENT_MARK_TAGS)):
+                if mark.get(f'{{{W_NS}}}id') in remove:
+                    # The reference sits in a run of its own
+                    target = mark.getparent() if mark.tag == COMMENT_REFERENCE else mark
+                    target.getparent().remove(target)
+
+        # Paragraph ordinal -> element, built once (ordinals are doc.paragraphs positions,
+        # the same as the session's paragraph_indices)
+        index = ParagraphIndex(root)
+        print(f"   Found {len(index)} paragraphs in document")
+
+        anchored = 0
         for i, comment in enumerate(comments_data):
-            comment_id = i + 1
             para_index = comment.get('paragraph_index', 0)
+            span = comment.get('highlight_span')
 
-            print(f"\n   Comment {comment_id}:")
-            print(f"      Target paragraph: {para_index}")
-            print(f"      Section: {comment.get('section', 'Unknown')}")
-            print(f"      Comment preview: {comment.get('comment', '')[:50]}...")
-
-            if para_index < len(paragraphs):
-                para = paragraphs[para_index]
-
-                # Create comment range start
-                comment_start = etree.Element('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}commentRangeStart')
-                comment_start.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}id', str(comment_id))
-
-                # Create comment range end
-                comment_end = etree.Element('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}commentRangeEnd')
-                comment_end.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}id', str(comment_id))
-
-                # Create comment reference
-                comment_ref = etree.Element('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}r')
-                comment_ref_elem = etree.SubElement(comment_ref, '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}commentReference')
-                comment_ref_elem.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}id', str(comment_id))
-
-                # Insert at the beginning of the paragraph
-                para.insert(0, comment_start)
-                para.append(comment_end)
-                para.append(comment_ref)
-
-                print(f"      ✅ Inserted comment reference at paragraph {para_index}")
+            if para_index < len(index):
+                index.anchor_comment(para_index, first_id + i, span)
+                anchored += 1
             else:
-                print(f"      ⚠️ WARNING: Paragraph index {para_index} out of range (max: {len(paragraphs)-1})")
+                print(f"      ⚠️ WARNING: Paragraph index {para_index} out of range (max: {len(index)-1})")
 
-        # Save the modified document.xml
-        print(f"\n💾 Saving modified document.xml...")
-        tree.write(doc_xml_path, encoding='utf-8', xml_declaration=True)
-        print(f"✅ document.xml saved successfully")
+        print(f"   ✅ Inserted {anchored} comment references")
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
 
     def _create_with_annotations(self, original_path, comments_data, output_filename):
         """Fallback method: create document with inline annotations"""
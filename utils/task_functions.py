@@ -7,6 +7,7 @@ that can be executed in thread pools.
 
 from typing import Dict, Any
 from core.ai_feedback_engine import AIFeedbackEngine
+from utils.thread_pool_manager import update_task_progress
 import time
 
 
@@ -30,6 +31,7 @@ def analyze_section_sync(section_name: str, content: str, doc_type: str = "Full
 
         # Create AI engine
         ai_engine = AIFeedbackEngine(session_id=session_id)
+        update_task_progress(30, 'Analyzing with AI')
 
         # Run analysis (synchronous)
         result = ai_engine.analyze_section(
@@ -65,6 +67,57 @@ def analyze_section_sync(section_name: str, content: str, doc_type: str = "Full
         }
 
 
+def analyze_sections_batch_sync(sections: Dict[str, str], doc_type: str = "Full Write-up", session_id: str = None) -> Dict[str, Any]:
+    """
+    Synchronous batched analysis of several small sections (one Bedrock call)
+
+    Args:
+        sections: Section name -> content (see core.section_batcher)
+        doc_type: Document type
+        session_id: Session ID for tracking
+
+    Returns:
+        Batched analysis result (same shape as analyze_sections_batch_task)
+    """
+    start_time = time.time()
+
+    try:
+        print(f"📦 [Thread] Analyzing {len(sections)} sections in one batch: {list(sections)}")
+
+        ai_engine = AIFeedbackEngine(session_id=session_id)
+        update_task_progress(30, 'Analyzing with AI')
+
+        results = ai_engine.analyze_sections_batch(sections, doc_type=doc_type)
+
+        duration = time.time() - start_time
+        print(f"✅ [Thread] Batch complete: {len(results)} sections ({duration:.2f}s)")
+
+        return {
+            'success': True,
+            'batch': True,
+            'results': {
+                section_name: {
+                    'feedback_items': result.get('feedback_items', []),
+                    'feedback_count': len(result.get('feedback_items', []))
+                }
+                for section_name, result in results.items()
+            },
+            'sections': list(sections),
+            'duration': round(duration, 2)
+        }
+
+    except Exception as e:
+        duration = time.time() - start_time
+        print(f"❌ [Thread] Batch analysis error: {str(e)}")
+
+        return {
+            'success': False,
+            'error': str(e),
+            'sections': list(sections),
+            'duration': round(duration, 2)
+        }
+
+
 def process_chat_sync(query: str, context: Dict[str, Any], session_id: str = None) -> Dict[str, Any]:
     """
     Synchronous chat processing (replaces Celery task)
@@ -0,0 +1,226 @@
+"""
+SQLite Task Store for the in-process task backend (utils/thread_pool_manager)
+
+Task state lives in SQLite instead of the TaskManager's memory, so every
+gunicorn worker on the host can answer /task_status for a task submitted
+to another worker, and results survive until they are cleaned up.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Task states (same names the RQ status endpoints return)
+PENDING = 'PENDING'
+PROGRESS = 'PROGRESS'
+SUCCESS = 'SUCCESS'
+FAILURE = 'FAILURE'
+REVOKED = 'REVOKED'
+
+FINAL_STATES = (SUCCESS, FAILURE, REVOKED)
+
+# Use /tmp on App Runner (read-only filesystem), local data/ directory otherwise
+DEFAULT_TASK_DB_PATH = ('/tmp/data/tasks.db' if os.environ.get('FLASK_ENV') == 'production'
+                        else 'data/tasks.db')
+
+
+class SQLiteTaskStore:
+    """
+    Persistent task table shared by all processes of one host
+
+    Args:
+        db_path: SQLite database file
+    """
+
+    def __init__(self, db_path: str = DEFAULT_TASK_DB_PATH):
+        self.db_path = db_path
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_database(self):
+        conn = self._connect()
+        try:
+            # WAL: readers (status polls) never block the worker thread writing progress
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    function TEXT NOT NULL,
+                    session_id TEXT,
+                    state TEXT NOT NULL,
+                    status TEXT,
+                    progress INTEGER DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    owner_pid INTEGER,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    ended_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_ended ON tasks (ended_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    def create(self, task_id: str, function: str, session_id: Optional[str] = None):
+        """Record a newly submitted task"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO tasks (task_id, function, session_id, state, status, progress, owner_pid, created_at) '
+                'VALUES (?, ?, ?, ?, ?, 0, ?, ?)',
+                (task_id, function, session_id, PENDING, 'Task is queued', os.getpid(), time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def update(self, task_id: str, **fields):
+        """
+        Update columns of a task
+
+        Args:
+            task_id: Task identifier
+            **fields: Column values (result is stored as JSON)
+        """
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'], default=str)
+
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f'UPDATE tasks SET {columns} WHERE task_id = ?', (*fields.values(), task_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A task row (result decoded), or None"""
+        rows = self.get_many([task_id])
+        return rows.get(task_id)
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Several task rows in one query"""
+        if not task_ids:
+            return {}
+
+        conn = self._connect()
+        try:
+            placeholders = ', '.join('?' for _ in task_ids)
+            rows = conn.execute(f'SELECT * FROM tasks WHERE task_id IN ({placeholders})', task_ids).fetchall()
+        finally:
+            conn.close()
+
+        tasks = {}
+        for row in rows:
+            task = dict(row)
+            if task['result'] is not None:
+                task['result'] = json.loads(task['result'])
+            tasks[task['task_id']] = task
+        return tasks
+
+    def count_by_state(self) -> Dict[str, int]:
+        """Number of stored tasks per state"""
+        conn = self._connect()
+        try:
+            return dict(conn.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall())
+        finally:
+            conn.close()
+
+    def delete_finished_before(self, cutoff: float) -> int:
+        """Delete finished tasks that ended before cutoff; returns the number deleted"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute('DELETE FROM tasks WHERE ended_at IS NOT NULL AND ended_at < ?', (cutoff,))
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+
+class MemoryTaskStore:
+    """
+    Task table kept in this process's memory
+
+    Fallback when the SQLite file cannot be opened: tasks still run and can
+    be polled, but only from the worker process that submitted them.
+    """
+
+    db_path = ':memory:'
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, task_id: str, function: str, session_id: Optional[str] = None):
+        """Record a newly submitted task"""
+        with self._lock:
+            self._tasks[task_id] = {
+                'task_id': task_id, 'function': function, 'session_id': session_id,
+                'state': PENDING, 'status': 'Task is queued', 'progress': 0,
+                'result': None, 'error': None, 'owner_pid': os.getpid(),
+                'created_at': time.time(), 'started_at': None, 'ended_at': None
+            }
+
+    def update(self, task_id: str, **fields):
+        """Update columns of a task (result is copied through JSON, as in SQLite)"""
+        if 'result' in fields:
+            fields['result'] = json.loads(json.dumps(fields['result'], default=str))
+
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.update(fields)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A task row, or None"""
+        return self.get_many([task_id]).get(task_id)
+
+    def get_many(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Several task rows"""
+        with self._lock:
+            return {task_id: dict(self._tasks[task_id]) for task_id in task_ids if task_id in self._tasks}
+
+    def count_by_state(self) -> Dict[str, int]:
+        """Number of stored tasks per state"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for task in self._tasks.values():
+                counts[task['state']] = counts.get(task['state'], 0) + 1
+        return counts
+
+    def delete_finished_before(self, cutoff: float) -> int:
+        """Delete finished tasks that ended before cutoff; returns the number deleted"""
+        with self._lock:
+            expired = [task_id for task_id, task in self._tasks.items()
+                       if task['ended_at'] is not None and task['ended_at'] < cutoff]
+            for task_id in expired:
+                del self._tasks[task_id]
+        return len(expired)
+
+
+def open_task_store(db_path: str = DEFAULT_TASK_DB_PATH):
+    """
+    SQLite task store at db_path, or an in-memory store if it cannot be opened
+
+    Args:
+        db_path: SQLite database file
+    """
+    try:
+        return SQLiteTaskStore(db_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Cannot open task database {db_path} ({e}) - keeping task state in memory")
+        return MemoryTaskStore()
@@ -1,43 +1,75 @@
 """
 Thread Pool Task Manager - Replacement for Celery
 Simple, efficient task queue using ThreadPoolExecutor
+
+Used as the async backend when Redis/RQ is not available: tasks run on a
+thread pool, their state and results are persisted to SQLite (see
+utils/task_store) so /task_status works from any worker process, and
+statuses use the same shape as the RQ status endpoints
+(task_id, state, status, progress, ready, result|error).
 """
 
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import ThreadPoolExecutor
+import os
 import uuid
 import time
-from typing import Dict, Callable, Any, Optional
+from typing import Dict, Callable, Any, Optional, Tuple
 import threading
 import traceback
-from datetime import datetime
+
+from utils.task_store import (
+    DEFAULT_TASK_DB_PATH, SQLiteTaskStore, open_task_store, PENDING, PROGRESS, SUCCESS, FAILURE, REVOKED, FINAL_STATES
+)
+
+# SQLite file holding task state and results (/tmp/data on App Runner)
+TASK_DB_PATH = os.environ.get('TASK_DB_PATH', DEFAULT_TASK_DB_PATH)
+
+# Seconds finished tasks (and their results) are kept
+TASK_RESULT_RETENTION = int(os.environ.get('TASK_RESULT_RETENTION', '3600'))
+
+# Task currently running on this thread (for update_task_progress)
+_current = threading.local()
+
+
+class LocalJob:
+    """Handle returned by TaskManager.enqueue (mirrors the rq.job.Job attributes callers use)"""
+
+    def __init__(self, task_id: str, func_name: str):
+        self.id = task_id
+        self.func_name = func_name
+
 
 class TaskManager:
     """
     Simple task manager using ThreadPoolExecutor
 
-    Replaces Celery with a simpler in-memory solution.
+    Replaces Celery with a simpler in-process solution.
     Perfect for I/O-bound tasks like Bedrock API calls.
 
     Features:
     - Non-blocking task submission
-    - Task status polling (compatible with existing frontend)
+    - Task status polling (same response shape as RQ)
+    - Task state and results persisted to SQLite (shared across processes)
     - Automatic cleanup of old tasks
     - Thread pool management
     - Error handling and recovery
     """
 
-    def __init__(self, max_workers: int = 10, cleanup_interval: int = 300):
+    def __init__(self, max_workers: int = 10, cleanup_interval: int = 300,
+                 store: Optional[SQLiteTaskStore] = None):
         """
         Initialize task manager
 
         Args:
             max_workers: Maximum number of concurrent threads
             cleanup_interval: Cleanup interval in seconds (default 5 minutes)
+            store: Task store (default: SQLite at TASK_DB_PATH, in memory if that cannot be opened)
         """
         self.executor = ThreadPoolExecutor(
             max_workers=max_workers,
             thread_name_prefix='aiprism_worker'
         )
+        self.store = store or open_task_store(TASK_DB_PATH)
         self.tasks: Dict[str, Dict[str, Any]] = {}
         self.lock = threading.Lock()
         self.max_workers = max_workers
@@ -51,118 +83,175 @@ class TaskManager:
         )
         self._cleanup_thread.start()
 
-        print(f"✅ TaskManager initialized with {max_workers} workers")
+        print(f"✅ TaskManager initialized with {max_workers} workers (state in {self.store.db_path})")
 
-    def submit_task(self, func: Callable, *args, **kwargs) -> str:
+    def enqueue(self, func: Callable, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                job_id: Optional[str] = None, session_id: Optional[str] = None, **options) -> LocalJob:
         """
-        Submit a task for execution
+        Submit a task (same calling convention as rq.Queue.enqueue)
 
         Args:
             func: Function to execute
-            *args: Positional arguments
-            **kwargs: Keyword arguments
+            args: Positional arguments
+            kwargs: Keyword arguments
+            job_id: Optional pre-generated task id
+            session_id: Owning session (stored with the task)
+            **options: RQ-only options (job_timeout, ...) - accepted and ignored
 
         Returns:
-            task_id: Unique identifier for the task
+            LocalJob with the task id
         """
-        task_id = str(uuid.uuid4())
+        task_id = job_id or str(uuid.uuid4())
+        kwargs = kwargs or {}
+        func_name = getattr(func, '__name__', str(func))
+
+        self.store.create(task_id, func_name, session_id)
 
-        # Wrap function to capture exceptions
         def wrapped_func():
+            _current.task_id = task_id
             try:
-                return func(*args, **kwargs)
+                if self.tasks.get(task_id, {}).get('cancel_requested'):
+                    self.store.update(task_id, state=REVOKED, status='Task was cancelled', ended_at=time.time())
+                    return
+                self.store.update(task_id, state=PROGRESS, status='Task is running',
+                                  progress=10, started_at=time.time())
+                result = func(*args, **kwargs)
+                self.store.update(task_id, state=SUCCESS, status='Task completed successfully',
+                                  progress=100, result=result, ended_at=time.time())
             except Exception as e:
                 print(f"❌ Task {task_id[:8]} failed: {str(e)}")
                 traceback.print_exc()
-                raise
-
-        future = self.executor.submit(wrapped_func)
+                self.store.update(task_id, state=FAILURE, status='Task failed', progress=0,
+                                  error=str(e), ended_at=time.time())
+            finally:
+                _current.task_id = None
 
         with self.lock:
             self.tasks[task_id] = {
-                'future': future,
                 'created': time.time(),
-                'status': 'PENDING',
-                'function': func.__name__,
-                'started': None,
-                'completed': None
+                'function': func_name,
+                'cancel_requested': False
             }
+            self.tasks[task_id]['future'] = self.executor.submit(wrapped_func)
+
+        print(f"📤 Task {task_id[:8]} submitted: {func_name}")
+        return LocalJob(task_id, func_name)
+
+    def submit_task(self, func: Callable, *args, **kwargs) -> str:
+        """
+        Submit a task for execution
+
+        Args:
+            func: Function to execute
+            *args: Positional arguments
+            **kwargs: Keyword arguments
 
-        print(f"📤 Task {task_id[:8]} submitted: {func.__name__}")
-        return task_id
+        Returns:
+            task_id: Unique identifier for the task
+        """
+        return self.enqueue(func, args=args, kwargs=kwargs).id
+
+    def has_task(self, task_id: str) -> bool:
+        """Whether a task was submitted here (any process sharing TASK_DB_PATH)"""
+        return self.store.get(task_id) is not None
 
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
-        Get status of a task
+        Get status of a task (may have been submitted by another process)
 
         Args:
             task_id: Task identifier
 
         Returns:
-            Dictionary with status, result, or error
+            Dict with task_id, state, status, progress, ready and result or error
         """
-        with self.lock:
-            if task_id not in self.tasks:
-                return {
-                    'status': 'NOT_FOUND',
-                    'error': f'Task {task_id} not found'
-                }
+        return self.get_task_statuses([task_id])[task_id]
+
+    def get_task_statuses(self, task_ids) -> Dict[str, Dict[str, Any]]:
+        """
+        Status of several tasks with one SQLite query
+
+        Args:
+            task_ids: Task identifiers
 
-            task_info = self.tasks[task_id]
-            future = task_info['future']
-
-            if future.done():
-                if task_info['completed'] is None:
-                    task_info['completed'] = time.time()
-
-                try:
-                    result = future.result()
-                    task_info['status'] = 'SUCCESS'
-
-                    duration = task_info['completed'] - task_info['created']
-
-                    return {
-                        'status': 'SUCCESS',
-                        'result': result,
-                        'duration': round(duration, 2),
-                        'function': task_info['function']
-                    }
-                except Exception as e:
-                    task_info['status'] = 'FAILURE'
-                    return {
-                        'status': 'FAILURE',
-                        'error': str(e),
-                        'error_type': type(e).__name__,
-                        'function': task_info['function']
-                    }
-            else:
-                # Mark as started if not already
-                if task_info['started'] is None:
-                    task_info['started'] = time.time()
-
-                return {
-                    'status': 'PENDING',
-                    'function': task_info['function'],
-                    'elapsed': round(time.time() - task_info['created'], 2)
+        Returns:
+            Dict of task_id -> status (see get_task_status)
+        """
+        rows = self.store.get_many(list(task_ids))
+        return {task_id: self._build_status(task_id, rows.get(task_id)) for task_id in task_ids}
+
+    def _build_status(self, task_id: str, row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if row is None:
+            return {
+                'task_id': task_id,
+                'state': PENDING,
+                'status': 'Task not found',
+                'progress': 0,
+                'ready': False
+            }
+
+        state = row['state']
+        if state not in FINAL_STATES and self._is_orphaned(task_id, row):
+            # The process running it is gone (restart/crash) - it will never finish
+            self.store.update(task_id, state=FAILURE, status='Task failed',
+                              error='Task was interrupted by a server restart', ended_at=time.time())
+            row.update(state=FAILURE, status='Task failed', error='Task was interrupted by a server restart')
+            state = FAILURE
+
+        response = {
+            'task_id': task_id,
+            'state': state,
+            'status': row['status'],
+            'progress': row['progress'],
+            'ready': state in FINAL_STATES
+        }
+        if state == SUCCESS:
+            response['result'] = row['result']
+            if row['started_at'] and row['ended_at']:
+                response['timing'] = {
+                    'queue_wait': round(row['started_at'] - row['created_at'], 3),
+                    'run_time': round(row['ended_at'] - row['started_at'], 3)
                 }
+        elif state == FAILURE:
+            response['error'] = row['error'] or 'Unknown error'
+        return response
+
+    def _is_orphaned(self, task_id: str, row: Dict[str, Any]) -> bool:
+        owner_pid = row['owner_pid']
+        if owner_pid == os.getpid():
+            return task_id not in self.tasks
+        try:
+            os.kill(owner_pid, 0)
+            return False
+        except ProcessLookupError:
+            return True
+        except (PermissionError, OSError, TypeError):
+            return False
 
     def get_all_tasks(self) -> Dict[str, Dict[str, Any]]:
-        """Get status of all tasks"""
+        """Get status of all tasks submitted by this process"""
+        # Snapshot under the lock, look up statuses outside it (get_task_status reads the store)
         with self.lock:
-            return {
-                task_id: {
-                    'status': self.get_task_status(task_id)['status'],
-                    'function': task_info['function'],
-                    'created': task_info['created'],
-                    'age': time.time() - task_info['created']
-                }
-                for task_id, task_info in self.tasks.items()
+            snapshot = {task_id: dict(task_info) for task_id, task_info in self.tasks.items()}
+
+        statuses = self.get_task_statuses(list(snapshot))
+        now = time.time()
+        return {
+            task_id: {
+                'status': statuses[task_id]['state'],
+                'function': task_info['function'],
+                'created': task_info['created'],
+                'age': now - task_info['created']
             }
+            for task_id, task_info in snapshot.items()
+        }
 
     def cancel_task(self, task_id: str) -> bool:
         """
         Attempt to cancel a task
 
+        Queued tasks are dropped; a running task cannot be interrupted.
+
         Args:
             task_id: Task identifier
 
@@ -170,64 +259,60 @@ class TaskManager:
             True if cancelled, False otherwise
         """
         with self.lock:
-            if task_id not in self.tasks:
+            task_info = self.tasks.get(task_id)
+            if task_info is None:
                 return False
 
-            future = self.tasks[task_id]['future']
-            cancelled = future.cancel()
+            task_info['cancel_requested'] = True
+            cancelled = task_info['future'].cancel()
 
-            if cancelled:
-                self.tasks[task_id]['status'] = 'CANCELLED'
-                print(f"❌ Task {task_id[:8]} cancelled")
+        if cancelled:
+            self.store.update(task_id, state=REVOKED, status='Task was cancelled', ended_at=time.time())
+            print(f"❌ Task {task_id[:8]} cancelled")
 
-            return cancelled
+        return cancelled
+
+    def update_progress(self, task_id: str, progress: int, status: str):
+        """Record progress of a running task"""
+        self.store.update(task_id, progress=progress, status=status)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get task manager statistics"""
         with self.lock:
             total = len(self.tasks)
-            statuses = {}
 
-            for task_info in self.tasks.values():
-                status = task_info['status']
-                statuses[status] = statuses.get(status, 0) + 1
+        statuses = self.store.count_by_state()
 
-            return {
-                'total_tasks': total,
-                'max_workers': self.max_workers,
-                'statuses': statuses,
-                'active_tasks': statuses.get('PENDING', 0),
-                'completed_tasks': statuses.get('SUCCESS', 0),
-                'failed_tasks': statuses.get('FAILURE', 0)
-            }
+        return {
+            'total_tasks': total,
+            'max_workers': self.max_workers,
+            'statuses': statuses,
+            'active_tasks': statuses.get(PENDING, 0) + statuses.get(PROGRESS, 0),
+            'completed_tasks': statuses.get(SUCCESS, 0),
+            'failed_tasks': statuses.get(FAILURE, 0)
+        }
 
     def _cleanup_old_tasks(self):
         """
-        Background thread to remove completed tasks older than 1 hour
+        Background thread to remove completed tasks older than TASK_RESULT_RETENTION
         Runs every cleanup_interval seconds
         """
         while True:
             try:
                 time.sleep(self.cleanup_interval)
-                current_time = time.time()
+                cutoff = time.time() - TASK_RESULT_RETENTION
 
                 with self.lock:
-                    to_remove = []
-
-                    for task_id, task_info in self.tasks.items():
-                        future = task_info['future']
-
-                        # Remove if done and older than 1 hour
-                        if future.done():
-                            age = current_time - task_info['created']
-                            if age > 3600:  # 1 hour
-                                to_remove.append(task_id)
-
+                    to_remove = [
+                        task_id for task_id, task_info in self.tasks.items()
+                        if task_info['future'].done() and task_info['created'] < cutoff
+                    ]
                     for task_id in to_remove:
                         del self.tasks[task_id]
 
-                    if to_remove:
-                        print(f"🧹 Cleaned up {len(to_remove)} old tasks")
+                deleted = self.store.delete_finished_before(cutoff)
+                if to_remove or deleted:
+                    print(f"🧹 Cleaned up {max(len(to_remove), deleted)} old tasks")
 
             except Exception as e:
                 print(f"⚠️ Cleanup error: {e}")
@@ -244,6 +329,19 @@ class TaskManager:
         print("✅ TaskManager shut down")
 
 
+def update_task_progress(progress: int, status: str):
+    """
+    Report progress from inside a running task (no-op outside TaskManager threads)
+
+    Args:
+        progress: Percent complete
+        status: Status message
+    """
+    task_id = getattr(_current, 'task_id', None)
+    if task_id and _task_manager is not None:
+        _task_manager.update_progress(task_id, progress, status)
+
+
 # Global singleton instance
 _task_manager: Optional[TaskManager] = None
 _manager_lock = threading.Lock()